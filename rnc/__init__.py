@@ -19,9 +19,12 @@ from .corpora import (
 
     SORT_KEYS,
     OUTPUT_FORMATS,
-    SEARCH_FORMATS
+    SEARCH_FORMATS,
+    set_base_url
 )
 from .corpora_params import Mycorp, Languages # noqa: F401
+from .counts import count_queries, count_queries_async
+from .media_store import MediaStore
 from .examples import (
     MainExample,
     Paper2000Example,
@@ -107,6 +110,9 @@ __all__ = (
     'TutoringCorpus',
     'MultimodalCorpus',
     'mycorp',
+    'count_queries',
+    'count_queries_async',
+    'MediaStore',
 
     'MainExample',
     'Paper2000Example',
@@ -126,5 +132,6 @@ __all__ = (
 
     'SORT_KEYS',
     'SEARCH_FORMATS',
-    'OUTPUT_FORMATS'
+    'OUTPUT_FORMATS',
+    'set_base_url',
 )
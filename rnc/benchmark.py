@@ -0,0 +1,257 @@
+"""
+Module with the benchmark of the requests on the local mock of RNC
+(see rnc.mock_server): the pages of the corpora and the media files
+are requested by the different count of workers with the latency,
+429 errors and bandwidth of the mock, the throughput is measured.
+So the count of workers and the wait after 429 error might be tuned.
+
+    python -m rnc.benchmark --workers 1 5 10 --latency 0.05 --rate-limit 20
+"""
+
+__all__ = (
+    'BenchmarkResult',
+    'SCENARIOS',
+    'run_benchmark',
+    'format_results',
+)
+
+import argparse
+import asyncio
+import logging
+import math
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import rnc.corpora as corpora
+import rnc.corpora_requests as creq
+from rnc.mock_server import MockConfig, MockRNC, lognormal_latency
+
+logger = logging.getLogger("rnc")
+
+# pages of the corpora in the modes and the media files
+SCENARIOS = ('main', 'para', 'murco', 'kwic', 'media')
+QUERY = 'кот'
+
+
+class BenchmarkResult(NamedTuple):
+    """ Result of the scenario run by the count of workers.
+
+    received – count of the received pages or files, expected – count
+    of the requested ones, requests – count of the requests the mock
+    got, statuses – their count by status, bytes_sent – bytes the
+    mock sent.
+    """
+    scenario: str
+    workers: int
+    seconds: float
+    received: int
+    expected: int
+    requests: int
+    statuses: Dict[int, int]
+    bytes_sent: int
+
+    @property
+    def failed(self) -> int:
+        return self.expected - self.received
+
+    @property
+    def throughput(self) -> float:
+        """ Count of the received pages or files per second. """
+        return self.received / self.seconds if self.seconds else 0.0
+
+
+def _corpus(scenario: str,
+            pages: int,
+            dpp: int,
+            spd: int) -> corpora.Corpus:
+    """ Get the corpus, its params and page parser are used. """
+    if scenario == 'para':
+        return corpora.ParallelCorpus(QUERY, pages, dpp=dpp, spd=spd)
+    if scenario == 'murco':
+        return corpora.MultimodalCorpus(QUERY, pages, dpp=dpp, spd=spd)
+    if scenario == 'kwic':
+        return corpora.MainCorpus(QUERY, pages, dpp=dpp, spd=spd, out='kwic')
+    return corpora.MainCorpus(QUERY, pages, dpp=dpp, spd=spd)
+
+
+async def _request_pages(url: str,
+                         scenario: str,
+                         workers: int,
+                         pages: int,
+                         dpp: int,
+                         spd: int) -> Tuple[int, int]:
+    """ Request and parse the pages like the corpus does.
+
+    :return: count of the received pages and of the requested ones.
+    """
+    corp = _corpus(scenario, pages, dpp, spd)
+    requests = [
+        {**corp.params, 'p': p_index}
+        for p_index in range(pages)
+    ]
+    results = await creq.fetch_pages_async(
+        f"{url}/search.xml", requests, corp._page_parser, workers) # type: ignore
+    return sum(result is not None for result in results), pages
+
+
+async def _download_media(url: str,
+                          workers: int,
+                          files: int) -> Tuple[int, int]:
+    """ Download the media files to the temporary folder.
+
+    :return: count of the received files and of the requested ones.
+    """
+    with tempfile.TemporaryDirectory(prefix='rnc-benchmark-') as folder:
+        url_to_name = [
+            (f"{url}/media/{doc}", os.path.join(folder, f"clip{doc + 1}.mp4"))
+            for doc in range(files)
+        ]
+        await creq.download_docs_coro(url_to_name, workers=workers)
+        received = sum(
+            Path(filename).exists()
+            for _, filename in url_to_name
+        )
+    return received, files
+
+
+async def run_benchmark(config: MockConfig = MockConfig(),
+                        scenarios: Iterable[str] = SCENARIOS,
+                        workers: Iterable[int] = (1, 5, 10),
+                        pages: int = 10,
+                        files: int = 10,
+                        dpp: int = 10,
+                        spd: int = 3,
+                        wait: float = 5.0) -> List[BenchmarkResult]:
+    """ Run the scenarios by every count of workers, every
+    run gets the new mock with the config.
+
+    :param config: MockConfig, data of the mock and its faults.
+    :param scenarios: names of the scenarios, see SCENARIOS.
+    :param workers: counts of workers to compare.
+    :param pages: int, count of the pages to request.
+    :param files: int, count of the media files to download,
+     there should be enough docs in the config.
+    :param dpp: int, documents per page.
+    :param spd: int, examples per document.
+    :param wait: float, seconds to wait after 429 error, it is
+     set to creq.WAIT while the benchmark is running, so it
+     is the timeout of the pages too.
+    :return: list of BenchmarkResult.
+    :exception ValueError: if a scenario is unknown or there are
+     not enough docs in the config for the pages or the files.
+    """
+    scenarios, workers = list(scenarios), list(workers)
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        msg = f"Scenarios must be in {SCENARIOS}, but {unknown} found"
+        logger.error(msg)
+        raise ValueError(msg)
+    # the missing pages would be redirected to the first one
+    if pages > math.ceil(config.docs / dpp) or files > config.docs:
+        msg = f"There are {config.docs} docs, it is not enough " \
+              f"for {pages} pages by {dpp} docs and {files} files"
+        logger.error(msg)
+        raise ValueError(msg)
+
+    results = []
+    default_wait, creq.WAIT = creq.WAIT, wait # type: ignore
+    try:
+        for scenario in scenarios:
+            for count in workers:
+                async with MockRNC(config) as server:
+                    start = time.perf_counter()
+                    if scenario == 'media':
+                        received, expected = await _download_media(server.url, count, files) # type: ignore
+                    else:
+                        received, expected = await _request_pages(
+                            server.url, scenario, count, pages, dpp, spd) # type: ignore
+                    seconds = time.perf_counter() - start
+
+                results += [BenchmarkResult(
+                    scenario, count, seconds, received, expected,
+                    server.requests, dict(server.statuses), server.bytes_sent)]
+                logger.info(f"Benchmark: {results[-1]}")
+    finally:
+        creq.WAIT = default_wait
+    return results
+
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    """ Format the results to the table. """
+    header = ('scenario', 'workers', 'seconds', 'received', 'failed',
+              'per second', 'requests', '429', '5xx', 'KiB sent')
+    rows = [header]
+    for result in results:
+        errors = sum(
+            count
+            for status, count in result.statuses.items()
+            if status >= 500
+        )
+        rows += [(
+            result.scenario, str(result.workers), f"{result.seconds:.2f}",
+            str(result.received), str(result.failed), f"{result.throughput:.1f}",
+            str(result.requests), str(result.statuses.get(429, 0)), str(errors),
+            str(result.bytes_sent // 1024)
+        )]
+
+    widths = [
+        max(len(row[column]) for row in rows)
+        for column in range(len(header))
+    ]
+    return '\n'.join(
+        '  '.join(value.rjust(width) for value, width in zip(row, widths))
+        for row in rows
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m rnc.benchmark',
+        description="Measure the requests on the local mock of RNC")
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 5, 10],
+                        help="counts of workers to compare")
+    parser.add_argument('--pages', type=int, default=10, help="count of pages to request")
+    parser.add_argument('--files', type=int, default=10, help="count of media files to download")
+    parser.add_argument('--dpp', type=int, default=10, help="documents per page")
+    parser.add_argument('--spd', type=int, default=3, help="examples per document")
+    parser.add_argument('--wait', type=float, default=5.0, help="seconds to wait after 429 error")
+
+    mock = parser.add_argument_group('mock')
+    mock.add_argument('--docs', type=int, default=100, help="count of found documents")
+    mock.add_argument('--media-size', type=int, default=64 * 1024, help="size of media files in bytes")
+    mock.add_argument('--latency', type=float, default=0.0,
+                      help="median latency in seconds, lognormal if sigma is given")
+    mock.add_argument('--sigma', type=float, default=0.0, help="sigma of the lognormal latency")
+    mock.add_argument('--burst-every', type=int, default=0, help="requests between the bursts of 429")
+    mock.add_argument('--burst-length', type=int, default=0, help="requests in the burst of 429")
+    mock.add_argument('--rate-limit', type=float, default=None, help="requests per second above it get 429")
+    mock.add_argument('--error-rate', type=float, default=0.0, help="part of the requests getting 5xx")
+    mock.add_argument('--bandwidth', type=int, default=None, help="bytes per second of all the responses")
+    mock.add_argument('--connection-bandwidth', type=int, default=None,
+                      help="bytes per second of every response")
+    mock.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    latency = lognormal_latency(args.latency, args.sigma) if args.latency and args.sigma else args.latency
+    config = MockConfig(
+        docs=args.docs, media_size=args.media_size, latency=latency,
+        burst_every=args.burst_every, burst_length=args.burst_length,
+        rate_limit=args.rate_limit, error_rate=args.error_rate,
+        bandwidth=args.bandwidth, connection_bandwidth=args.connection_bandwidth,
+        seed=args.seed)
+
+    try:
+        results = asyncio.run(run_benchmark(
+            config, args.scenarios, args.workers, args.pages,
+            args.files, args.dpp, args.spd, args.wait))
+    except ValueError as e:
+        parser.error(str(e))
+    print(format_results(results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Module with association measures of the collocates: tokens
+near the node words of the examples, KWIC or normal ones.
+"""
+
+__all__ = (
+    'Collocation',
+    'MEASURES',
+    'collocations',
+    'batch_collocations',
+)
+
+import logging
+import math
+from typing import Any, Iterable, List, NamedTuple, Optional
+
+from rnc.concordance import Cooccurrences, cooccurrences
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+logger = logging.getLogger("rnc")
+
+MEASURES = ('mi', 't_score', 'log_likelihood', 'frequency')
+
+
+class Collocation(NamedTuple):
+    collocate: str
+    # count of the collocate in the windows and in the examples
+    frequency: int
+    corpus_frequency: int
+    mi: float
+    t_score: float
+    log_likelihood: float
+
+
+def _check_measure(measure: str) -> None:
+    if measure not in MEASURES:
+        msg = f"One of {MEASURES} expected, but '{measure}' found"
+        logger.error(msg)
+        raise ValueError(msg)
+
+
+def _log_likelihood_term(observed: float,
+                         expected: float) -> float:
+    if observed <= 0 or expected <= 0:
+        return 0.
+    return observed * math.log(observed / expected)
+
+
+def _measures(counts: Cooccurrences,
+              min_frequency: int) -> List[Collocation]:
+    """ Get the measures by the contingency table of every
+    collocate: the windows and the collocate are its margins.
+    """
+    vocabulary, window_counts, token_counts, window_size, size = counts
+    if np is not None:
+        ids = np.flatnonzero(window_counts >= max(min_frequency, 1))
+        o11 = window_counts[ids].astype(np.float64)
+        c1 = token_counts[ids].astype(np.float64)
+        o12, o21 = window_size - o11, c1 - o11
+        o22 = size - window_size - c1 + o11
+        e11 = window_size * c1 / size
+        e12 = window_size * (size - c1) / size
+        e21 = (size - window_size) * c1 / size
+        e22 = (size - window_size) * (size - c1) / size
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            terms = [
+                np.where((observed > 0) & (expected > 0), observed * np.log(observed / expected), 0.)
+                for observed, expected in ((o11, e11), (o12, e12), (o21, e21), (o22, e22))
+            ]
+        mi = np.log2(o11 / e11)
+        t_score = (o11 - e11) / np.sqrt(o11)
+        log_likelihood = 2 * np.sum(terms, axis=0)
+
+        return [
+            Collocation(*fields)
+            for fields in zip(vocabulary.lookup(ids.tolist()), window_counts[ids].tolist(),
+                              token_counts[ids].tolist(), mi.tolist(), t_score.tolist(),
+                              log_likelihood.tolist())
+        ]
+
+    result = []
+    for token, o11 in enumerate(window_counts):
+        if o11 < max(min_frequency, 1):
+            continue
+        c1 = token_counts[token]
+        e11 = window_size * c1 / size
+        log_likelihood = 2 * sum((
+            _log_likelihood_term(o11, e11),
+            _log_likelihood_term(window_size - o11, window_size * (size - c1) / size),
+            _log_likelihood_term(c1 - o11, (size - window_size) * c1 / size),
+            _log_likelihood_term(size - window_size - c1 + o11, (size - window_size) * (size - c1) / size),
+        ))
+        result.append(Collocation(
+            vocabulary[token], o11, c1, math.log2(o11 / e11),
+            (o11 - e11) / math.sqrt(o11), log_likelihood))
+    return result
+
+
+def collocations(corpus: Any,
+                 left: int = 5,
+                 right: int = 5,
+                 measure: str = 'log_likelihood',
+                 min_frequency: int = 1,
+                 count: Optional[int] = None,
+                 nodes: Optional[Iterable[str]] = None) -> List[Collocation]:
+    """ Get the collocates of the node words with their MI,
+    t-score and log-likelihood.
+
+    Contexts are split to tokens once (see rnc.concordance),
+    tokens are compared lowercased, without punctuation. The
+    frequencies are counted over the examples, so they are
+    the reference corpus.
+
+    Examples:
+    =========
+    .. code-block:: python
+        >>> corp = MainCorpus('крепкий', 1, out='kwic')
+        >>> collocations(corp, left=3, right=3, count=10)
+        [Collocation(collocate='чай', frequency=7, ...), ...]
+
+    :param corpus: Corpus or ExampleStore.
+    :param left: int, count of the tokens before the node in the window.
+    :param right: int, count of the tokens after the node in the window.
+    :param measure: str, one of MEASURES, the collocates are
+     sorted by it in descending order.
+    :param min_frequency: int, min count of the collocate in the windows.
+    :param count: int, count of the collocates to return, all by default.
+    :param nodes: iterable of str, node words. By default they are
+     the centers of KWIC examples and the found wordforms in the other ones.
+    :return: list of Collocations.
+    :exception ValueError: if the measure is wrong or the window is negative.
+    """
+    _check_measure(measure)
+    data = getattr(corpus, 'data', corpus)
+    counts = cooccurrences(data, left, right, nodes)
+    if counts.window_size == 0:
+        return []
+
+    result = _measures(counts, min_frequency)
+    result.sort(key=lambda collocation: getattr(collocation, measure), reverse=True)
+    return result if count is None else result[:count]
+
+
+def batch_collocations(corpora: Iterable[Any],
+                       **kwargs: Any) -> List[List[Collocation]]:
+    """ Get the collocates of every corpus, see collocations.
+    Tokens of every corpus are got once, so the calls with
+    other windows or measures are cheap.
+
+    :param corpora: iterable of Corpus or ExampleStore.
+    :param kwargs: params of collocations.
+    :return: list of the collocations of every corpus.
+    :exception ValueError: if the measure is wrong or the window is negative.
+    """
+    _check_measure(kwargs.get('measure', 'log_likelihood'))
+    return [collocations(corpus, **kwargs) for corpus in corpora]
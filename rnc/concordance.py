@@ -0,0 +1,397 @@
+"""
+Module with the concordance of the examples: their tokens by
+context (left, center and right ones of KWIC examples), sorting
+the examples by the tokens at the levels like 'R1', counting the
+tokens at the levels and around the nodes (see rnc.collocations).
+"""
+
+__all__ = (
+    'ConcordanceIndex',
+    'Cooccurrences',
+    'sort_concordance',
+    'level_counts',
+    'collocates',
+    'cooccurrences',
+)
+
+import logging
+import re
+from array import array
+from collections import Counter
+from itertools import chain
+from typing import Any, Iterable, List, NamedTuple, Optional, Tuple
+
+import rnc.examples as expl
+from rnc.example_store import Columns, ExampleStore, StoreIndex, StringTable, _grow
+from rnc.tokens import tokenize
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+logger = logging.getLogger("rnc")
+
+
+class Cooccurrences(NamedTuple):
+    # tokens by their ids and counts of them: in the
+    # windows around the nodes and in the whole examples
+    vocabulary: StringTable
+    window_counts: Any
+    token_counts: Any
+    window_size: int
+    size: int
+
+
+class ConcordanceIndex(StoreIndex):
+    """ Tokens (see rnc.tokens) of the left, center and right
+    contexts of KWIC examples by row, kept in one flat array. Other
+    examples have only the center context, it is their text.
+
+    Tokens are replaced with their ids in the vocabulary and
+    sorted by rank, position of the token in the sorted vocabulary.
+
+    Levels to sort and count by are positions of the tokens:
+    'L1' is the last token of the left context, 'R1' is the first
+    token of the right one, 'C' or 'C1' is the first token of the
+    center one.
+    """
+    CONTEXTS = ('left', 'center', 'right')
+    LEVEL_PATTERN = re.compile(r'([LCR])(\d*)')
+
+    def __init__(self,
+                 columns: Columns) -> None:
+        super().__init__(columns)
+        self.vocabulary = StringTable()
+        self.tokens = array('i')
+        # start and count of the tokens of every context by row
+        self.starts = {context: array('q') for context in self.CONTEXTS}
+        self.counts = {context: array('i') for context in self.CONTEXTS}
+        # ranks of the tokens by their ids, they
+        # are got again when the vocabulary grows
+        self._ranks: List[int] = []
+
+    def _contexts(self,
+                  row: int,
+                  kwic: bool) -> Tuple[str, ...]:
+        columns = self._columns
+        if row in columns.overflow:
+            texts = tuple(map(str, columns.overflow[row]._to_row()[0]))
+        else:
+            texts = columns.texts(row)
+
+        if kwic:
+            return texts
+        return '', ' '.join(texts), ''
+
+    def add(self,
+            row: int) -> None:
+        self.add_rows((row, ))
+
+    def add_rows(self,
+                 rows: Iterable[int]) -> None:
+        for context in self.CONTEXTS:
+            _grow(self.starts[context], len(self._columns))
+            _grow(self.counts[context], len(self._columns))
+
+        columns, intern = self._columns, self.vocabulary.intern
+        kwic_types = [issubclass(ex_type, expl.KwicExample) for ex_type in columns.types]
+        contexts = [
+            (self.starts[context], self.counts[context])
+            for context in self.CONTEXTS
+        ]
+
+        # ids are collected to the list and added to the array at once
+        ids: List[int] = []
+        offset = len(self.tokens)
+        for row in rows:
+            texts = self._contexts(row, kwic_types[columns.row_type[row]])
+            for (starts, counts), text in zip(contexts, texts):
+                tokens = tokenize(text)
+                starts[row] = offset + len(ids)
+                counts[row] = len(tokens)
+                ids += map(intern, tokens)
+        self.tokens.extend(ids)
+
+    def discard(self,
+                row: int) -> None:
+        # tokens of the row are added again if it is changed
+        pass
+
+    def discard_rows(self,
+                     rows: Iterable[int]) -> None:
+        pass
+
+    @classmethod
+    def parse_level(cls,
+                    level: str) -> Tuple[str, int]:
+        """ Get context and position of the level like 'R1'.
+
+        :exception ValueError: if the level is wrong.
+        """
+        match = cls.LEVEL_PATTERN.fullmatch(str(level).upper())
+        position = int(match.group(2) or 0) if match else 0
+        if match is None or (position == 0 and match.group(1) != 'C'):
+            msg = f"Level like 'L1', 'C' or 'R2' expected, but '{level}' found"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        context = cls.CONTEXTS['LCR'.index(match.group(1))]
+        return context, position or 1
+
+    def ranks(self) -> List[int]:
+        """ Get ranks of the tokens by their ids. """
+        vocabulary = self.vocabulary
+        if len(self._ranks) != len(vocabulary):
+            ranks = [0] * len(vocabulary)
+            for rank, token in enumerate(sorted(range(len(vocabulary)), key=vocabulary.__getitem__)):
+                ranks[token] = rank
+            self._ranks = ranks
+        return self._ranks
+
+    def level_ids(self,
+                  rows: array,
+                  level: str) -> Any:
+        """ Get ids of the tokens at the level, -1 if the context
+        is shorter.
+
+        :return: NumPy array if it is installed, list otherwise.
+        :exception ValueError: if the level is wrong.
+        """
+        context, position = self.parse_level(level)
+        # the left context is read from its end
+        from_end = context == 'left'
+
+        if np is not None:
+            rows_np = np.frombuffer(rows, dtype=np.longlong)
+            starts = np.frombuffer(self.starts[context], dtype=np.longlong)[rows_np]
+            counts = np.frombuffer(self.counts[context], dtype=np.intc)[rows_np]
+            valid = counts >= position
+            indexes = starts + counts - position if from_end else starts + position - 1
+
+            ids = np.full(len(rows_np), -1, dtype=np.intc)
+            ids[valid] = np.frombuffer(self.tokens, dtype=np.intc)[indexes[valid]]
+            return ids
+
+        starts, counts, tokens = self.starts[context], self.counts[context], self.tokens
+        return [
+            tokens[starts[row] + (counts[row] - position if from_end else position - 1)]
+            if counts[row] >= position else -1
+            for row in rows
+        ]
+
+    def sort(self,
+             rows: array,
+             levels: Tuple[str, ...],
+             reverse: bool = False) -> array:
+        """ Get the rows sorted by the levels, the first level is
+        the main one. Stable, the examples without the token at
+        the level are the least ones.
+
+        :exception ValueError: if a level is wrong or there are no levels.
+        """
+        if not levels:
+            msg = "At least one level to sort by expected"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        # the last rank means 'no token'
+        ranks = self.ranks() + [-1]
+        if np is not None:
+            ranks_np = np.array(ranks, dtype=np.intc)
+            keys = [ranks_np[self.level_ids(rows, level)] for level in reversed(levels)]
+            if reverse:
+                keys = [-key for key in keys]
+            rows_np = np.frombuffer(rows, dtype=np.longlong)
+            return array('q', rows_np[np.lexsort(keys)].tobytes())
+
+        columns = [
+            [ranks[token] for token in self.level_ids(rows, level)]
+            for level in levels
+        ]
+        keys = list(zip(*columns))
+        indexes = sorted(range(len(rows)), key=keys.__getitem__, reverse=reverse)
+        return array('q', (rows[index] for index in indexes))
+
+    def _frequencies(self,
+                     ids: List[Any]) -> Counter:
+        """ Count the tokens by their ids, -1 is skipped. """
+        vocabulary = self.vocabulary
+        if np is not None:
+            values = np.concatenate(ids) if ids else np.array([], dtype=np.intc)
+            counts = np.bincount(values[values >= 0], minlength=len(vocabulary))
+            tokens = np.flatnonzero(counts)
+            return Counter(dict(zip(vocabulary.lookup(tokens.tolist()), counts[tokens].tolist())))
+
+        counter = Counter(chain.from_iterable(ids))
+        counter.pop(-1, None)
+        return Counter({vocabulary[token]: count for token, count in counter.items()})
+
+    def level_counts(self,
+                     rows: array,
+                     level: str) -> Counter:
+        """ Get frequencies of the tokens at the level.
+
+        :exception ValueError: if the level is wrong.
+        """
+        return self._frequencies([self.level_ids(rows, level)])
+
+    def collocates(self,
+                   rows: array,
+                   left: int = 5,
+                   right: int = 5) -> Counter:
+        """ Get frequencies of the tokens in the window: at
+        most left tokens of the left context and right tokens
+        of the right one.
+
+        :exception ValueError: if the window is negative.
+        """
+        if left < 0 or right < 0:
+            msg = f"Window must be >= 0, but '({left}, {right})' found"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        levels = [f"L{position}" for position in range(1, left + 1)]
+        levels += [f"R{position}" for position in range(1, right + 1)]
+        return self._frequencies([self.level_ids(rows, level) for level in levels])
+
+    def _node_ids(self,
+                  nodes: Optional[Iterable[str]]) -> List[int]:
+        """ Get ids of the node tokens, they are the tokens of
+        the found wordforms if the nodes are not given.
+        """
+        if nodes is None:
+            nodes = self._columns.wordform_table.lookup(range(len(self._columns.wordform_table)))
+        tokens = set(chain.from_iterable(map(tokenize, nodes)))
+        ids = map(self.vocabulary.get_id, tokens)
+        return sorted(token for token in ids if token >= 0)
+
+    def cooccurrences(self,
+                      rows: array,
+                      left: int = 5,
+                      right: int = 5,
+                      nodes: Optional[Iterable[str]] = None) -> Cooccurrences:
+        """ Count the tokens in the windows around the nodes and
+        all tokens of the rows. A window is at most left tokens
+        before the node and right tokens after it, in the same
+        example; the other nodes are not counted in it.
+
+        If the nodes are not given, they are the centers of KWIC
+        examples and the tokens of the found wordforms in the other ones.
+
+        :exception ValueError: if the window is negative.
+        """
+        if left < 0 or right < 0:
+            msg = f"Window must be >= 0, but '({left}, {right})' found"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        columns = self._columns
+        node_ids = self._node_ids(nodes)
+        kwic_types = [
+            nodes is None and issubclass(ex_type, expl.KwicExample)
+            for ex_type in columns.types
+        ]
+        shifts = list(chain(range(-left, 0), range(1, right + 1)))
+        # all contexts of a row follow each other in the tokens
+        left_starts, center_starts = self.starts['left'], self.starts['center']
+        center_counts = self.counts['center']
+        right_starts, right_counts = self.starts['right'], self.counts['right']
+
+        if np is not None:
+            rows_np = np.frombuffer(rows, dtype=np.longlong)
+            begins = np.frombuffer(left_starts, dtype=np.longlong)[rows_np]
+            ends = np.frombuffer(right_starts, dtype=np.longlong)[rows_np]
+            ends = ends + np.frombuffer(right_counts, dtype=np.intc)[rows_np]
+            lengths = ends - begins
+            size = int(lengths.sum())
+
+            # positions of the tokens of the rows one after another
+            offsets = np.cumsum(lengths) - lengths
+            positions = np.repeat(begins - offsets, lengths) + np.arange(size)
+            tokens = np.frombuffer(self.tokens, dtype=np.intc)[positions]
+            row_of = np.repeat(np.arange(len(rows_np)), lengths)
+
+            is_node = np.isin(tokens, np.array(node_ids, dtype=np.intc))
+            if any(kwic_types):
+                row_types = np.frombuffer(columns.row_type, dtype=np.uint8)[rows_np]
+                kwic = np.repeat(np.array(kwic_types, dtype=bool)[row_types], lengths)
+                center = positions - np.repeat(np.frombuffer(center_starts, dtype=np.longlong)[rows_np], lengths)
+                in_center = (center >= 0) & (center < np.repeat(np.frombuffer(center_counts, dtype=np.intc)[rows_np], lengths))
+                is_node = np.where(kwic, in_center, is_node)
+
+            node_at = np.flatnonzero(is_node)
+            windows = []
+            for shift in shifts:
+                at = node_at + shift
+                valid = (at >= 0) & (at < size)
+                at, node = at[valid], node_at[valid]
+                at = at[(row_of[at] == row_of[node]) & ~is_node[at]]
+                windows.append(tokens[at])
+
+            vocabulary_size = len(self.vocabulary)
+            window = np.concatenate(windows) if windows else np.array([], dtype=np.intc)
+            return Cooccurrences(
+                self.vocabulary, np.bincount(window, minlength=vocabulary_size),
+                np.bincount(tokens, minlength=vocabulary_size),
+                len(window), size)
+
+        node_set = set(node_ids)
+        window_counts = [0] * len(self.vocabulary)
+        token_counts = [0] * len(self.vocabulary)
+        window_size = size = 0
+        for row in rows:
+            begin, end = left_starts[row], right_starts[row] + right_counts[row]
+            tokens = self.tokens[begin:end]
+            if kwic_types[columns.row_type[row]]:
+                center = center_starts[row] - begin
+                node_at = range(center, center + center_counts[row])
+            else:
+                node_at = [index for index, token in enumerate(tokens) if token in node_set]
+
+            is_node = set(node_at)
+            for index in node_at:
+                for at in (index + shift for shift in shifts):
+                    if 0 <= at < len(tokens) and at not in is_node:
+                        window_counts[tokens[at]] += 1
+                        window_size += 1
+            for token in tokens:
+                token_counts[token] += 1
+            size += len(tokens)
+        return Cooccurrences(self.vocabulary, window_counts, token_counts, window_size, size)
+
+
+def sort_concordance(store: ExampleStore,
+                     *levels: str,
+                     reverse: bool = False) -> None:
+    """ Sort the examples of the store by tokens at
+    the levels like 'R1', 'L1', see ConcordanceIndex.sort.
+    """
+    index = store.get_index(ConcordanceIndex)
+    store.reorder(index.sort(store.row_ids(), levels, reverse))
+
+
+def level_counts(store: ExampleStore,
+                 level: str) -> Counter:
+    """ Get frequencies of the tokens at the level like 'R1'. """
+    return store.get_index(ConcordanceIndex).level_counts(store.row_ids(), level)
+
+
+def collocates(store: ExampleStore,
+               left: int = 5,
+               right: int = 5) -> Counter:
+    """ Get frequencies of the tokens around the center,
+    see ConcordanceIndex.collocates.
+    """
+    return store.get_index(ConcordanceIndex).collocates(store.row_ids(), left, right)
+
+
+def cooccurrences(store: ExampleStore,
+                  left: int = 5,
+                  right: int = 5,
+                  nodes: Optional[Iterable[str]] = None) -> Cooccurrences:
+    """ Count the tokens around the nodes and all tokens,
+    see ConcordanceIndex.cooccurrences.
+    """
+    index = store.get_index(ConcordanceIndex)
+    return index.cooccurrences(store.row_ids(), left, right, nodes)
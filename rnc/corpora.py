@@ -12,12 +12,16 @@ __all__ = (
 
     'SORT_KEYS',
     'SEARCH_FORMATS',
-    'OUTPUT_FORMATS'
+    'OUTPUT_FORMATS',
+    'set_base_url',
 )
 
 import asyncio
+import copy
 import csv
+import itertools
 import logging
+import math
 import os
 import random
 import re
@@ -25,22 +29,28 @@ import string
 import time
 import urllib.parse
 from abc import ABC, abstractmethod
-from collections import defaultdict
+from collections import Counter
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Callable, Generator, Iterator, List, Any, Optional, Tuple, Pattern, Union
+from typing import Dict, Callable, Generator, Iterable, Iterator, List, Any, Match, Optional, Tuple, Pattern, Union
 
 import bs4
 import ujson
 
 import rnc.corpora_requests as creq
 import rnc.examples as expl
-from rnc import corpora_params
+from rnc import concordance, corpora_params
+from rnc.collocations import Collocation, collocations
+from rnc.example_store import DocumentStats, ExampleStore, WordformIndex
+from rnc.lazy import LazyQuery
+from rnc.disk_writer import DiskWriter
+from rnc.media_store import MediaStore
+from rnc.planner import MAX_DPP, MAX_SPD, RequestPlan, plan_request
 
 logger = logging.getLogger("rnc")
 
 
-# Russian National Corpus URL
+# Russian National Corpus URL, see set_base_url
 RNC_URL = "https://processing.ruscorpora.ru/search.xml"
 BASE_RNC_URL = "https://processing.ruscorpora.ru"
 
@@ -88,6 +98,28 @@ def clean_text_up(text: str) -> str:
     return ' '.join(text.split()).strip()
 
 
+def set_base_url(url: str) -> str:
+    """ Set the URL of RNC, e.g. of the local mock server
+    (see rnc.mock_server), the requests are sent to it.
+
+    :param url: str, URL like 'http://127.0.0.1:8080'.
+    :return: str, the previous URL.
+    :exception ValueError: if the URL is not http(s) one.
+    """
+    global RNC_URL, BASE_RNC_URL
+
+    if not isinstance(url, str) or not url.startswith(('http://', 'https://')):
+        msg = f"URL must be str starting with 'http://' or 'https://', but '{url}' found"
+        logger.error(msg)
+        raise ValueError(msg)
+
+    previous = BASE_RNC_URL
+    BASE_RNC_URL = url.rstrip('/')
+    RNC_URL = f"{BASE_RNC_URL}/search.xml"
+    logger.debug(f"RNC URL is '{RNC_URL}'")
+    return previous
+
+
 def create_doc_url(doc_url: str) -> str:
     """ Create full url to document in RNC. Add https://... to the url. """
     if not doc_url:
@@ -172,6 +204,9 @@ class Corpus(ABC):
          1 – with, 0 – without. Optional, 0 by default.
          :keyword marker: function, with which found words will be marked.
          Optional.
+         :keyword load: bool, whether the data will be loaded if the file
+         exists. If not, the examples might be streamed from the file
+         with 'lazy'. Optional, True by default.
 
          :exception FileExistsError: if csv file is given but json file
          with config doesn't exist.
@@ -180,12 +215,10 @@ class Corpus(ABC):
          :exception NotImplementedError: if the corpus type in file isn't equal
          to corpus class type.
          """
-        # list of examples
-        self._data: List[expl.Example] = []
+        # examples
+        self._data = ExampleStore()
         # http tags to request
         self._params: Dict[str, Any] = {}
-        # found wordforms with their frequency
-        self._found_wordforms: Dict[str, int] = defaultdict(int)
         # query, wordforms to find
         self._query: Dict[str, Any] = {}
         # count of PAGES
@@ -193,6 +226,8 @@ class Corpus(ABC):
         # type of example should be defined before params init
         self._ex_type = kwargs.pop('ex_type', None)
         self._marker = kwargs.pop('marker', None)
+        # whether the data is not loaded from the file
+        self._stream_file = not kwargs.pop('load', True)
         # additional info from the first page:
         # amount of docs, contexts, where the query was found,
         # link to the graphic with distribution by years
@@ -315,7 +350,8 @@ class Corpus(ABC):
         # these params must be defined here too
         self._page_parser_and_ex_type()
 
-        self._data = self._load_data()
+        if not self._stream_file:
+            self._data = self._load_data()
         # add info about
         try:
             self._get_additional_info()
@@ -323,8 +359,8 @@ class Corpus(ABC):
             logger.warning("It is impossible to get "
                            f"additional info from RNC:\n{e}")
 
-    def _load_data(self) -> List:
-        """ Load data from csv file. """
+    def _iter_file(self) -> Iterator[expl.Example]:
+        """ Read examples from csv file one by one. """
         with self.file.open('r', encoding='utf-8') as f:
             dm = self._DATA_W_DELIMITER
             qch = self._DATA_W_QUOTCHAR
@@ -332,13 +368,12 @@ class Corpus(ABC):
             # first row contains headers, skip it
             next(reader)
 
-            data = [self.ex_type(*row) for row in reader]
-            wordforms = list(map(lambda example: example.found_wordforms,
-                                 data))
-            wordforms = sum(wordforms, [])
-            self._add_wordforms(wordforms)
+            for row in reader:
+                yield self.ex_type(*row)
 
-        return data
+    def _load_data(self) -> ExampleStore:
+        """ Load data from csv file. """
+        return ExampleStore(self._iter_file())
 
     def _load_params(self) -> Dict:
         """ Load request params from json file. """
@@ -523,8 +558,8 @@ class Corpus(ABC):
         ]
 
     @property
-    def data(self) -> List:
-        """ Get list of all examples """
+    def data(self) -> ExampleStore:
+        """ Get all examples """
         return self._data
 
     @property
@@ -564,8 +599,26 @@ class Corpus(ABC):
 
     @property
     def found_wordforms(self) -> Dict[str, int]:
-        """ Get info about found wordforms, {form: frequency}. """
-        return self._found_wordforms
+        """ Get info about found wordforms, {form: frequency}.
+
+        Wordforms are stripped and lowercased, the frequencies
+        are kept up to date while the data is changing.
+        """
+        return self._data.get_index(WordformIndex).counts()
+
+    def most_common_wordforms(self,
+                              count: Optional[int] = None) -> List[Tuple[str, int]]:
+        """ Get the most common found wordforms with their frequency,
+        all of them if the count is None.
+        """
+        return self._data.get_index(WordformIndex).most_common(count)
+
+    def wordform_frequency(self,
+                           form: str) -> float:
+        """ Get relative frequency of the found wordform, means
+        its frequency divided by the count of all found wordforms.
+        """
+        return self._data.get_index(WordformIndex).frequency(form)
 
     @property
     def url(self) -> str:
@@ -773,16 +826,6 @@ class Corpus(ABC):
                 logger.error(msg)
                 raise ValueError(msg)
 
-    def _add_wordforms(self,
-                       forms: List[str]) -> None:
-        """ Add found wordforms to counter. """
-        if not forms:
-            return
-
-        for form in forms:
-            form = clean_text_up(form).lower()
-            self._found_wordforms[form] += 1
-
     @abstractmethod
     def _parse_doc(self,
                    doc: bs4.element.Tag) -> Any:
@@ -856,7 +899,6 @@ class Corpus(ABC):
         for left, center, right in zip(nobr[::3], nobr[1::3], nobr[2::3]):
             new_ex = self._parse_kwic_example(left, center, right)
             res += [new_ex]
-            self._add_wordforms(new_ex.found_wordforms)
         return res
 
     def _parse_page_normal(self,
@@ -876,20 +918,19 @@ class Corpus(ABC):
         return res
 
     def _parse_all_pages(self,
-                         pages: List[str]) -> List:
+                         pages: List[str]) -> ExampleStore:
         """ Parse all pages. """
-        parsed = [
-            self._page_parser(page) # type: ignore
-            for page in pages
-        ]
-        return sum(parsed, [])
+        parsed = ExampleStore()
+        for page in pages:
+            parsed.extend(self._page_parser(page)) # type: ignore
+        return parsed
 
     def _data_to_csv(self) -> None:
         """ Dump the data to csv file.
         Here it is assumed that the data exist.
         """
         data = [
-            example.items
+            example.row
             for example in self.data
         ]
         columns = self[0].columns
@@ -991,7 +1032,7 @@ class Corpus(ABC):
             logger.debug("Parsing completed")
             logger.info(f"Parsing time: {parsing_stop - parsing_start:.2f}")
             logger.info(f"Overall time: {parsing_stop - start:.2f}")
-            self._data = parsed[:]
+            self._data = parsed
 
     async def request_examples_async(self) -> None:
         """ Request examples, parse them and update the data.
@@ -1053,29 +1094,318 @@ class Corpus(ABC):
             logger.debug("Parsing completed")
             logger.info(f"Parsing time: {parsing_stop - parsing_start:.2f}")
             logger.info(f"Overall time: {parsing_stop - start:.2f}")
-            self._data = parsed[:]
+            self._data = parsed
+
+    def _start_plan(self,
+                    examples: Optional[int],
+                    docs: Optional[int]) -> None:
+        """ Check the counts and set the largest dpp and spd.
+
+        :exception RuntimeError: if the data still exist.
+        :exception ValueError: if there is neither examples
+         nor docs or a count is wrong.
+        """
+        if self.data:
+            logger.error("Tried to request new examples, however data exist")
+            raise RuntimeError("Data still exist")
+
+        plan_request(None, None, examples, docs)
+        self._params['dpp'], self._params['spd'] = MAX_DPP, MAX_SPD
+
+    def _next_plan_stop(self,
+                        plan: RequestPlan,
+                        parsed: ExampleStore,
+                        p_count: int,
+                        examples: Optional[int]) -> int:
+        """ Get the page to request the pages up to, if the
+        examples are not enough. Count of the examples on the
+        next pages is expected to be the same.
+        """
+        if not examples or len(parsed) >= examples or not parsed:
+            return p_count
+        if plan.max_p_count is None or p_count >= plan.max_p_count:
+            return p_count
+
+        per_page = len(parsed) / p_count
+        more = math.ceil((examples - len(parsed)) / per_page)
+        return min(p_count + more, plan.max_p_count)
+
+    def _finish_plan(self,
+                     parsed: ExampleStore,
+                     p_count: int,
+                     examples: Optional[int]) -> None:
+        if examples is not None:
+            del parsed[examples:]
+        self._p_count = p_count
+        self._data = parsed
+        logger.info(f"{len(parsed)} examples got from {p_count} pages")
+
+    def request_examples_planned(self,
+                                 examples: Optional[int] = None,
+                                 docs: Optional[int] = None) -> RequestPlan:
+        """ Request the examples or the documents with the
+        fewest requests, instead of the given count of pages.
+
+        The first page is requested with the largest dpp and spd,
+        amounts of the found docs and contexts on it give the count
+        of pages (see rnc.planner.plan_request). If the pages give
+        fewer examples than expected, some more pages are requested.
+
+        Examples:
+        =========
+        .. code-block:: python
+            >>> corp = MainCorpus('кот', 1)
+            >>> corp.request_examples_planned(examples=5000)
+            RequestPlan(dpp=50, spd=50, p_count=..., ...)
+
+        :param examples: int, count of examples to get, the extra
+         ones are removed.
+        :param docs: int, count of documents to get.
+        :return: RequestPlan, the plan got by the first page.
+
+        :exception RuntimeError: if the data still exist.
+        :exception ValueError: if there is neither examples
+         nor docs or a count is wrong.
+        """
+        self._start_plan(examples, docs)
+        try:
+            first, _ = creq.is_request_correct(RNC_URL, 1, **self.params)
+        except creq.BaseRequestError as e:
+            msg = f"Query = {self.forms_in_query}, {self.params}\ne = {e}"
+            logger.error(msg)
+            raise
+
+        if self.out == 'normal':
+            self._get_additional_info(first)
+        else:
+            self._get_additional_info()
+        plan = plan_request(self.amount_of_docs, self.amount_of_contexts, examples, docs)
+        logger.info(f"Request plan: {plan}")
+
+        parsed, p_count = self._parse_all_pages([first]), 1
+        stop = plan.p_count
+        while stop > p_count:
+            htmls = creq.get_htmls(RNC_URL, p_count, stop, **self.params)
+            parsed.extend(self._parse_all_pages(htmls))
+            p_count = stop
+            stop = self._next_plan_stop(plan, parsed, p_count, examples)
+
+        self._finish_plan(parsed, p_count, examples)
+        return plan
+
+    async def request_examples_planned_async(self,
+                                             examples: Optional[int] = None,
+                                             docs: Optional[int] = None) -> RequestPlan:
+        """ Request the examples or the documents with the fewest
+        requests in the running event loop, see request_examples_planned.
+
+        :exception RuntimeError: if the data still exist.
+        :exception ValueError: if there is neither examples
+         nor docs or a count is wrong.
+        """
+        self._start_plan(examples, docs)
+        try:
+            first, _ = await creq.is_request_correct_async(RNC_URL, 1, **self.params)
+        except creq.BaseRequestError as e:
+            msg = f"Query = {self.forms_in_query}, {self.params}\ne = {e}"
+            logger.error(msg)
+            raise
+
+        if self.out == 'normal':
+            await self._get_additional_info_async(first)
+        else:
+            await self._get_additional_info_async()
+        plan = plan_request(self.amount_of_docs, self.amount_of_contexts, examples, docs)
+        logger.info(f"Request plan: {plan}")
+
+        parsed, p_count = self._parse_all_pages([first]), 1
+        stop = plan.p_count
+        while stop > p_count:
+            htmls = await creq.get_htmls_async(RNC_URL, p_count, stop, **self.params)
+            parsed.extend(self._parse_all_pages(htmls))
+            p_count = stop
+            stop = self._next_plan_stop(plan, parsed, p_count, examples)
+
+        self._finish_plan(parsed, p_count, examples)
+        return plan
+
+    def _check_max_pages(self,
+                         max_pages: Optional[int]) -> None:
+        """
+        :exception RuntimeError: if the data still exist.
+        :exception ValueError: if max_pages is not a positive int.
+        """
+        if self.data:
+            logger.error("Tried to request new examples, however data exist")
+            raise RuntimeError("Data still exist")
+        if max_pages is not None and (not isinstance(max_pages, int) or max_pages <= 0):
+            msg = f"Max pages must be int > 0, but '{max_pages}' found"
+            logger.error(msg)
+            raise ValueError(msg)
+
+    def _estimate_p_count(self,
+                          first_page: str) -> int:
+        """ Estimate count of the pages by the pager of the first
+        page and amount of the found docs.
+        """
+        estimate = creq.pager_max_page(first_page) or 1
+        if self.amount_of_docs:
+            estimate = max(estimate, math.ceil(self.amount_of_docs / int(self.params['dpp'])))
+        return estimate
+
+    def _missing_pages(self,
+                       last: int,
+                       pages: Dict[int, str]) -> List[Dict[str, Any]]:
+        return [
+            {**self.params, 'p': p_index}
+            for p_index in range(last + 1)
+            if p_index not in pages
+        ]
+
+    def _finish_all_pages(self,
+                          last: int,
+                          pages: Dict[int, str],
+                          htmls: List[Optional[str]]) -> None:
+        missing = (p_index for p_index in range(last + 1) if p_index not in pages)
+        for p_index, html in zip(missing, htmls):
+            if html is None:
+                logger.warning(f"Page {p_index} not received")
+            else:
+                pages[p_index] = html
+
+        self._data = self._parse_all_pages([pages[p_index] for p_index in sorted(pages)])
+        self._p_count = last + 1
+        logger.info(f"{len(self.data)} examples got from {len(pages)} pages")
+
+    def request_all_examples(self,
+                             max_pages: Optional[int] = None) -> None:
+        """ Request examples from all the pages RNC has, but
+        not more than max_pages, instead of the given count of pages.
+
+        Count of the pages is estimated by the pager and amount
+        of the docs on the first page, then the last page is found
+        in O(log n) requests (see rnc.corpora_requests.last_page_probes).
+        The other pages are requested at once.
+
+        :param max_pages: int, max count of pages to request, all by default.
+        :return: None.
+
+        :exception RuntimeError: if the data still exist.
+        :exception ValueError: if max_pages is not a positive int.
+        """
+        self._check_max_pages(max_pages)
+
+        try:
+            first, _ = creq.is_request_correct(RNC_URL, 1, **self.params)
+        except creq.BaseRequestError as e:
+            msg = f"Query = {self.forms_in_query}, {self.params}\ne = {e}"
+            logger.error(msg)
+            raise
+
+        if self.out == 'normal':
+            self._get_additional_info(first)
+        else:
+            self._get_additional_info()
+
+        last, pages = creq.find_last_page(
+            RNC_URL, first, self._estimate_p_count(first), max_pages, **self.params)
+        htmls = creq.fetch_pages(RNC_URL, self._missing_pages(last, pages))
+        self._finish_all_pages(last, pages, htmls)
+
+    async def request_all_examples_async(self,
+                                         max_pages: Optional[int] = None) -> None:
+        """ Request examples from all the pages RNC has in the
+        running event loop, see request_all_examples.
+
+        :exception RuntimeError: if the data still exist.
+        :exception ValueError: if max_pages is not a positive int.
+        """
+        self._check_max_pages(max_pages)
+
+        try:
+            first, _ = await creq.is_request_correct_async(RNC_URL, 1, **self.params)
+        except creq.BaseRequestError as e:
+            msg = f"Query = {self.forms_in_query}, {self.params}\ne = {e}"
+            logger.error(msg)
+            raise
+
+        if self.out == 'normal':
+            await self._get_additional_info_async(first)
+        else:
+            await self._get_additional_info_async()
+
+        last, pages = await creq.find_last_page_async(
+            RNC_URL, first, self._estimate_p_count(first), max_pages, **self.params)
+        htmls = await creq.fetch_pages_async(RNC_URL, self._missing_pages(last, pages))
+        self._finish_all_pages(last, pages, htmls)
 
     def copy(self) -> Any:
-        copy_obj = self.__class__(
-            self.query, self.p_count, file=self.file,
-            marker=self.marker, **self.params)
-        copy_obj._data = self.data.copy()
+        """ Get the corpus with the same params and data.
+
+        The init method is not called, so the params are not
+        checked again and the file is not read. The data is
+        shared until one of the corpora changes it.
+        """
+        copy_obj = self.__class__.__new__(self.__class__)
+        copy_obj._data = self._data.copy()
+        copy_obj._params = dict(self._params)
+        copy_obj._query = copy.deepcopy(self._query)
+        copy_obj._p_count = self._p_count
+        copy_obj._ex_type = self._ex_type
+        copy_obj._marker = self._marker
+        copy_obj._stream_file = self._stream_file
+        copy_obj._add_info = copy.deepcopy(self._add_info)
+        copy_obj._csv_path = self._csv_path
+        copy_obj._config_path = self._config_path
+        copy_obj._page_parser = self._page_parser
+        if self._params:
+            # bind the page parser to the new obj
+            copy_obj._page_parser_and_ex_type()
         return copy_obj
 
+    def lazy(self) -> LazyQuery:
+        """ Get the lazy query over the examples (see LazyQuery).
+
+        If the corpus was created with 'load=False' and
+        has no data, the examples are streamed from the file.
+        """
+        return LazyQuery(self)
+
+    def _iter_examples(self) -> Iterator[expl.Example]:
+        """ Get the examples from the data or from the file. """
+        if self._stream_file and not self._data:
+            return self._iter_file()
+        return iter(self._data)
+
+    def _with_examples(self,
+                       examples: Iterable[expl.Example]) -> Any:
+        """ Get the copy of the corpus with the examples as data. """
+        new_obj = self.copy()
+        new_obj._data = ExampleStore(examples)
+        new_obj._stream_file = False
+        return new_obj
+
     def sort_data(self,
                   **kwargs) -> None:
         """ Sort the data by using a key.
 
         :keyword key: func to sort, called to Example objects,
         by default – len.
+        :keyword by: str, field of the source to sort by instead
+         of the key: 'author', 'title', 'year' or 'genre'.
+         The examples are not created, see ExampleStore.sort_by.
         :keyword reverse: bool, whether the data will sort in reversed order,
          by default – False.
 
         :exception TypeError: if the key is uncallable.
+        :exception ValueError: if there is no such source field.
         """
         key = kwargs.pop('key', lambda example: len(example))
         reverse = kwargs.pop('reverse', False)
 
+        if 'by' in kwargs:
+            self._data.sort_by(kwargs.pop('by'), reverse=reverse)
+            return
         if not callable(key):
             logger.error("Given uncallable key to sort")
             raise TypeError("Sort key must be callable")
@@ -1088,7 +1418,7 @@ class Corpus(ABC):
 
     def shuffle(self) -> None:
         """ Shuffle list of examples. """
-        random.shuffle(self._data)
+        self._data.shuffle()
 
     def clear(self) -> None:
         """ Clear examples list. """
@@ -1102,30 +1432,243 @@ class Corpus(ABC):
         objects inside the data list.
         :return: None.
         """
-        filtered_data = list(filter(key, self.data))
-        self._data = filtered_data[:]
+        self._data.filter(key)
+
+    def filter_by(self,
+                  **conditions: Any) -> None:
+        """ Remove the examples which sources do not satisfy
+        all the conditions. Sources are parsed once and the
+        examples are not created (see rnc.sources).
+
+        Examples:
+        =========
+        .. code-block:: python
+            >>> corp.filter_by(author='Л. Н. Толстой', min_year=1860)
+            >>> corp.filter_by(genre={'роман', 'повесть'})
+
+        :keyword author: str or collection of str.
+        :keyword title: str or collection of str.
+        :keyword genre: str or collection of str.
+        :keyword year: int, year of the source.
+        :keyword min_year: int, the first year, inclusive.
+        :keyword max_year: int, the last year, inclusive.
+        :return: None.
+        :exception ValueError: if there is no such source field.
+        """
+        self._data.filter_by(**conditions)
+
+    def source_column(self,
+                      field: str) -> Any:
+        """ Get values of the source field of all examples.
+
+        :param field: str, 'author', 'title', 'year' or 'genre'.
+        :return: NumPy array if it is installed, list otherwise.
+         Years are int, 0 if unknown, other fields are str.
+        :exception ValueError: if there is no such source field.
+        """
+        return self._data.source_column(field)
+
+    def year_counts(self) -> Dict[int, int]:
+        """ Get count of the examples by year of their
+        sources, unknown years are skipped.
+        """
+        return self._data.year_counts()
+
+    def sort_concordance(self,
+                         *levels: str,
+                         reverse: bool = False) -> None:
+        """ Sort KWIC examples by the tokens at the levels, the
+        first level is the main one. Contexts are split to tokens
+        once (see rnc.concordance), tokens are compared
+        lowercased, without punctuation.
+
+        Examples:
+        =========
+        .. code-block:: python
+            >>> corp = MainCorpus(..., out='kwic')
+            # by the first word to the right, then by the second one
+            # and by the last word to the left
+            >>> corp.sort_concordance('R1', 'R2', 'L1')
+
+        :param levels: str, 'L1' is the last token of the left
+         context, 'R1' is the first token of the right one,
+         'C' is the first token of the center one.
+        :param reverse: bool, whether the data will sort in reversed order.
+        :return: None.
+        :exception ValueError: if a level is wrong or there are no levels.
+        """
+        concordance.sort_concordance(self._data, *levels, reverse=reverse)
+
+    def level_counts(self,
+                     level: str) -> Counter:
+        """ Get frequencies of the tokens at the level
+        like 'R1' of KWIC examples, see sort_concordance.
+
+        :exception ValueError: if the level is wrong.
+        """
+        return concordance.level_counts(self._data, level)
+
+    def collocates(self,
+                   left: int = 5,
+                   right: int = 5) -> Counter:
+        """ Get frequencies of the tokens around the center of
+        KWIC examples: at most left tokens to the left and right
+        tokens to the right.
+
+        :exception ValueError: if the window is negative.
+        """
+        return concordance.collocates(self._data, left, right)
+
+    def collocations(self,
+                     left: int = 5,
+                     right: int = 5,
+                     measure: str = 'log_likelihood',
+                     min_frequency: int = 1,
+                     count: Optional[int] = None,
+                     nodes: Optional[Iterable[str]] = None) -> List[Collocation]:
+        """ Get the collocates of the node words with their MI,
+        t-score and log-likelihood, see rnc.collocations.collocations.
+        Node words are the centers of KWIC examples and the
+        found wordforms of the other ones by default.
+
+        :exception ValueError: if the measure is wrong or the window is negative.
+        """
+        return collocations(self, left, right, measure, min_frequency, count, nodes)
+
+    def count_documents(self) -> int:
+        """ Get count of the distinct documents (by doc_url)
+        of the examples. Unlike 'amount_of_docs' it is counted
+        over the data, not got from RNC.
+        """
+        return self._data.count_documents()
+
+    def document_stats(self) -> List[DocumentStats]:
+        """ Get doc_url, source, count of the examples and of
+        the found wordforms of every document.
+        """
+        return self._data.document_stats()
+
+    def iter_documents(self) -> Generator[Tuple[str, List[expl.Example]], None, None]:
+        """ Yield doc_url and the examples of every document.
+        Documents are in the order they appeared in the data
+        (i.e. in the order they were parsed).
+        """
+        for doc_url, examples in self._data.iter_documents():
+            yield doc_url, list(examples)
+
+    def sample_documents(self,
+                         count: int = 1) -> Any:
+        """ Get the corpus with at most count random examples
+        of every document, to balance the data by documents.
+
+        :exception ValueError: if the count is not a positive number.
+        """
+        new_obj = self.copy()
+        new_obj._data = self._data.sample_documents(count)
+        return new_obj
+
+    def deduplicate(self) -> int:
+        """ Remove duplicate examples, keep the first ones.
+
+        :return: int, count of removed examples.
+        """
+        return self._data.deduplicate()
+
+    def _check_same_type(self,
+                         other: Any) -> None:
+        """ Check the other obj is a Corpus of the same class
+        with the same examples type.
+
+        :exception TypeError: if it is not.
+        """
+        if other.__class__ is not self.__class__ or other.ex_type is not self.ex_type:
+            msg = f"'{self.__class__.__name__}' with '{self.ex_type}' " \
+                  f"expected, but '{other.__class__.__name__}' found"
+            logger.error(msg)
+            raise TypeError(msg)
+
+    def union(self,
+              other: Any) -> Any:
+        """ Create new obj with distinct examples from both corpora.
+        Examples of this corpus go first.
+
+        :exception TypeError: if the other obj has another type.
+        """
+        self._check_same_type(other)
+        new_obj = self.copy()
+        new_obj._data = self.data.union(other.data)
+        return new_obj
+
+    def intersection(self,
+                     other: Any) -> Any:
+        """ Create new obj with distinct examples
+        from this corpus, which are in the other one too.
+
+        :exception TypeError: if the other obj has another type.
+        """
+        self._check_same_type(other)
+        new_obj = self.copy()
+        new_obj._data = self.data.intersection(other.data)
+        return new_obj
+
+    def difference(self,
+                   other: Any) -> Any:
+        """ Create new obj with distinct examples
+        from this corpus, which are not in the other one.
+
+        :exception TypeError: if the other obj has another type.
+        """
+        self._check_same_type(other)
+        new_obj = self.copy()
+        new_obj._data = self.data.difference(other.data)
+        return new_obj
 
     def findall(self,
                 pattern: Union[Pattern, str],
                 *args) -> Generator[Tuple[expl.Example, List[str]], None, None]:
         """ Apply the pattern to the examples' text with re.findall.
         Yield all examples which are satisfy the pattern and match.
+
+        The pattern is compiled once. If it requires some
+        literals, only the examples containing them are
+        checked, the text index is used to find them.
         """
-        for example in self:
-            match = re.findall(pattern, example.txt, *args)
+        pattern = re.compile(pattern, *args)
+        for example in self._data.regex_candidates(pattern):
+            match = pattern.findall(example.txt)
             if match:
                 yield example, match
 
     def finditer(self,
                  pattern: Union[Pattern, str],
-                 *args) -> Generator[Tuple[expl.Example, Any], None, None]:
+                 *args) -> Generator[Tuple[expl.Example, Iterator[Match]], None, None]:
         """ Apply the pattern to the examples' text with re.finditer.
         Yield all examples which are satisfy the pattern and match.
+
+        The pattern is compiled once, the examples
+        are got like in findall.
         """
-        for example in self:
-            match = re.finditer(pattern, example.txt, *args)
-            if match:
-                yield example, match
+        pattern = re.compile(pattern, *args)
+        for example in self._data.regex_candidates(pattern):
+            match = pattern.finditer(example.txt)
+            first = next(match, None)
+            if first is not None:
+                yield example, itertools.chain((first, ), match)
+
+    def find_word(self,
+                  word: str) -> Generator[expl.Example, None, None]:
+        """ Yield all examples containing the word,
+        case is ignored. The text index is used.
+        """
+        yield from self._data.find_word(word)
+
+    def find_phrase(self,
+                    phrase: str) -> Generator[expl.Example, None, None]:
+        """ Yield all examples containing the words of the phrase
+        one by one, case and punctuation are ignored.
+        The text index is used.
+        """
+        yield from self._data.find_phrase(phrase)
 
     def __repr__(self) -> str:
         """ Format:
@@ -1193,10 +1736,22 @@ class Corpus(ABC):
                   f"objects, but '{item.__class__.__name__}' found"
             logger.error(msg)
             raise TypeError(msg)
-        return any(
-            item == example
-            for example in self.data
-        )
+        return item in self.data
+
+    def __or__(self,
+               other: Any) -> Any:
+        """ All the same to union() """
+        return self.union(other)
+
+    def __and__(self,
+                other: Any) -> Any:
+        """ All the same to intersection() """
+        return self.intersection(other)
+
+    def __sub__(self,
+                other: Any) -> Any:
+        """ All the same to difference() """
+        return self.difference(other)
 
     def __getattr__(self,
                     item: str) -> Optional[Union[str, int, List]]:
@@ -1220,7 +1775,8 @@ class Corpus(ABC):
              >>> corp = MainCorpus(...)
              # get second example (1 is index, not number!)
              >>> corp[1]
-             # create new copus with the first 50 example
+             # create new copus with the first 50 example,
+             # the data is not copied (see ExampleStore)
              >>> new_corp = corp[:50]
 
         :return: one example or new obj with the same class and sliced data.
@@ -1234,9 +1790,8 @@ class Corpus(ABC):
         if isinstance(item, int):
             return self.data[item]
 
-        new_data = self.data[item]
         new_obj = self.copy()
-        new_obj._data = new_data.copy()
+        new_obj._data = self._data[item]
         return new_obj
 
     def __setitem__(self,
@@ -1321,7 +1876,6 @@ class MainCorpus(Corpus):
         for example in doc.find_all('li'):
             new_ex: expl.MainExample = self._parse_example(example) # type: ignore
             res += [new_ex]
-            self._add_wordforms(new_ex.found_wordforms)
         return res
 
 
@@ -1424,13 +1978,13 @@ class ParallelCorpus(Corpus):
         for example in doc.find_all('table', {'class': 'para'}):
             new_ex = self._parse_example(example)
             res += [new_ex]
-            self._add_wordforms(new_ex.found_wordforms)
         return res
 
-    def _load_data(self) -> List:
-        """ Load data from csv file. """
+    def _iter_file(self) -> Iterator[expl.Example]:
+        """ Read examples from csv file one by one. """
         if self.out == 'kwic':
-            return super()._load_data()
+            yield from super()._iter_file()
+            return
 
         with self.file.open('r', encoding='utf-8') as f:
             dm = self._DATA_W_DELIMITER
@@ -1440,7 +1994,6 @@ class ParallelCorpus(Corpus):
             columns = next(reader)
             end_lang_tags = columns.index('source')
             lang_tags = columns[:end_lang_tags]
-            data = []
 
             for row in reader:
                 # to create dict {lang: text in the lang}
@@ -1448,12 +2001,7 @@ class ParallelCorpus(Corpus):
                 for num, lang in enumerate(lang_tags):
                     langs[lang] = row[num]
 
-                new_ex = self.ex_type(langs, *row[end_lang_tags:])
-                data += [new_ex]
-
-                self._add_wordforms(new_ex.found_wordforms)
-
-        return data
+                yield self.ex_type(langs, *row[end_lang_tags:])
 
 
 class MultilingualParaCorpus(ParallelCorpus):
@@ -1568,30 +2116,164 @@ class MultimodalCorpus(Corpus):
 
         new_ex = self.ex_type(*data_from_example, media_url, filename)
         new_ex.mark_found_words(self.marker)
-        self._add_wordforms(new_ex.found_wordforms)
         examples += [new_ex]
 
         return examples
 
-    def download_all(self) -> None:
-        """ Download all files. """
+    def download_all(self,
+                     store: Optional[MediaStore] = None,
+                     writer: Optional[DiskWriter] = None,
+                     probe: bool = False,
+                     progress: Optional[Callable[[creq.MediaProgress], Any]] = None) -> List[Tuple[str, str]]:
+        """ Download all files, the complete ones are skipped
+        and the partial ones are resumed (see creq.download_docs).
+
+        :param store: MediaStore, if it is given, every distinct file
+         is downloaded to the store once and the files of the examples
+         are links to it.
+        :param writer: DiskWriter, writer of the content: buffer size,
+         count of threads and fsync (see rnc.disk_writer).
+        :param probe: bool, whether to request sizes of the files and
+         download the largest ones first, it is not used with the store.
+        :param progress: func to call with creq.MediaProgress: received
+         bytes and speed of every file and of all the files, it is not
+         used with the store.
+        :return: list of pairs url – filename of the files, which are
+         not downloaded, the next call downloads them again.
+        """
         os.makedirs(self.MEDIA_FOLDER, exist_ok=True)
 
         urls_to_names = [
             (example._media_url, example.filepath)
             for example in self
         ]
-        creq.download_docs(urls_to_names)
-
-    async def download_all_async(self) -> None:
-        """ Download all files. """
+        if store is None:
+            return creq.download_docs(urls_to_names, writer, probe, progress)
+        store.download(urls_to_names, writer=writer)
+        return self._not_stored(store, urls_to_names)
+
+    async def download_all_async(self,
+                                 store: Optional[MediaStore] = None,
+                                 writer: Optional[DiskWriter] = None,
+                                 probe: bool = False,
+                                 progress: Optional[Callable[[creq.MediaProgress], Any]] = None) -> List[Tuple[str, str]]:
+        """ Download all files, see download_all. """
         os.makedirs(self.MEDIA_FOLDER, exist_ok=True)
 
         urls_to_names = [
             (example._media_url, example.filepath)
             for example in self
         ]
-        await creq.download_docs_async(urls_to_names)
+        if store is None:
+            return await creq.download_docs_async(urls_to_names, writer, probe, progress)
+        await store.download_async(urls_to_names, writer=writer)
+        return self._not_stored(store, urls_to_names)
+
+    @staticmethod
+    def _not_stored(store: MediaStore,
+                    urls_to_names: List[Tuple[str, Any]]) -> List[Tuple[str, str]]:
+        """ Get pairs url – filename of the files not downloaded to the store. """
+        return [
+            (url, str(filename))
+            for url, filename in urls_to_names
+            if url not in store
+        ]
+
+    @staticmethod
+    def _media_of(examples: List[Any]) -> List[Tuple[str, str]]:
+        """ Get pairs: url – filename of the examples' media files. """
+        return [
+            (example._media_url, str(example.filepath))
+            for example in examples
+        ]
+
+    def _pages_with_media(self) -> Tuple[List[Dict[str, Any]], int]:
+        """ Get the requests of the pages between the first and the
+        last ones and count of the received pages.
+
+        :exception RuntimeError: if the data still exist.
+        """
+        if self.data:
+            logger.error("Tried to request new examples, however data exist")
+            raise RuntimeError("Data still exist")
+        os.makedirs(self.MEDIA_FOLDER, exist_ok=True)
+
+        requests = [
+            {**self.params, 'p': p_index}
+            for p_index in range(1, self.p_count - 1)
+        ]
+        return requests, min(self.p_count, 2)
+
+    def _finish_pages_with_media(self,
+                                 results: List[Optional[List[Any]]],
+                                 received: int) -> None:
+        # the first page, the middle ones and the last one
+        pages = results[:1] + results[received:] + results[1:received]
+        parsed = ExampleStore()
+        for examples in pages:
+            parsed.extend(examples or [])
+        self._data = parsed
+        logger.info(f"{len(parsed)} examples got, their media files downloaded")
+
+    def request_examples_with_media(self,
+                                    media_workers: int = 5,
+                                    rate: Optional[float] = None,
+                                    writer: Optional[DiskWriter] = None) -> None:
+        """ Request examples and download their media files at once.
+
+        Media files of every parsed page are downloaded while
+        the other pages are being requested, so it takes about
+        the longest of the stages, not their sum. Pages and
+        media files share the rate limiter
+        (see creq.fetch_pages_with_media_coro).
+
+        :param media_workers: int, count of the concurrent downloads.
+        :param rate: float, max count of requests per second.
+        :param writer: DiskWriter, writer of the content.
+        :return: None.
+
+        :exception RuntimeError: if the data still exist.
+        """
+        requests, received = self._pages_with_media()
+        try:
+            first, last = creq.is_request_correct(
+                RNC_URL, self.p_count, **self.params)
+        except creq.BaseRequestError as e:
+            msg = f"Query = {self.forms_in_query}, " \
+                  f"{self.p_count}, {self.params}\ne = {e}"
+            logger.error(msg)
+            raise
+
+        self._get_additional_info(first)
+        results = creq.fetch_pages_with_media(
+            RNC_URL, requests, self._page_parser, self._media_of, # type: ignore
+            [first, last][:received], media_workers=media_workers, rate=rate, writer=writer)
+        self._finish_pages_with_media(results, received)
+
+    async def request_examples_with_media_async(self,
+                                                media_workers: int = 5,
+                                                rate: Optional[float] = None,
+                                                writer: Optional[DiskWriter] = None) -> None:
+        """ Request examples and download their media files at once
+        in the running event loop, see request_examples_with_media.
+
+        :exception RuntimeError: if the data still exist.
+        """
+        requests, received = self._pages_with_media()
+        try:
+            first, last = await creq.is_request_correct_async(
+                RNC_URL, self.p_count, **self.params)
+        except creq.BaseRequestError as e:
+            msg = f"Query = {self.forms_in_query}, " \
+                  f"{self.p_count}, {self.params}\ne = {e}"
+            logger.error(msg)
+            raise
+
+        await self._get_additional_info_async(first)
+        results = await creq.fetch_pages_with_media_async(
+            RNC_URL, requests, self._page_parser, self._media_of, # type: ignore
+            [first, last][:received], media_workers=media_workers, rate=rate, writer=writer)
+        self._finish_pages_with_media(results, received)
 
 
 class MultiPARCCorpus(Corpus):
@@ -4,21 +4,47 @@ download media files, check that the request if correct, page in RNC exists.
 """
 
 __all__ = (
-    'get_htmls', 'is_request_correct', 'download_docs'
+    'get_htmls', 'is_request_correct', 'download_docs', 'fetch_pages',
+    'fetch_pages_with_media', 'RateLimiter', 'MediaProgress'
 )
 
 import asyncio
+import contextlib
+import functools
+import hashlib
 import logging
+import math
+import os
 import time
-from typing import List, Optional, Tuple, Union
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Coroutine, Dict, Generator, List, NamedTuple, Optional, Set, Tuple, Union
 
-import aiofiles
 import aiohttp
 import bs4
+import ujson
+
+from rnc.disk_writer import DiskWriter, default_writer
+from rnc.loop import background_loop
+from rnc.transport import get_transport
 
 logger = logging.getLogger("rnc")
 WAIT = 24
 
+PAGER_STRAINER = bs4.SoupStrainer('p', {'class': 'pager'})
+
+# media files are streamed by chunks of the size, the temporary
+# file with the suffix is renamed when the file is received
+CHUNK_SIZE = 64 * 1024
+PART_SUFFIX = '.part'
+# completed media files of the folder
+MANIFEST_NAME = '.media-manifest.jsonl'
+# timeouts of connecting and reading a chunk of media, there
+# is no limit of the total time, large files take long
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = WAIT
+# media files of the parsed pages waiting for download
+MEDIA_QUEUE_SIZE = 20
+
 
 class BaseRequestError(Exception):
     pass
@@ -36,6 +62,76 @@ class WrongHTTPRequest(BaseRequestError):
     pass
 
 
+class RateLimiter:
+    """ Limit of the requests shared by the workers, e.g. of pages
+    and of media files: requests per second and the pause of all
+    the requests after 429 error.
+
+    Count of the concurrent requests is limited by count of the workers.
+    """
+    def __init__(self,
+                 rate: Optional[float] = None) -> None:
+        """
+        :param rate: float, max count of requests per second, unlimited by default.
+        :exception ValueError: if the rate is not a positive number.
+        """
+        if rate is not None and (not isinstance(rate, (int, float)) or rate <= 0):
+            msg = f"Rate must be a number > 0, but '{rate}' found"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self.rate = rate
+        self._interval = 0 if rate is None else 1 / rate
+        # loop time of the next request and of the end of the pause
+        self._next_start = 0.0
+        self._resume_at = 0.0
+
+    def pause(self,
+              seconds: float = WAIT) -> None:
+        """ Pause all the requests, e.g. after 429 error. """
+        loop = asyncio.get_running_loop()
+        self._resume_at = max(self._resume_at, loop.time() + seconds)
+
+    async def __aenter__(self) -> None:
+        """ Wait for the turn of the request. """
+        loop = asyncio.get_running_loop()
+        start = max(self._next_start, loop.time())
+        self._next_start = start + self._interval
+        if start > loop.time():
+            await asyncio.sleep(start - loop.time())
+
+        while self._resume_at > loop.time():
+            await asyncio.sleep(self._resume_at - loop.time())
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+
+
+def run_sync(coro: Coroutine) -> Any:
+    """ Run the coro in the background event loop shared by the
+    sync calls and wait for its result. Unlike asyncio.run, the
+    loop and its sessions are not closed after the call and
+    it works if there is a running event loop, e.g. in Jupyter.
+    """
+    return background_loop().run(coro)
+
+
+@contextlib.asynccontextmanager
+async def client_session(timeout: aiohttp.ClientTimeout) -> AsyncIterator[aiohttp.ClientSession]:
+    """ Get the session of the transport (see rnc.transport) with the
+    timeout. In the background event loop the session is shared by the
+    calls, so its connections are reused, it is closed with the loop.
+    Otherwise the new session is closed after the call.
+    """
+    loop, transport = background_loop(), get_transport()
+    if loop.in_loop():
+        yield loop.shared(
+            f"session of {id(transport)}: {timeout}", lambda: transport.session(timeout))
+    else:
+        async with transport.session(timeout) as ses:
+            yield ses
+
+
 async def fetch_html(url: str, # type: ignore
                      ses: aiohttp.ClientSession,
                      **kwargs) -> Optional[Union[Tuple[int, str], int]]:
@@ -75,23 +171,27 @@ async def fetch_html(url: str, # type: ignore
 
 async def worker_fetching_html(worker_name: str,
                                q_args: asyncio.Queue,
-                               q_results: asyncio.Queue) -> None:
+                               q_results: asyncio.Queue,
+                               parse: Optional[Callable[[str], Any]] = None,
+                               limiter: Optional[RateLimiter] = None) -> None:
     """
     Worker requesting to URL with args from
      q_args and putting results to q_results.
 
     Wait some time and request again if there's 429 error.
+    If the parse func is given, the HTML code is replaced
+    with its result, so the pages are not kept.
+    If the limiter is given, the requests keep its rate and
+    429 error pauses all the workers sharing it.
     """
+    limiter = limiter or RateLimiter()
     while True:
-        url, ses, kwargs = q_args.get_nowait()
+        key, url, ses, kwargs = q_args.get_nowait()
         logger.debug(
             f"{worker_name}Requested to '{url}' with '{kwargs}'")
 
-        res = await fetch_html(url, ses, **kwargs, worker_name=worker_name)
-
-        if res is None:
-            q_args.task_done()
-            return
+        async with limiter:
+            res = await fetch_html(url, ses, **kwargs, worker_name=worker_name)
 
         while res == -1:
             logger.debug(
@@ -99,42 +199,60 @@ async def worker_fetching_html(worker_name: str,
                 f"page: {kwargs['p']}; wait {WAIT}s"
             )
 
-            await asyncio.sleep(WAIT)
-            res = await fetch_html(url, ses, **kwargs, worker_name=worker_name)
+            limiter.pause(WAIT)
+            async with limiter:
+                res = await fetch_html(url, ses, **kwargs, worker_name=worker_name)
+
+        # the error is logged, the worker goes on
+        # with the next request, the result is None
+        if res is None:
+            q_args.task_done()
+            continue
 
         logger.debug(
             f"{worker_name}Received from '{url}' with '{kwargs}'")
+        html = res[1] # type: ignore
+        try:
+            result = html if parse is None else parse(html)
+        except Exception as e:
+            logger.error(f"{worker_name}Error while parsing '{url}' with '{kwargs}':\n{e}")
+            result = None
+
+        await q_results.put((key, result))
         q_args.task_done()
 
-        await q_results.put((res[0], res[1])) # type: ignore
-
 
-async def get_htmls_coro(url: str,
-                         start: int,
-                         stop: int,
-                         **kwargs) -> List[str]:
+async def fetch_pages_coro(url: str,
+                           requests: List[Dict[str, Any]],
+                           parse: Optional[Callable[[str], Any]] = None,
+                           workers: int = 5) -> List[Any]:
     """
-    Coro running 5 workers doing requests and
-     getting HTML codes of the pages.
-
-    URLs will be created for i in range(start, stop),
-    HTTP tag 'p' (page) is i.
-
+    Coro running the workers doing requests with the params.
+     One pool of workers serves all the requests.
+
+    :param url: str, URL to request.
+    :param requests: list of dicts, HTTP tags of every request,
+     tag 'p' (page) is required.
+    :param parse: func to apply to HTML code of every page.
+    :param workers: int, count of the workers.
+    :return: list of HTML codes or results of the parse
+     func in the order of the requests, None if the request failed.
     """
     timeout = aiohttp.ClientTimeout(WAIT)
 
     q_results = asyncio.Queue(maxsize=-1) # type: ignore
     q_args = asyncio.Queue(maxsize=-1) # type: ignore
+    results: List[Any] = [None] * len(requests)
 
-    async with aiohttp.ClientSession(timeout=timeout) as ses:
-        for p_index in range(start, stop):
-            await q_args.put((url, ses, {**kwargs, 'p': p_index}))
+    async with client_session(timeout) as ses:
+        for key, kwargs in enumerate(requests):
+            await q_args.put((key, url, ses, kwargs))
 
         tasks = []
-        for worker_index in range(5):
+        for worker_index in range(min(workers, len(requests))):
             name = f"Worker-{worker_index + 1}: "
             task = asyncio.create_task(
-                worker_fetching_html(name, q_args, q_results)
+                worker_fetching_html(name, q_args, q_results, parse)
             )
             tasks += [task]
 
@@ -143,13 +261,32 @@ async def get_htmls_coro(url: str,
         for task in tasks:
             task.cancel()
 
-        results = [
-            q_results.get_nowait()
-            for _ in range(q_results.qsize())
-        ]
-    results.sort(key=lambda res: res[0])
+        for _ in range(q_results.qsize()):
+            key, result = q_results.get_nowait()
+            results[key] = result
+    return results
+
+
+async def get_htmls_coro(url: str,
+                         start: int,
+                         stop: int,
+                         **kwargs) -> List[str]:
+    """
+    Coro running 5 workers doing requests and
+     getting HTML codes of the pages.
+
+    URLs will be created for i in range(start, stop),
+    HTTP tag 'p' (page) is i.
+
+    """
+    requests = [
+        {**kwargs, 'p': p_index}
+        for p_index in range(start, stop)
+    ]
+    results = await fetch_pages_coro(url, requests)
     return [
-        html for _, html in results
+        html for html in results
+        if html is not None
     ]
 
 
@@ -161,7 +298,7 @@ def get_htmls(url: str,
     logger.info(f"Requested to '{url}' [{start};{stop}) with params {kwargs}")
     coro_start = time.time()
 
-    html_codes = asyncio.run(
+    html_codes = run_sync(
         get_htmls_coro(url, start, stop, **kwargs)
     )
 
@@ -185,6 +322,40 @@ async def get_htmls_async(url: str,
     return html_codes
 
 
+def fetch_pages(url: str,
+                requests: List[Dict[str, Any]],
+                parse: Optional[Callable[[str], Any]] = None,
+                workers: int = 5) -> List[Any]:
+    """ Run coro, get html codes or parsed pages
+    of the requests, see fetch_pages_coro.
+    """
+    logger.info(f"Requested to '{url}' {len(requests)} pages")
+    coro_start = time.time()
+
+    results = run_sync(fetch_pages_coro(url, requests, parse, workers))
+
+    logger.info("Request was successfully completed")
+    logger.info(f"Coro executing time: {round(time.time() - coro_start, 2)}")
+    return results
+
+
+async def fetch_pages_async(url: str,
+                            requests: List[Dict[str, Any]],
+                            parse: Optional[Callable[[str], Any]] = None,
+                            workers: int = 5) -> List[Any]:
+    """ Run coro, get html codes or parsed pages
+    of the requests, see fetch_pages_coro.
+    """
+    logger.info(f"Requested to '{url}' {len(requests)} pages")
+    coro_start = time.time()
+
+    results = await fetch_pages_coro(url, requests, parse, workers)
+
+    logger.info("Request was successfully completed")
+    logger.info(f"Coro executing time: {round(time.time() - coro_start, 2)}")
+    return results
+
+
 def whether_result_found(url: str,
                          **kwargs) -> str:
     """
@@ -428,95 +599,542 @@ async def is_request_correct_async(url: str,
     return first_page, last_page
 
 
+def pager_max_page(page: str) -> Optional[int]:
+    """ Get the max page number in the pager of the
+    page, None if there is no pager.
+    """
+    soup = bs4.BeautifulSoup(page, 'lxml', parse_only=PAGER_STRAINER)
+    numbers = [
+        int(tag.text)
+        for tag in soup.find_all('a')
+        if tag.text.isdigit()
+    ]
+    return max(numbers) if numbers else None
+
+
+def last_page_probes(estimate: int,
+                     limit: Optional[int] = None) -> Generator[int, bool, int]:
+    """
+    Indexes of the pages to check whether they exist, the
+     result of every check should be sent to the generator.
+     The first page (index 0) exists.
+
+    The estimated last page is checked first, then the pages
+    after it (or before) with the doubling step until the border
+    is passed and then the border is found by binary search.
+    So it takes O(log n) checks, n is the error of the estimate.
+
+    :param estimate: int, estimated count of the pages.
+    :param limit: int, count of the pages not to exceed.
+    :return: index of the last existing page.
+    """
+    last = None if limit is None else limit - 1
+    if last == 0:
+        return 0
+
+    # the last page known to exist and the first one known not to
+    lo, hi = 0, None
+    probe = max(estimate - 1, 1)
+    if last is not None:
+        probe = min(probe, last)
+
+    step = 1
+    if (yield probe):
+        lo = probe
+        while hi is None and lo != last:
+            probe = lo + step if last is None else min(lo + step, last)
+            if (yield probe):
+                lo = probe
+            else:
+                hi = probe
+            step *= 2
+        if hi is None:
+            return lo
+    else:
+        hi = probe
+        while hi - step > lo:
+            probe = hi - step
+            if (yield probe):
+                lo = probe
+                break
+            hi = probe
+            step *= 2
+
+    while hi - lo > 1:
+        probe = (lo + hi) // 2
+        if (yield probe):
+            lo = probe
+        else:
+            hi = probe
+    return lo
+
+
+def find_last_page(url: str,
+                   first_page: str,
+                   estimate: int,
+                   limit: Optional[int] = None,
+                   **kwargs) -> Tuple[int, Dict[int, str]]:
+    """
+    Find the last page by checking whether the pages exist,
+     see last_page_probes.
+
+    :return: index of the last page and the existing
+     checked pages by their indexes.
+    """
+    pages = {0: first_page}
+    probes = last_page_probes(estimate, limit)
+    try:
+        p_index = next(probes)
+        while True:
+            try:
+                pages[p_index] = does_page_exist(url, p_index, first_page, **kwargs)
+            except ValueError:
+                p_index = probes.send(False)
+            else:
+                p_index = probes.send(True)
+    except StopIteration as e:
+        logger.debug(f"The last page is {e.value}, {len(pages) - 1} pages checked")
+        return e.value, pages
+
+
+async def find_last_page_async(url: str,
+                               first_page: str,
+                               estimate: int,
+                               limit: Optional[int] = None,
+                               **kwargs) -> Tuple[int, Dict[int, str]]:
+    """
+    Find the last page by checking whether the pages exist,
+     see last_page_probes.
+
+    :return: index of the last page and the existing
+     checked pages by their indexes.
+    """
+    pages = {0: first_page}
+    probes = last_page_probes(estimate, limit)
+    try:
+        p_index = next(probes)
+        while True:
+            try:
+                pages[p_index] = await does_page_exist_async(
+                    url, p_index, first_page, **kwargs)
+            except ValueError:
+                p_index = probes.send(False)
+            else:
+                p_index = probes.send(True)
+    except StopIteration as e:
+        logger.debug(f"The last page is {e.value}, {len(pages) - 1} pages checked")
+        return e.value, pages
+
+
+def file_digest(path: Union[str, Path],
+                digest: Optional[Any] = None) -> Any:
+    """ Update the digest (sha256 by default) with the file content.
+
+    :return: the digest.
+    """
+    digest = digest or hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest
+
+
+class MediaManifest:
+    """ Sidecar manifest of the completed media files of the folder:
+    URL, size and sha256 of every file. It is the file of JSON lines,
+    a line is appended when a file is completed, so the manifest
+    keeps all completed files even if the process is killed.
+    """
+
+    def __init__(self,
+                 folder: Union[str, Path]) -> None:
+        self.path = Path(folder) / MANIFEST_NAME
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if not self.path.exists():
+            return
+
+        with self.path.open(encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = ujson.loads(line)
+                    self.entries[entry['name']] = entry
+                except (ValueError, KeyError, TypeError):
+                    # the last line might be partial
+                    logger.warning(f"Wrong line in '{self.path}': '{line}'")
+
+    def is_complete(self,
+                    url: str,
+                    filename: Union[str, Path]) -> bool:
+        """ Whether the file is downloaded from the URL: size
+        and checksum of the file are equal to the manifest ones.
+        """
+        entry = self.entries.get(Path(filename).name)
+        if entry is None or entry.get('url') != url:
+            return False
+        try:
+            if os.path.getsize(filename) != entry.get('size'):
+                return False
+            return file_digest(filename).hexdigest() == entry.get('sha256')
+        except OSError:
+            return False
+
+    def add(self,
+            url: str,
+            filename: Union[str, Path],
+            size: int,
+            sha256: str) -> None:
+        entry: Dict[str, Any] = {'name': Path(filename).name, 'url': url, 'size': size, 'sha256': sha256}
+        self.entries[entry['name']] = entry
+        with self.path.open('a', encoding='utf-8') as f:
+            f.write(f"{ujson.dumps(entry, ensure_ascii=False, escape_forward_slashes=False)}\n")
+
+
+async def _receive_media(resp: aiohttp.ClientResponse,
+                         temp_file: str,
+                         offset: int,
+                         writer: DiskWriter,
+                         progress: Optional[Callable[[int, Optional[int]], None]] = None) -> Tuple[int, Any]:
+    """ Stream the content of the response to the temporary file,
+    append it to the first offset bytes of the file if offset.
+
+    :return: size of the file and sha256 of its content.
+    """
+    digest = hashlib.sha256()
+    if offset:
+        loop = asyncio.get_running_loop()
+        digest = await loop.run_in_executor(None, file_digest, temp_file, digest)
+
+    size, buffer = offset, bytearray()
+    full_size = None if resp.content_length is None else offset + resp.content_length
+    await writer.open(temp_file, append=bool(offset))
+    if progress is not None:
+        progress(size, full_size)
+    try:
+        async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+            buffer += chunk
+            if len(buffer) >= writer.buffer_size:
+                await writer.write(temp_file, buffer)
+                buffer = bytearray()
+                if progress is not None:
+                    progress(size, full_size)
+    finally:
+        # the received content is written to resume the download
+        if buffer:
+            await writer.write(temp_file, buffer)
+        await writer.close_file(temp_file)
+    return size, digest
+
+
 async def fetch_media_file(url: str, # type: ignore
+                           filename: str,
                            ses: aiohttp.ClientSession,
-                           **kwargs) -> Optional[Union[bytes, int]]:
+                           writer: Optional[DiskWriter] = None,
+                           progress: Optional[Callable[[int, Optional[int]], None]] = None,
+                           **kwargs) -> Optional[Union[Tuple[int, str], int]]:
     """
-    Coro, getting media content to write.
+    Coro, streaming media content to the file by chunks.
+
+    The content is written to the temporary file near the file,
+    it is renamed to the file when the content is received,
+    so the file is never partial. If the temporary file exists,
+    the rest of the content is requested with HTTP Range.
 
-    :return: bytes (media) if everything is OK,
-     -1 if there's 429 error, None if it is another error.
+    The content is collected to the blocks of the writer's buffer
+    size and written by the writer, the coro waits for the disk
+    only if the writer's queue is full.
+
+    :param writer: DiskWriter, started writer, the one shared
+     by the running event loop is used by default.
+    :param progress: func to call with the received and the full
+     size of the file (None if it is unknown) after every block.
+    :return: tuple of int and str, size and sha256 of the file if
+     everything is OK, -1 if there's 429 error, None if it is another error.
 
     :exception: all exceptions should be processed here.
     """
     worker_name = kwargs.pop('worker_name', '')
+    writer = writer or default_writer()
+
+    temp_file = f"{filename}{PART_SUFFIX}"
     try:
-        resp = await ses.get(url, allow_redirects=True, params=kwargs)
+        while True:
+            offset = os.path.getsize(temp_file) if os.path.exists(temp_file) else 0
+            headers = {'Range': f"bytes={offset}-"} if offset else {}
+            restart = False
+
+            async with ses.get(url, allow_redirects=True, params=kwargs, headers=headers) as resp:
+                if resp.status == 429:
+                    return -1
+                resumed = bool(offset) and resp.status == 206 and \
+                    resp.headers.get('Content-Range', '').startswith(f"bytes {offset}-")
+                if offset and not resumed and resp.status != 200:
+                    logger.warning(f"{worker_name}Cannot resume '{url}' from {offset}: {resp.status}")
+                    restart = True
+                elif resp.status != 200 and not resumed:
+                    logger.error(
+                        f"{worker_name}{resp.status}: {resp.reason} requesting to {resp.url}")
+                    return # type: ignore
+                else:
+                    if resumed:
+                        logger.debug(f"{worker_name}Resuming '{url}' from {offset} bytes")
+                    size, digest = await _receive_media(
+                        resp, temp_file, offset if resumed else 0, writer, progress)
+
+            if not restart:
+                break
+            # the response is released, the temporary file is wrong,
+            # it is removed and the whole file is requested again
+            os.remove(temp_file)
+
+        os.replace(temp_file, filename)
     except Exception as e:
+        # the temporary file is kept to resume the download
         logger.error(
             f"{e}\n{worker_name}Cannot get "
-            f"answer from '{url}' with {kwargs}")
+            f"'{url}' to '{filename}' with {kwargs}")
         return # type: ignore
 
-    if resp.status == 200:
-        content = await resp.read()
-        resp.close()
-        return content
-    elif resp.status == 429:
-        resp.close()
-        return -1
+    if progress is not None:
+        progress(size, size)
+    return size, digest.hexdigest()
 
-    logger.error(
-        f"{resp.status}: {resp.reason} requesting to {resp.url}"
-    )
-    resp.close()
 
+def media_timeout() -> aiohttp.ClientTimeout:
+    """ Get timeout of the media downloads: there is no limit
+    of the total time, only of connecting and of reading every chunk.
+    """
+    return aiohttp.ClientTimeout(
+        total=None, sock_connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT)
+
+
+class MediaProgress(NamedTuple):
+    url: str
+    filename: str
+    # bytes of the file, with the resumed ones
+    received: int
+    # None if it is unknown
+    size: Optional[int]
+    # bytes received by the download of all the files
+    total_received: int
+    total_size: Optional[int]
+    # bytes per second of the file and of all the files
+    speed: float
+    total_speed: float
+
+
+class DownloadProgress:
+    """ Byte progress and throughput of every file and of all
+    of them, the func is called with MediaProgress.
+    """
+    def __init__(self,
+                 func: Callable[[MediaProgress], Any],
+                 sizes: Optional[Dict[str, Optional[int]]] = None) -> None:
+        """
+        :param func: func to call with the progress.
+        :param sizes: dict of str to int, size of the content to
+         receive by filename, None if it is unknown.
+        """
+        self.func = func
+        sizes = sizes or {}
+        self.total_size = None if None in sizes.values() else sum(sizes.values()) # type: ignore
+        self.start = time.monotonic()
+        self.total_received = 0
+        # the first received size and the start by filename
+        self._files: Dict[str, Tuple[int, int, float]] = {}
+
+    def update(self,
+               url: str,
+               filename: str,
+               received: int,
+               size: Optional[int]) -> None:
+        """ Update the received size of the file, call the func. """
+        now = time.monotonic()
+        first, last, start = self._files.get(filename, (received, received, now))
+        self._files[filename] = (first, received, start)
+        self.total_received += received - last
+
+        speed = (received - first) / max(now - start, 1e-6)
+        total_speed = self.total_received / max(now - self.start, 1e-6)
+        try:
+            self.func(MediaProgress(
+                url, filename, received, size, self.total_received,
+                self.total_size, speed, total_speed))
+        except Exception as e:
+            logger.error(f"Error while reporting progress of '{filename}':\n{e}")
+
+
+async def probe_media_size(url: str,
+                           ses: aiohttp.ClientSession) -> Optional[int]:
+    """ Get size of the media file by HEAD request or, if the
+    server does not answer it, by GET of the first byte.
+
+    :return: int, size of the file, None if it is unknown.
+    """
+    try:
+        async with ses.head(url, allow_redirects=True) as resp:
+            if resp.status == 200 and resp.content_length is not None:
+                return resp.content_length
+
+        async with ses.get(url, allow_redirects=True, headers={'Range': 'bytes=0-0'}) as resp:
+            content_range = resp.headers.get('Content-Range', '')
+            if resp.status == 206 and '/' in content_range:
+                return int(content_range.rsplit('/', 1)[1])
+            if resp.status == 200:
+                return resp.content_length
+    except Exception as e:
+        logger.debug(f"Cannot get size of '{url}':\n{e}")
+    return None
 
-async def dump(content: bytes,
-               filename: str) -> None:
-    """ Dump content to media file."""
-    async with aiofiles.open(filename, 'wb') as f:
-        await f.write(content)
 
+async def _order_by_size(missing: List[Tuple[str, str, MediaManifest]],
+                         ses: aiohttp.ClientSession,
+                         limiter: RateLimiter) -> Tuple[List[Tuple[str, str, MediaManifest]], Dict[str, Optional[int]]]:
+    """ Probe the sizes of the rest of the files, order the files
+    from the largest one, so the workers finish at about the same
+    time. The files of unknown size go first.
 
-async def worker_fetching_media(worker_name: str,
-                                q_args: asyncio.Queue) -> None:
+    :return: the ordered files and the sizes to receive by filename.
     """
-    Worker getting media file and dumping it to file.
+    async def probe(url: str) -> Optional[int]:
+        async with limiter:
+            return await probe_media_size(url, ses)
 
-    Wait some time and request again if there's 429 error.
-    """
-    while True:
-        url, ses, filename = q_args.get_nowait()
+    sizes = await asyncio.gather(*(probe(url) for url, _, _ in missing))
+    to_receive: Dict[str, Optional[int]] = {}
+    for (_, filename, _), size in zip(missing, sizes):
+        part = f"{filename}{PART_SUFFIX}"
+        received = os.path.getsize(part) if os.path.exists(part) else 0
+        to_receive[filename] = None if size is None else max(size - received, 0)
 
-        logger.debug(f"{worker_name}Requested to '{url}'")
-        content = await fetch_media_file(url, ses, worker_name=worker_name)
+    def order(item: Tuple[str, str, MediaManifest]) -> float:
+        size = to_receive[item[1]]
+        return -math.inf if size is None else -size
 
-        if content is None:
-            q_args.task_done()
-            return
+    return sorted(missing, key=order), to_receive
 
-        while content == -1:
-            logger.debug(
-                f"{worker_name}: 429 'Too many requests', "
-                f"url: {url}; wait {WAIT}s"
-            )
 
-            await asyncio.sleep(WAIT)
-            content = await fetch_media_file(url, ses, worker_name=worker_name)
+async def worker_fetching_media(worker_name: str,
+                                q_args: asyncio.Queue,
+                                limiter: Optional[RateLimiter] = None,
+                                writer: Optional[DiskWriter] = None,
+                                progress: Optional[DownloadProgress] = None,
+                                failed: Optional[List[Tuple[str, str]]] = None) -> None:
+    """
+    Worker streaming media file to the file, the completed
+    file is added to the manifest of its folder.
 
-        logger.debug(f"{worker_name}Received from '{url}'")
-        logger.debug(f"{worker_name}Dumping '{url}' to '{filename}'")
-        await dump(content, filename) # type: ignore
-        logger.debug(f"{worker_name}'{filename}' dumped")
+    Wait some time and request again if there's 429 error.
+    The files might be put to q_args while the worker is running.
+    The content is written by the writer, if it is given.
+    Pairs url – filename of the files, which are not
+    downloaded, are added to failed, if it is given.
+    """
+    limiter = limiter or RateLimiter()
+    while True:
+        url, ses, filename, manifest = await q_args.get()
+        report = None if progress is None else functools.partial(progress.update, url, filename)
+
+        res = None
+        try:
+            logger.debug(f"{worker_name}Requested to '{url}'")
+            async with limiter:
+                res = await fetch_media_file(url, filename, ses, writer, report, worker_name=worker_name)
+
+            while res == -1:
+                logger.debug(
+                    f"{worker_name}: 429 'Too many requests', "
+                    f"url: {url}; wait {WAIT}s"
+                )
+
+                limiter.pause(WAIT)
+                async with limiter:
+                    res = await fetch_media_file(url, filename, ses, writer, report, worker_name=worker_name)
+
+            if res is not None:
+                size, sha256 = res # type: ignore
+                manifest.add(url, filename, size, sha256)
+                logger.debug(f"{worker_name}'{url}' dumped to '{filename}', {size} bytes")
+        except Exception as e:
+            # the worker goes on with the next file
+            logger.error(f"{worker_name}Error while downloading '{url}' to '{filename}':\n{e}")
+            res = None
+        finally:
+            if res is None and failed is not None:
+                failed.append((url, filename))
+            q_args.task_done()
 
-        q_args.task_done()
 
+async def _missing_media(url_to_name: List[Tuple[str, str]],
+                         manifests: Optional[Dict[Path, MediaManifest]] = None,
+                         seen: Optional[Set[str]] = None) -> List[Tuple[str, str, MediaManifest]]:
+    """ Get the files, which are not complete, with the manifests
+    of their folders. Checksums are got in the executor.
 
-async def download_docs_coro(url_to_name: List[Tuple[str, str]]) -> None:
-    """ Coro running 5 workers to download media files. """
-    timeout = aiohttp.ClientTimeout(WAIT)
+    The manifests and the seen files might be shared
+    by several calls, the seen files are skipped.
+    """
+    loop = asyncio.get_running_loop()
+    manifests = {} if manifests is None else manifests
+    seen = set() if seen is None else seen
+    missing = []
+    # several examples might have the same file,
+    # it is downloaded once not to write it concurrently
+    files = {filename: url for url, filename in url_to_name}
+    for filename, url in files.items():
+        if str(filename) in seen:
+            continue
+        seen.add(str(filename))
+
+        folder = Path(filename).parent
+        if folder not in manifests:
+            manifests[folder] = MediaManifest(folder)
+        manifest = manifests[folder]
+
+        if await loop.run_in_executor(None, manifest.is_complete, url, filename):
+            logger.debug(f"'{filename}' is complete, skipped")
+            continue
+        missing += [(url, filename, manifest)]
+    return missing
+
+
+async def download_docs_coro(url_to_name: List[Tuple[str, str]],
+                             writer: Optional[DiskWriter] = None,
+                             probe: bool = False,
+                             progress: Optional[Callable[[MediaProgress], Any]] = None,
+                             workers: int = 5) -> List[Tuple[str, str]]:
+    """ Coro running the workers to download media files,
+    the writer writes the content to the disk.
+
+    If probe, sizes of the files are requested first and
+    the largest files are downloaded first.
+
+    :return: list of pairs url – filename of the files,
+     which are not downloaded.
+    """
     q_args = asyncio.Queue(maxsize=-1) # type: ignore
-
-    async with aiohttp.ClientSession(timeout=timeout) as ses:
-        for url, filename in url_to_name:
-            await q_args.put((url, ses, filename))
+    missing = await _missing_media(url_to_name)
+    logger.info(f"{len(url_to_name) - len(missing)} files are complete")
+
+    limiter = RateLimiter()
+    failed: List[Tuple[str, str]] = []
+    writer = writer or DiskWriter()
+    async with client_session(media_timeout()) as ses, writer:
+        sizes: Dict[str, Optional[int]] = {filename: None for _, filename, _ in missing}
+        if probe:
+            missing, sizes = await _order_by_size(missing, ses, limiter)
+            logger.debug(f"Sizes of the files to download: {sizes}")
+        reporter = None if progress is None else DownloadProgress(progress, sizes)
+
+        for url, filename, manifest in missing:
+            await q_args.put((url, ses, filename, manifest))
 
         tasks = []
-        for worker_number in range(5):
+        for worker_number in range(workers):
             name = f"Worker-{worker_number + 1}: "
             task = asyncio.create_task(
-                worker_fetching_media(name, q_args))
+                worker_fetching_media(name, q_args, limiter, writer, reporter, failed))
             tasks += [task]
 
         await q_args.join()
@@ -524,32 +1142,214 @@ async def download_docs_coro(url_to_name: List[Tuple[str, str]]) -> None:
         for task in tasks:
             task.cancel()
 
+    if failed:
+        logger.warning(f"{len(failed)} files are not downloaded, "
+                       f"the next call resumes them")
+    return failed
+
 
-def download_docs(url_to_name: List[Tuple[str, str]]) -> None:
+def download_docs(url_to_name: List[Tuple[str, str]],
+                  writer: Optional[DiskWriter] = None,
+                  probe: bool = False,
+                  progress: Optional[Callable[[MediaProgress], Any]] = None) -> List[Tuple[str, str]]:
     """
     Run coro, download the files.
 
+    The files, which size and checksum are equal to the ones in
+    the manifest of their folder, are skipped. The partial files
+    are resumed.
+
     :param url_to_name: list of tuples of str, pairs: url – filename.
+    :param writer: DiskWriter, writer of the content (buffer size,
+     count of threads, fsync), it is started and closed here.
+    :param probe: bool, whether to request sizes of the files (HEAD or
+     GET of the first byte) and download the largest ones first, so
+     a large file at the end does not delay the end of the download.
+    :param progress: func to call with MediaProgress: received
+     bytes and speed of the file and of all the files.
+    :return: list of pairs url – filename of the files, which are
+     not downloaded, the next call resumes them.
     """
     logger.info(f"Requested {len(url_to_name)} files to download")
     coro_start = time.time()
 
-    asyncio.run(download_docs_coro(url_to_name))
+    failed = run_sync(download_docs_coro(url_to_name, writer, probe, progress))
 
     logger.info(f"Downloading completed, coro executing time: "
                 f"{round(time.time() - coro_start, 2)}s")
+    return failed
 
 
-async def download_docs_async(url_to_name: List[Tuple[str, str]]) -> None:
+async def download_docs_async(url_to_name: List[Tuple[str, str]],
+                              writer: Optional[DiskWriter] = None,
+                              probe: bool = False,
+                              progress: Optional[Callable[[MediaProgress], Any]] = None) -> List[Tuple[str, str]]:
     """
     Run coro, download the files.
 
+    The files, which size and checksum are equal to the ones in
+    the manifest of their folder, are skipped. The partial files
+    are resumed.
+
     :param url_to_name: list of tuples of str, pairs: url – filename.
+    :param writer: DiskWriter, writer of the content (buffer size,
+     count of threads, fsync), it is started and closed here.
+    :param probe: bool, whether to request sizes of the files (HEAD or
+     GET of the first byte) and download the largest ones first, so
+     a large file at the end does not delay the end of the download.
+    :param progress: func to call with MediaProgress: received
+     bytes and speed of the file and of all the files.
+    :return: list of pairs url – filename of the files, which are
+     not downloaded, the next call resumes them.
     """
     logger.info(f"Requested {len(url_to_name)} files to download")
     coro_start = time.time()
 
-    await download_docs_coro(url_to_name)
+    failed = await download_docs_coro(url_to_name, writer, probe, progress)
 
     logger.info(f"Downloading completed, coro executing time: "
                 f"{round(time.time() - coro_start, 2)}s")
+    return failed
+
+
+async def fetch_pages_with_media_coro(url: str,
+                                      requests: List[Dict[str, Any]],
+                                      parse: Callable[[str], Any],
+                                      media: Callable[[Any], List[Tuple[str, str]]],
+                                      received: Optional[List[str]] = None,
+                                      workers: int = 5,
+                                      media_workers: int = 5,
+                                      rate: Optional[float] = None,
+                                      writer: Optional[DiskWriter] = None) -> List[Any]:
+    """
+    Coro fetching and parsing the pages and downloading their media
+     files at once. The media files of every parsed page are put to
+     the bounded queue, the media workers download them while the
+     other pages are being requested. Pages and media files share
+     the rate limiter, so 429 error pauses all the requests.
+
+    The complete files are skipped, the partial ones are resumed
+    (see download_docs).
+
+    :param url: str, URL to request.
+    :param requests: list of dicts, HTTP tags of every request,
+     tag 'p' (page) is required.
+    :param parse: func to apply to HTML code of every page.
+    :param media: func getting pairs: url – filename from the result of parse.
+    :param received: list of str, HTML codes of the pages got
+     before, they are parsed and their media are downloaded too.
+    :param workers: int, count of the workers requesting the pages.
+    :param media_workers: int, count of the workers downloading the files.
+    :param rate: float, max count of requests per second.
+    :param writer: DiskWriter, writer of the content, it
+     is started and closed here.
+    :return: list of results of the parse func of the received pages
+     and then of the requests, None if the request failed.
+    """
+    received = received or []
+    limiter = RateLimiter(rate)
+    q_args = asyncio.Queue(maxsize=-1) # type: ignore
+    q_results = asyncio.Queue(maxsize=-1) # type: ignore
+    q_media = asyncio.Queue(maxsize=MEDIA_QUEUE_SIZE) # type: ignore
+    results: List[Any] = [None] * (len(received) + len(requests))
+    manifests: Dict[Path, MediaManifest] = {}
+    seen: Set[str] = set()
+    failed: List[Tuple[str, str]] = []
+
+    async def feed_media(media_ses: aiohttp.ClientSession) -> None:
+        while True:
+            key, result = await q_results.get()
+            results[key] = result
+            try:
+                url_to_name = [] if result is None else media(result)
+                missing = await _missing_media(url_to_name, manifests, seen)
+            except Exception as e:
+                logger.error(f"Error while getting media files of the page {key}:\n{e}")
+                missing = []
+
+            for media_url, filename, manifest in missing:
+                # wait for the workers if the queue is full
+                await q_media.put((media_url, media_ses, filename, manifest))
+            q_results.task_done()
+
+    for key, html in enumerate(received):
+        try:
+            result = parse(html)
+        except Exception as e:
+            logger.error(f"Error while parsing the received page {key}:\n{e}")
+            result = None
+        q_results.put_nowait((key, result))
+
+    timeout = aiohttp.ClientTimeout(WAIT)
+    writer = writer or DiskWriter()
+    async with client_session(timeout) as ses, \
+            client_session(media_timeout()) as media_ses, writer:
+        for key, kwargs in enumerate(requests, len(received)):
+            q_args.put_nowait((key, url, ses, kwargs))
+
+        tasks = [asyncio.create_task(feed_media(media_ses))]
+        for worker_index in range(min(workers, len(requests))):
+            name = f"Worker-{worker_index + 1}: "
+            tasks += [asyncio.create_task(
+                worker_fetching_html(name, q_args, q_results, parse, limiter))]
+        for worker_index in range(media_workers):
+            name = f"Media-worker-{worker_index + 1}: "
+            tasks += [asyncio.create_task(
+                worker_fetching_media(name, q_media, limiter, writer, failed=failed))]
+
+        await q_args.join()
+        await q_results.join()
+        await q_media.join()
+
+        for task in tasks:
+            task.cancel()
+    logger.info(f"{len(seen)} media files of {len(results)} pages processed")
+    if failed:
+        logger.warning(f"{len(failed)} media files are not downloaded: {failed}")
+    return results
+
+
+def fetch_pages_with_media(url: str,
+                           requests: List[Dict[str, Any]],
+                           parse: Callable[[str], Any],
+                           media: Callable[[Any], List[Tuple[str, str]]],
+                           received: Optional[List[str]] = None,
+                           workers: int = 5,
+                           media_workers: int = 5,
+                           rate: Optional[float] = None,
+                           writer: Optional[DiskWriter] = None) -> List[Any]:
+    """ Run coro, get parsed pages of the requests and
+    download their media files, see fetch_pages_with_media_coro.
+    """
+    logger.info(f"Requested to '{url}' {len(requests)} pages with media")
+    coro_start = time.time()
+
+    results = run_sync(fetch_pages_with_media_coro(
+        url, requests, parse, media, received, workers, media_workers, rate, writer))
+
+    logger.info(f"Request was successfully completed, coro executing time: "
+                f"{round(time.time() - coro_start, 2)}s")
+    return results
+
+
+async def fetch_pages_with_media_async(url: str,
+                                       requests: List[Dict[str, Any]],
+                                       parse: Callable[[str], Any],
+                                       media: Callable[[Any], List[Tuple[str, str]]],
+                                       received: Optional[List[str]] = None,
+                                       workers: int = 5,
+                                       media_workers: int = 5,
+                                       rate: Optional[float] = None,
+                                       writer: Optional[DiskWriter] = None) -> List[Any]:
+    """ Run coro, get parsed pages of the requests and
+    download their media files, see fetch_pages_with_media_coro.
+    """
+    logger.info(f"Requested to '{url}' {len(requests)} pages with media")
+    coro_start = time.time()
+
+    results = await fetch_pages_with_media_coro(
+        url, requests, parse, media, received, workers, media_workers, rate, writer)
+
+    logger.info(f"Request was successfully completed, coro executing time: "
+                f"{round(time.time() - coro_start, 2)}s")
+    return results
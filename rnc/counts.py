@@ -0,0 +1,134 @@
+"""
+Module with getting only amounts of documents and contexts
+where the queries are found, without the examples.
+"""
+
+__all__ = (
+    'QueryCounts',
+    'parse_counts',
+    'count_queries',
+    'count_queries_async',
+)
+
+import copy
+import logging
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Type, Union
+
+import bs4
+
+import rnc.corpora as rnc_corpora
+import rnc.corpora_requests as creq
+from rnc.corpora import Corpus, MainCorpus
+
+logger = logging.getLogger("rnc")
+
+# only the block with the amounts is parsed
+RES_STRAINER = bs4.SoupStrainer('p', {'class': 'res'})
+NO_RESULTS = (
+    'По этому запросу ничего не найдено.',
+    'No results match the search query.'
+)
+
+
+class QueryCounts(NamedTuple):
+    query: Union[Dict[str, Any], str]
+    corpus: str
+    # None if the request failed or there is no this info
+    docs: Optional[int]
+    contexts: Optional[int]
+
+
+def parse_counts(page: str) -> Dict[str, int]:
+    """ Get amounts of found docs and contexts from the page.
+    Only 'p.res' tags are parsed, not the whole page.
+
+    :return: dict with 'contexts' and 'docs' (if it is on the
+     page), they are 0 if nothing is found.
+    :exception ValueError: if there are no amounts on the page.
+    """
+    soup = bs4.BeautifulSoup(page, 'lxml', parse_only=RES_STRAINER)
+    if soup.find('span', {'class': 'stat-number'}) is None:
+        if any(msg in page for msg in NO_RESULTS):
+            return {'contexts': 0, 'docs': 0}
+        msg = "Amounts of docs and contexts not found on the page"
+        logger.error(msg)
+        raise ValueError(msg)
+    return Corpus._get_where_query_found(soup)
+
+
+def _count_requests(queries: Iterable[Union[Dict[str, Any], str]],
+                    corpora: Iterable[Type[Corpus]],
+                    **kwargs) -> Tuple[List[Tuple[Any, str]], List[Dict[str, Any]]]:
+    """ Get params of the first page with one sentence of
+    one document for every query in every corpus.
+
+    :return: the queries with corpus names and the params.
+    :exception ValueError: if a query or a param is wrong.
+    """
+    kwargs = {**kwargs, 'dpp': 1, 'spd': 1}
+    corpora = list(corpora)
+    keys, requests = [], []
+    for query in queries:
+        for corpus_type in corpora:
+            # params of the query are popped while converting it
+            corpus = corpus_type(copy.deepcopy(query), 1, **kwargs)
+            params = corpus.params.copy()
+            params['lang'] = 'ru'
+            params['p'] = 0
+            params.pop('expand', None)
+
+            keys += [(query, corpus_type.__name__)]
+            requests += [params]
+    return keys, requests
+
+
+def _to_counts(keys: List[Tuple[Any, str]],
+               results: List[Optional[Dict[str, int]]]) -> List[QueryCounts]:
+    return [
+        QueryCounts(query, corpus, (result or {}).get('docs'), (result or {}).get('contexts'))
+        for (query, corpus), result in zip(keys, results)
+    ]
+
+
+def count_queries(queries: Iterable[Union[Dict[str, Any], str]],
+                  corpora: Iterable[Type[Corpus]] = (MainCorpus, ),
+                  workers: int = 5,
+                  **kwargs) -> List[QueryCounts]:
+    """ Get amounts of documents and contexts where the
+    queries are found in the corpora.
+
+    Only the first page with dpp=1 and spd=1 is requested for
+    every query, all the pages are requested by one pool of
+    workers and parsed as soon as they are received.
+
+    Examples:
+    =========
+    .. code-block:: python
+        >>> count_queries(['кот', 'пёс'], [MainCorpus, Paper2000Corpus])
+        [QueryCounts(query='кот', corpus='MainCorpus', docs=..., contexts=...), ...]
+
+    :param queries: str or dicts, queries like the Corpus one.
+    :param corpora: Corpus classes to search in.
+    :param workers: int, count of the concurrent requests.
+    :param kwargs: other params of the Corpus like 'text' or 'mycorp'.
+    :return: list of QueryCounts for every query in every corpus,
+     the amounts are None if the request failed.
+    :exception ValueError: if a query or a param is wrong.
+    """
+    keys, requests = _count_requests(queries, corpora, **kwargs)
+    results = creq.fetch_pages(rnc_corpora.RNC_URL, requests, parse_counts, workers)
+    return _to_counts(keys, results)
+
+
+async def count_queries_async(queries: Iterable[Union[Dict[str, Any], str]],
+                              corpora: Iterable[Type[Corpus]] = (MainCorpus, ),
+                              workers: int = 5,
+                              **kwargs) -> List[QueryCounts]:
+    """ Get amounts of documents and contexts where the
+    queries are found in the corpora, see count_queries.
+
+    :exception ValueError: if a query or a param is wrong.
+    """
+    keys, requests = _count_requests(queries, corpora, **kwargs)
+    results = await creq.fetch_pages_async(rnc_corpora.RNC_URL, requests, parse_counts, workers)
+    return _to_counts(keys, results)
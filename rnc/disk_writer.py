@@ -0,0 +1,268 @@
+"""
+Module with the disk stage of media downloads: network workers put
+the received content to the bounded queues, the writers write it in
+their threads, so slow disk does not stop the network and vice versa.
+"""
+
+__all__ = (
+    'DiskWriter',
+    'default_writer',
+    'WRITE_BUFFER_SIZE',
+    'WRITE_QUEUE_SIZE',
+)
+
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+
+from rnc.loop import background_loop
+
+logger = logging.getLogger("rnc")
+
+# content is written by blocks of the size
+WRITE_BUFFER_SIZE = 1024 * 1024
+# count of blocks waiting for every writer
+WRITE_QUEUE_SIZE = 16
+
+
+def _fsync_and_close(files: List[BinaryIO]) -> List[Optional[Exception]]:
+    errors: List[Optional[Exception]] = []
+    for file in files:
+        try:
+            file.flush()
+            os.fsync(file.fileno())
+            file.close()
+        except Exception as e:
+            errors += [e]
+        else:
+            errors += [None]
+    return errors
+
+
+def _set_result(closed: asyncio.Future,
+                error: Optional[Exception] = None) -> None:
+    # the waiting coro might be cancelled
+    if closed.done():
+        return
+    if error is None:
+        closed.set_result(None)
+    else:
+        closed.set_exception(error)
+
+
+class DiskWriter:
+    """ Pool of the writers, every one has its thread and its
+    bounded queue. All the blocks of a file are written by one
+    writer in order. The blocks are written as they are given,
+    so they should be collected to the buffer size by the caller.
+
+    Memory is limited by threads * queue_size * buffer_size bytes.
+
+    It is started in the running event loop, it might be started
+    again after it is closed.
+
+    Examples:
+    =========
+    .. code-block:: python
+        >>> async with DiskWriter(threads=4, fsync=True) as writer:
+        ...     await writer.open('file.mp4')
+        ...     await writer.write('file.mp4', b'content')
+        ...     await writer.close_file('file.mp4')
+    """
+    def __init__(self,
+                 threads: int = 2,
+                 buffer_size: int = WRITE_BUFFER_SIZE,
+                 queue_size: int = WRITE_QUEUE_SIZE,
+                 fsync: bool = False,
+                 fsync_batch: int = 8) -> None:
+        """
+        :param threads: int, count of the writers.
+        :param buffer_size: int, size of the blocks in bytes, the
+         callers collect the content to the block before it is written.
+        :param queue_size: int, count of blocks waiting for every writer,
+         the network workers wait if the queue is full.
+        :param fsync: bool, whether to flush the files to the disk
+         before they are closed.
+        :param fsync_batch: int, max count of files flushed at once, the
+         files closed together are flushed by one call to the thread.
+        :exception ValueError: if a param is not a positive int.
+        """
+        params = (('Threads', threads), ('Buffer size', buffer_size),
+                  ('Queue size', queue_size), ('Fsync batch', fsync_batch))
+        for name, value in params:
+            if not isinstance(value, int) or value <= 0:
+                msg = f"{name} must be int > 0, but '{value}' found"
+                logger.error(msg)
+                raise ValueError(msg)
+
+        self.threads = threads
+        self.buffer_size = buffer_size
+        self.queue_size = queue_size
+        self.fsync = fsync
+        self.fsync_batch = fsync_batch
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def is_started(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> None:
+        """ Start the writers in the running event loop. """
+        if self.is_started:
+            return
+        self._executor = ThreadPoolExecutor(self.threads, thread_name_prefix='rnc-writer')
+        self._queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(self.threads)]
+        self._tasks = [
+            asyncio.ensure_future(self._writer(queue))
+            for queue in self._queues
+        ]
+
+    async def close(self) -> None:
+        """ Write everything in the queues and stop the writers. """
+        if not self.is_started:
+            return
+        for queue in self._queues:
+            await queue.put(('stop', '', None))
+        await asyncio.gather(*self._tasks)
+
+        self._executor.shutdown() # type: ignore
+        self._executor, self._queues, self._tasks = None, [], []
+
+    async def __aenter__(self) -> 'DiskWriter':
+        self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    def _queue(self,
+               path: str) -> asyncio.Queue:
+        if not self.is_started:
+            msg = "Disk writer is not started"
+            logger.error(msg)
+            raise RuntimeError(msg)
+        return self._queues[hash(path) % self.threads]
+
+    async def open(self,
+                   path: str,
+                   append: bool = False) -> None:
+        """ Open the file to write, the file is created or cleared
+        if it is not appended.
+
+        :exception RuntimeError: if the writer is not started.
+        """
+        await self._queue(path).put(('open', path, append))
+
+    async def write(self,
+                    path: str,
+                    data: Union[bytes, bytearray]) -> None:
+        """ Put the content to the queue of the file's writer,
+        wait if the queue is full.
+
+        :exception RuntimeError: if the writer is not started.
+        """
+        await self._queue(path).put(('write', path, data))
+
+    async def close_file(self,
+                         path: str) -> None:
+        """ Wait for the content of the file to be written,
+        close it and flush to the disk if fsync is on.
+
+        :exception RuntimeError: if the writer is not started.
+        :exception OSError: if the content has not been written.
+        """
+        closed = asyncio.get_running_loop().create_future()
+        await self._queue(path).put(('close', path, closed))
+        await closed
+
+    async def _writer(self,
+                      queue: asyncio.Queue) -> None:
+        """ Write the content from the queue in the thread. """
+        loop = asyncio.get_running_loop()
+        files: Dict[str, BinaryIO] = {}
+        errors: Dict[str, Exception] = {}
+        # closed files waiting for fsync
+        to_flush: List[Tuple[BinaryIO, asyncio.Future]] = []
+
+        while True:
+            op, path, arg = await queue.get()
+            if op == 'stop':
+                break
+            try:
+                if path in errors and op != 'close':
+                    pass
+                elif op == 'open':
+                    files[path] = await loop.run_in_executor(
+                        self._executor, open, path, 'ab' if arg else 'wb')
+                elif op == 'write':
+                    await loop.run_in_executor(self._executor, files[path].write, arg)
+                elif op == 'close':
+                    file = files.pop(path, None)
+                    if path in errors:
+                        _set_result(arg, errors.pop(path))
+                    elif self.fsync:
+                        to_flush += [(file, arg)] # type: ignore
+                    else:
+                        await loop.run_in_executor(self._executor, file.close) # type: ignore
+                        _set_result(arg)
+            except Exception as e:
+                logger.error(f"Error while writing '{path}':\n{e}")
+                errors[path] = e
+                file = files.pop(path, None)
+                if file is not None:
+                    file.close()
+
+            if to_flush and (len(to_flush) >= self.fsync_batch or queue.empty()):
+                await self._flush(to_flush)
+                to_flush = []
+
+        await self._flush(to_flush)
+
+    async def _flush(self,
+                     to_flush: List[Tuple[BinaryIO, asyncio.Future]]) -> None:
+        """ Flush the files to the disk by one call to the thread. """
+        if not to_flush:
+            return
+        loop = asyncio.get_running_loop()
+        files = [file for file, _ in to_flush]
+        results = await loop.run_in_executor(self._executor, _fsync_and_close, files)
+
+        for (_, closed), error in zip(to_flush, results):
+            _set_result(closed, error)
+        logger.debug(f"{len(files)} files flushed to the disk")
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(threads={self.threads}, " \
+               f"buffer_size={self.buffer_size}, queue_size={self.queue_size}, " \
+               f"fsync={self.fsync}, fsync_batch={self.fsync_batch})"
+
+
+# writers of the downloads, which are not given one, by event loop
+_DEFAULT_WRITERS: Dict[asyncio.AbstractEventLoop, DiskWriter] = {}
+
+
+def default_writer() -> DiskWriter:
+    """ Get the started writer shared by the downloads in the running
+    event loop, which are not given a writer. The one of the background
+    loop (see rnc.loop) is closed with the loop, the others are stopped
+    with their loops and dropped when the loops are closed.
+    """
+    loop = asyncio.get_running_loop()
+    shared = background_loop()
+    if shared.in_loop():
+        writer = shared.shared('disk writer', DiskWriter)
+    else:
+        for closed in [key for key in _DEFAULT_WRITERS if key.is_closed()]:
+            executor = _DEFAULT_WRITERS.pop(closed)._executor
+            if executor is not None:
+                executor.shutdown(wait=False)
+        writer = _DEFAULT_WRITERS.get(loop) # type: ignore
+        if writer is None:
+            writer = _DEFAULT_WRITERS[loop] = DiskWriter()
+    writer.start()
+    return writer
@@ -0,0 +1,1493 @@
+"""
+Module with the compact container of examples, which keeps
+Corpus data in parallel arrays instead of a list of objects.
+"""
+
+__all__ = (
+    'ExampleStore',
+    'StoreIndex',
+    'HashIndex',
+    'WordformIndex',
+    'TextIndex',
+    'SourceIndex',
+    'DocumentIndex',
+    'DocumentStats',
+    'normalize_wordform',
+)
+
+import heapq
+import logging
+import random
+import sys
+import weakref
+from abc import ABC, abstractmethod
+from array import array
+from collections import Counter
+from collections.abc import MutableSequence
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Pattern, Set, Tuple, Type, Union
+
+import rnc.examples as expl
+from rnc.sources import SOURCE_FIELDS, parse_source
+from rnc.tokens import required_literals, tokenize
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+logger = logging.getLogger("rnc")
+
+# the segments of the changed rows are collected, when their
+# size is above the min one and the size of the live segments
+GARBAGE_MIN_SIZE = 64 * 1024
+
+
+class StringTable:
+    """ Interned strings: every distinct string is kept once
+    and the rows refer to it by its id.
+    """
+    __slots__ = '_strings', '_ids'
+
+    def __init__(self) -> None:
+        self._strings: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def intern(self,
+               value: str) -> int:
+        """ Get id of the string, add it to the table if it is new. """
+        try:
+            return self._ids[value]
+        except KeyError:
+            index = self._ids[value] = len(self._strings)
+            self._strings.append(value)
+            return index
+
+    def lookup(self,
+               ids: Iterable[int]) -> List[str]:
+        """ Get the strings by their ids. """
+        strings = self._strings
+        return [strings[index] for index in ids]
+
+    def get_id(self,
+               value: str) -> int:
+        """ Get id of the string or -1 if it is not in the table. """
+        return self._ids.get(value, -1)
+
+    @property
+    def nbytes(self) -> int:
+        """ Approximate size of the strings. """
+        return sum(map(sys.getsizeof, self._strings))
+
+    def __getitem__(self,
+                    index: int) -> str:
+        return self._strings[index]
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+
+def normalize_wordform(form: str) -> str:
+    """ Remove duplicate spaces from the found wordform, strip and lower it. """
+    return ' '.join(form.split()).lower()
+
+
+def _grow(values: array,
+          size: int) -> None:
+    """ Add zeros to the end of the array up to the size. """
+    if len(values) < size:
+        values.frombytes(bytes(values.itemsize * (size - len(values))))
+
+
+def _all_str(values: Iterable[Any]) -> bool:
+    return all(isinstance(value, str) for value in values)
+
+
+def _check_example(obj: Any) -> None:
+    """ :exception TypeError: if the obj is not an Example. """
+    if not isinstance(obj, expl.Example):
+        msg = f"Example expected, but '{type(obj)}' found"
+        logger.error(msg)
+        raise TypeError(msg)
+
+
+class Columns:
+    """ Rows of examples kept in parallel arrays.
+
+    Texts are encoded to one utf-8 buffer, sources, URLs,
+    ambiguations etc. (keys) and found wordforms are interned.
+
+    A row is never moved or removed, if the example changes
+    it gets new segments at the end of the buffers and the old
+    ones become garbage. So the row ids are stable and the
+    columns might be shared by several stores. The garbage is
+    collected when it outgrows the live segments, the rows of
+    removed examples are kept until the store is compacted.
+    """
+
+    def __init__(self) -> None:
+        # example types, row refers to it by its index
+        self.types: List[Any] = []
+        self.row_type = array('B')
+        # where the segments of the row start and how many of them
+        self.txt_start = array('q')
+        self.txt_count = array('I')
+        self.key_start = array('q')
+        self.key_count = array('I')
+        self.wf_start = array('q')
+        self.wf_count = array('I')
+
+        # text segments in the buffer
+        self.buffer = bytearray()
+        self.seg_offset = array('q')
+        self.seg_length = array('q')
+
+        self.key_table = StringTable()
+        self.keys = array('i')
+        self.wordform_table = StringTable()
+        self.wordforms = array('i')
+        # normalized wordforms, they are got once for every distinct
+        # wordform, and id of the normalized form by id of the wordform
+        self.normalized_table = StringTable()
+        self.wordform_normalized = array('i')
+
+        # size of the segments of the changed rows in bytes
+        self.garbage = 0
+        # copies of examples with not str fields
+        self.overflow: Dict[int, Any] = {}
+        # stores with indexes over these columns,
+        # they are notified when a row changes
+        self.stores: 'weakref.WeakValueDictionary[int, ExampleStore]' = \
+            weakref.WeakValueDictionary()
+
+    def __len__(self) -> int:
+        return len(self.row_type)
+
+    @property
+    def nbytes(self) -> int:
+        """ Approximate size of the columns in bytes. """
+        arrays = (
+            self.row_type, self.txt_start, self.txt_count,
+            self.key_start, self.key_count, self.wf_start,
+            self.wf_count, self.seg_offset, self.seg_length,
+            self.keys, self.wordforms, self.wordform_normalized
+        )
+        size = sum(arr.itemsize * len(arr) for arr in arrays)
+        size += len(self.buffer)
+        size += self.key_table.nbytes + self.wordform_table.nbytes
+        size += self.normalized_table.nbytes
+        return size
+
+    def _type_id(self,
+                 ex_type: type) -> int:
+        try:
+            return self.types.index(ex_type)
+        except ValueError:
+            self.types.append(ex_type)
+            return len(self.types) - 1
+
+    def append(self,
+               example: Any) -> int:
+        """ Add the example to the end and bind it to the row,
+        the example might be bound to the rows of other columns too.
+
+        :return: int, id of the new row.
+        :exception TypeError: if the obj is not an Example.
+        """
+        _check_example(example)
+
+        row = len(self)
+        self.row_type.append(self._type_id(example.__class__))
+        for arr in (self.txt_start, self.txt_count, self.key_start,
+                    self.key_count, self.wf_start, self.wf_count):
+            arr.append(0)
+        self._write(row, example)
+        example._bind(self, row)
+        return row
+
+    @property
+    def _segments_size(self) -> int:
+        """ Size of the text, key and wordform segments in bytes. """
+        arrays = (self.seg_offset, self.seg_length, self.keys, self.wordforms)
+        return len(self.buffer) + sum(arr.itemsize * len(arr) for arr in arrays)
+
+    def _row_size(self,
+                  row: int) -> int:
+        """ Size of the segments of the row in bytes. """
+        start, count = self.txt_start[row], self.txt_count[row]
+        size = sum(self.seg_length[start:start + count])
+        size += (self.seg_offset.itemsize + self.seg_length.itemsize) * count
+        size += self.keys.itemsize * self.key_count[row]
+        return size + self.wordforms.itemsize * self.wf_count[row]
+
+    def _write(self,
+               row: int,
+               example: Any) -> None:
+        texts, keys, found_wordforms = example._to_row()
+        self.overflow.pop(row, None)
+        self.garbage += self._row_size(row)
+
+        if not (_all_str(texts) and _all_str(keys) and _all_str(found_wordforms)):
+            self.overflow[row] = example.copy()
+            self.txt_count[row] = self.key_count[row] = self.wf_count[row] = 0
+            return
+
+        self.txt_start[row] = len(self.seg_offset)
+        self.txt_count[row] = len(texts)
+        for text in texts:
+            encoded = text.encode('utf-8')
+            self.seg_offset.append(len(self.buffer))
+            self.seg_length.append(len(encoded))
+            self.buffer += encoded
+
+        self.key_start[row] = len(self.keys)
+        self.key_count[row] = len(keys)
+        self.keys.extend(map(self.key_table.intern, keys))
+
+        self.wf_start[row] = len(self.wordforms)
+        self.wf_count[row] = len(found_wordforms)
+        self.wordforms.extend(map(self._intern_wordform, found_wordforms))
+
+        if self.garbage >= GARBAGE_MIN_SIZE and \
+                self.garbage * 2 >= self._segments_size:
+            self.collect_garbage()
+
+    def collect_garbage(self) -> None:
+        """ Move the segments of the rows to the new buffers
+        without the garbage, the row ids are not changed.
+        """
+        buffer, seg_offset, seg_length = bytearray(), array('q'), array('q')
+        keys, wordforms = array('i'), array('i')
+        txt_start, key_start, wf_start = array('q'), array('q'), array('q')
+
+        for row in range(len(self)):
+            txt_start.append(len(seg_offset))
+            start = self.txt_start[row]
+            for seg in range(start, start + self.txt_count[row]):
+                offset, length = self.seg_offset[seg], self.seg_length[seg]
+                seg_offset.append(len(buffer))
+                seg_length.append(length)
+                buffer += self.buffer[offset:offset + length]
+
+            key_start.append(len(keys))
+            keys.extend(self.key_ids(row))
+            wf_start.append(len(wordforms))
+            wordforms.extend(self.wordform_ids(row))
+
+        logger.debug(f"{self.garbage} bytes of garbage collected")
+        self.buffer, self.seg_offset, self.seg_length = buffer, seg_offset, seg_length
+        self.keys, self.wordforms = keys, wordforms
+        self.txt_start, self.key_start, self.wf_start = txt_start, key_start, wf_start
+        self.garbage = 0
+
+    def _intern_wordform(self,
+                         form: str) -> int:
+        index = self.wordform_table.intern(form)
+        if index == len(self.wordform_normalized):
+            normalized = self.normalized_table.intern(normalize_wordform(form))
+            self.wordform_normalized.append(normalized)
+        return index
+
+    def update(self,
+               row: int,
+               example: Any) -> None:
+        """ Rewrite the row with the changed example,
+        update indexes of the stores containing the row.
+        """
+        stores = [
+            store
+            for store in self.stores.values()
+            if store._has_row(row)
+        ]
+        for store in stores:
+            store._discard_rows((row, ))
+
+        self.row_type[row] = self._type_id(example.__class__)
+        self._write(row, example)
+
+        for store in stores:
+            store._add_rows((row, ))
+
+    def texts(self,
+              row: int) -> Tuple[str, ...]:
+        start, count = self.txt_start[row], self.txt_count[row]
+        buffer, offsets, lengths = self.buffer, self.seg_offset, self.seg_length
+        return tuple(
+            buffer[offsets[seg]:offsets[seg] + lengths[seg]].decode('utf-8')
+            for seg in range(start, start + count)
+        )
+
+    def row_key(self,
+                row: int) -> Any:
+        """ Get hashable content of the row: example type,
+        encoded texts and ids of keys and wordforms.
+        Copy of the example if its fields are not str.
+        """
+        if row in self.overflow:
+            return self.overflow[row]
+
+        start, count = self.txt_start[row], self.txt_count[row]
+        buffer, offsets, lengths = self.buffer, self.seg_offset, self.seg_length
+        texts = tuple(
+            bytes(buffer[offsets[seg]:offsets[seg] + lengths[seg]])
+            for seg in range(start, start + count)
+        )
+        return (self.types[self.row_type[row]], texts,
+                tuple(self.key_ids(row)), tuple(self.wordform_ids(row)))
+
+    def example_key(self,
+                    example: Any) -> Any:
+        """ Get the same content as 'row_key()' returns for the
+        example, None if there is no such row (a key or a
+        wordform is not interned).
+        """
+        texts, keys, found_wordforms = example._to_row()
+        if not (_all_str(texts) and _all_str(keys) and _all_str(found_wordforms)):
+            return example
+
+        key_ids = tuple(map(self.key_table.get_id, keys))
+        wf_ids = tuple(map(self.wordform_table.get_id, found_wordforms))
+        if -1 in key_ids or -1 in wf_ids:
+            return None
+        texts = tuple(text.encode('utf-8') for text in texts)
+        return example.__class__, texts, key_ids, wf_ids
+
+    def key_ids(self,
+                row: int) -> array:
+        start = self.key_start[row]
+        return self.keys[start:start + self.key_count[row]]
+
+    def wordform_ids(self,
+                     row: int) -> array:
+        start = self.wf_start[row]
+        return self.wordforms[start:start + self.wf_count[row]]
+
+    def normalized_ids(self,
+                       row: int) -> List[int]:
+        """ Get ids of the normalized found wordforms of the row. """
+        if row in self.overflow:
+            intern = self.normalized_table.intern
+            return [
+                intern(normalize_wordform(str(form)))
+                for form in self.overflow[row].found_wordforms
+            ]
+
+        normalized = self.wordform_normalized
+        return [normalized[wf] for wf in self.wordform_ids(row)]
+
+    def get(self,
+            row: int) -> Any:
+        """ Create the example from the row and bind it to the row,
+        so the changes of the example are written back.
+        """
+        if row in self.overflow:
+            example = self.overflow[row].copy()
+        else:
+            example = self.types[self.row_type[row]]._from_row(
+                self.texts(row),
+                tuple(self.key_table.lookup(self.key_ids(row))),
+                self.wordform_table.lookup(self.wordform_ids(row))
+            )
+        example._bind(self, row)
+        return example
+
+
+class StoreIndex(ABC):
+    """ Base class for the indexes over the rows of a store.
+
+    The store creates the index when it is requested first time
+    and keeps it up to date: calls 'add' when a row appears in the
+    store and 'discard' before it is removed or changed.
+    """
+
+    def __init__(self,
+                 columns: Columns) -> None:
+        self._columns = columns
+
+    @abstractmethod
+    def add(self,
+            row: int) -> None:
+        pass
+
+    @abstractmethod
+    def discard(self,
+                row: int) -> None:
+        pass
+
+    def add_rows(self,
+                 rows: Iterable[int]) -> None:
+        for row in rows:
+            self.add(row)
+
+    def discard_rows(self,
+                     rows: Iterable[int]) -> None:
+        for row in rows:
+            self.discard(row)
+
+
+class HashIndex(StoreIndex):
+    """ Content hashes of the examples to their rows.
+
+    Content of the row (see Columns.row_key) is hashed, so the rows
+    are not turned to examples. Examples are equal here if they have
+    the same type and fields.
+    """
+
+    def __init__(self,
+                 columns: Columns) -> None:
+        super().__init__(columns)
+        # hash of the row by its id
+        self._row_hash = array('q')
+        # hash to the row or to the list of rows with it
+        self._rows: Dict[int, Any] = {}
+
+    def add(self,
+            row: int) -> None:
+        value = hash(self._columns.row_key(row))
+
+        row_hash = self._row_hash
+        if row >= len(row_hash):
+            row_hash.extend([0] * (row + 1 - len(row_hash)))
+        row_hash[row] = value
+
+        rows = self._rows.get(value)
+        if rows is None:
+            self._rows[value] = row
+        elif isinstance(rows, list):
+            rows.append(row)
+        else:
+            self._rows[value] = [rows, row]
+
+    def discard(self,
+                row: int) -> None:
+        value = self._row_hash[row]
+        rows = self._rows[value]
+        if isinstance(rows, list):
+            rows.remove(row)
+            if len(rows) == 1:
+                self._rows[value] = rows[0]
+        else:
+            del self._rows[value]
+
+    def row_hash(self,
+                 row: int) -> int:
+        return self._row_hash[row]
+
+    def rows(self,
+             value: int) -> List[int]:
+        """ Get rows with the hash. """
+        rows = self._rows.get(value, [])
+        if isinstance(rows, list):
+            return rows
+        return [rows]
+
+    def find(self,
+             example: Any) -> Optional[int]:
+        """ Get the row equal to the example or None. """
+        key = self._columns.example_key(example)
+        if key is None:
+            return None
+
+        row_key = self._columns.row_key
+        for row in self.rows(hash(key)):
+            if row_key(row) == key:
+                return row
+        return None
+
+
+class WordformIndex(StoreIndex):
+    """ Frequencies of the normalized found wordforms. """
+
+    def __init__(self,
+                 columns: Columns) -> None:
+        super().__init__(columns)
+        # frequency by id of the normalized wordform
+        self._counts = array('q')
+        self._total = 0
+
+    def add(self,
+            row: int) -> None:
+        counts = self._counts
+        for form in self._columns.normalized_ids(row):
+            if form >= len(counts):
+                counts.extend([0] * (form + 1 - len(counts)))
+            counts[form] += 1
+            self._total += 1
+
+    def discard(self,
+                row: int) -> None:
+        counts = self._counts
+        for form in self._columns.normalized_ids(row):
+            counts[form] -= 1
+            self._total -= 1
+
+    @property
+    def total(self) -> int:
+        """ Count of all found wordforms. """
+        return self._total
+
+    def counts(self) -> Counter:
+        """ Get found wordforms with their frequencies. """
+        table = self._columns.normalized_table
+        return Counter({
+            table[form]: count
+            for form, count in enumerate(self._counts)
+            if count
+        })
+
+    def most_common(self,
+                    count: Optional[int] = None) -> List[Tuple[str, int]]:
+        """ Get the most common wordforms with their frequencies,
+        all of them if count is None.
+        """
+        table, counts = self._columns.normalized_table, self._counts
+        forms = (form for form, freq in enumerate(counts) if freq)
+        if count is None:
+            top = sorted(forms, key=counts.__getitem__, reverse=True)
+        else:
+            top = heapq.nlargest(count, forms, key=counts.__getitem__)
+        return [(table[form], counts[form]) for form in top]
+
+    def frequency(self,
+                  form: str) -> float:
+        """ Get relative frequency of the wordform, it is normalized. """
+        index = self._columns.normalized_table.get_id(normalize_wordform(form))
+        if index == -1 or index >= len(self._counts) or not self._total:
+            return 0.
+        return self._counts[index] / self._total
+
+
+class TextIndex(StoreIndex):
+    """ Inverted index of the normalized tokens (see rnc.tokens)
+    of the examples' texts to the rows containing them.
+
+    Rows are not removed from the postings when they are discarded,
+    the postings are checked with the current tokens of the row and
+    rebuilt when there are more stale entries than actual ones.
+    """
+
+    def __init__(self,
+                 columns: Columns) -> None:
+        super().__init__(columns)
+        self._vocabulary = StringTable()
+        # rows by token id
+        self._postings: List[array] = []
+        # token ids of the row by its id, None if the row is discarded
+        self._row_tokens: List[Optional[array]] = []
+        self._entries = 0
+        self._stale = 0
+        # token ids containing the literal and the size
+        # of the vocabulary when they were searched
+        self._substrings: Dict[str, Tuple[int, List[int]]] = {}
+
+    def _texts(self,
+               row: int) -> Iterable[str]:
+        columns = self._columns
+        if row in columns.overflow:
+            texts, _, _ = columns.overflow[row]._to_row()
+            return map(str, texts)
+        return columns.texts(row)
+
+    def add(self,
+            row: int) -> None:
+        intern, postings = self._vocabulary.intern, self._postings
+        tokens = array('i', map(intern, chain.from_iterable(map(tokenize, self._texts(row)))))
+
+        row_tokens = self._row_tokens
+        if row >= len(row_tokens):
+            row_tokens.extend([None] * (row + 1 - len(row_tokens)))
+        row_tokens[row] = tokens
+
+        distinct = set(tokens)
+        for token in distinct:
+            if token >= len(postings):
+                postings.extend(array('q') for _ in range(token + 1 - len(postings)))
+            postings[token].append(row)
+        self._entries += len(distinct)
+
+    def discard(self,
+                row: int) -> None:
+        tokens = self._row_tokens[row]
+        if tokens is None:
+            return
+
+        self._row_tokens[row] = None
+        self._stale += len(set(tokens))
+        if self._stale > self._entries - self._stale:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        """ Remove stale entries from the postings. """
+        postings = [array('q') for _ in self._postings]
+        for row, tokens in enumerate(self._row_tokens):
+            if tokens is not None:
+                for token in set(tokens):
+                    postings[token].append(row)
+
+        self._postings = postings
+        self._entries -= self._stale
+        self._stale = 0
+
+    def _token_rows(self,
+                    token: int) -> Set[int]:
+        """ Get rows containing the token by its id. """
+        if token < 0 or token >= len(self._postings):
+            return set()
+
+        rows = self._postings[token]
+        if not self._stale:
+            return set(rows)
+
+        row_tokens = self._row_tokens
+        result = set()
+        for row in rows:
+            tokens = row_tokens[row]
+            if tokens is not None and token in tokens:
+                result.add(row)
+        return result
+
+    def _containing(self,
+                    literal: str) -> List[int]:
+        """ Get ids of the tokens containing the literal,
+        the vocabulary is scanned only since the last search.
+        """
+        vocabulary = self._vocabulary
+        scanned, tokens = self._substrings.get(literal, (0, []))
+        tokens = tokens + [
+            token
+            for token in range(scanned, len(vocabulary))
+            if literal in vocabulary[token]
+        ]
+        self._substrings[literal] = (len(vocabulary), tokens)
+        return tokens
+
+    def word_rows(self,
+                  word: str) -> Set[int]:
+        """ Get rows containing the word, it is normalized. """
+        tokens = tokenize(word)
+        if len(tokens) != 1:
+            return set()
+        return self._token_rows(self._vocabulary.get_id(tokens[0]))
+
+    def phrase_rows(self,
+                    phrase: str) -> Set[int]:
+        """ Get rows containing the words of the phrase one by one. """
+        tokens = [
+            self._vocabulary.get_id(token)
+            for token in tokenize(phrase)
+        ]
+        if not tokens or -1 in tokens:
+            return set()
+
+        rows = self._intersection(self._token_rows(token) for token in set(tokens))
+        if len(tokens) == 1:
+            return rows
+
+        row_tokens, length = self._row_tokens, len(tokens)
+        result = set()
+        for row in rows:
+            text = row_tokens[row].tolist()  # type: ignore
+            if any(text[start:start + length] == tokens
+                   for start, token in enumerate(text)
+                   if token == tokens[0]):
+                result.add(row)
+        return result
+
+    def literal_rows(self,
+                     literals: Iterable[str]) -> Set[int]:
+        """ Get rows with the tokens containing all the literals. """
+        return self._intersection(
+            set().union(*map(self._token_rows, self._containing(literal)))
+            for literal in literals
+        )
+
+    @staticmethod
+    def _intersection(sets: Iterable[Set[int]]) -> Set[int]:
+        result: Optional[Set[int]] = None
+        for rows in sets:
+            result = rows if result is None else result & rows
+            if not result:
+                return set()
+        return result or set()
+
+
+class SourceIndex(StoreIndex):
+    """ Fields of the examples' sources (see rnc.sources.parse_source)
+    by row, kept in arrays to filter and sort the rows without
+    creating the examples. NumPy is used if it is installed.
+
+    Every distinct source is parsed once. Authors, titles and
+    genres are interned and the rows refer to them by ids,
+    unknown year is kept as 0.
+    """
+    STR_FIELDS = ('author', 'title', 'genre')
+
+    def __init__(self,
+                 columns: Columns) -> None:
+        super().__init__(columns)
+        self.tables = {
+            field: StringTable()
+            for field in self.STR_FIELDS
+        }
+        # values of the fields by row
+        self.values = {
+            field: array('i')
+            for field in SOURCE_FIELDS
+        }
+        # values of the fields by id of the source in the key table
+        self._parsed: Dict[int, Tuple[int, ...]] = {}
+
+    def _parse(self,
+               source: str) -> Tuple[int, ...]:
+        info, tables = parse_source(source), self.tables
+        return (tables['author'].intern(info.author),
+                tables['title'].intern(info.title),
+                info.year or 0,
+                tables['genre'].intern(info.genre))
+
+    def add(self,
+            row: int) -> None:
+        self.add_rows((row, ))
+
+    def add_rows(self,
+                 rows: Iterable[int]) -> None:
+        columns = self._columns
+        overflow, parsed = columns.overflow, self._parsed
+        keys, key_start, key_table = columns.keys, columns.key_start, columns.key_table
+
+        arrays = [self.values[field] for field in SOURCE_FIELDS]
+        for values in arrays:
+            _grow(values, len(columns))
+        author, title, year, genre = arrays
+
+        for row in rows:
+            if row in overflow:
+                fields = self._parse(str(overflow[row].src))
+            else:
+                # source is the first key of all examples
+                source = keys[key_start[row]]
+                fields = parsed.get(source)  # type: ignore
+                if fields is None:
+                    fields = parsed[source] = self._parse(key_table[source])
+            author[row], title[row], year[row], genre[row] = fields
+
+    def discard(self,
+                row: int) -> None:
+        # values of the row are rewritten when it is added again
+        pass
+
+    def discard_rows(self,
+                     rows: Iterable[int]) -> None:
+        pass
+
+    @classmethod
+    def check_field(cls,
+                    field: str) -> None:
+        """
+        :exception ValueError: if there is no such field.
+        """
+        if field not in SOURCE_FIELDS:
+            msg = f"Source fields: {SOURCE_FIELDS}, but '{field}' found"
+            logger.error(msg)
+            raise ValueError(msg)
+
+    def _ranks(self,
+               field: str) -> List[int]:
+        """ Get positions of the strings in the sorted table by their ids. """
+        table = self.tables[field]
+        ranks = [0] * len(table)
+        for rank, index in enumerate(sorted(range(len(table)), key=table.__getitem__)):
+            ranks[index] = rank
+        return ranks
+
+    def column(self,
+               field: str,
+               rows: array) -> Any:
+        """ Get values of the field for the rows.
+
+        :return: NumPy array if it is installed, list otherwise.
+         Years are int, 0 if unknown, other fields are str.
+        """
+        self.check_field(field)
+        ids = self._ids(field, rows)
+        if field == 'year':
+            return ids
+
+        strings = self.tables[field].lookup(range(len(self.tables[field])))
+        if np is not None:
+            return np.array(strings, dtype=object)[ids]
+        return [strings[index] for index in ids]
+
+    def _ids(self,
+             field: str,
+             rows: array) -> Any:
+        values = self.values[field]
+        if np is not None:
+            return np.frombuffer(values, dtype=np.intc)[np.frombuffer(rows, dtype=np.longlong)]
+        return [values[row] for row in rows]
+
+    def select(self,
+               rows: array,
+               year: Optional[int] = None,
+               min_year: Optional[int] = None,
+               max_year: Optional[int] = None,
+               **fields: Any) -> Tuple[array, array]:
+        """ Split the rows to satisfying the conditions and not.
+
+        :param rows: array of the rows.
+        :param year: int, year of the source.
+        :param min_year: int, the first year, inclusive.
+        :param max_year: int, the last year, inclusive.
+        :param fields: str or collection of str, values of
+         author, title or genre.
+        :return: arrays of the kept and of the removed rows.
+        :exception ValueError: if there is no such field.
+        """
+        conditions = []
+        for field, value in fields.items():
+            self.check_field(field)
+            values = (value, ) if isinstance(value, str) else value
+            table = self.tables[field]
+            conditions.append((field, [table.get_id(value) for value in values]))
+
+        if np is not None:
+            rows_np = np.frombuffer(rows, dtype=np.longlong)
+            keep = np.ones(len(rows_np), dtype=bool)
+            for field, ids in conditions:
+                keep &= np.isin(self._ids(field, rows), ids)
+            if year is not None or min_year is not None or max_year is not None:
+                years = self._ids('year', rows)
+                keep &= years != 0
+                if year is not None:
+                    keep &= years == year
+                if min_year is not None:
+                    keep &= years >= min_year
+                if max_year is not None:
+                    keep &= years <= max_year
+            return array('q', rows_np[keep].tobytes()), array('q', rows_np[~keep].tobytes())
+
+        checks = [
+            (self.values[field], set(ids))
+            for field, ids in conditions
+        ]
+        years_values = self.values['year']
+        kept, removed = array('q'), array('q')
+        for row in rows:
+            value = years_values[row]
+            if (all(values[row] in ids for values, ids in checks) and
+                    (year is None or value == year) and
+                    (min_year is None or 0 != value >= min_year) and
+                    (max_year is None or 0 != value <= max_year)):
+                kept.append(row)
+            else:
+                removed.append(row)
+        return kept, removed
+
+    def year_counts(self,
+                    rows: array) -> Dict[int, int]:
+        """ Get count of the rows by year, unknown years are skipped. """
+        years = self._ids('year', rows)
+        if np is not None:
+            values, counts = np.unique(years[years != 0], return_counts=True)
+            return dict(zip(values.tolist(), counts.tolist()))
+
+        counts = Counter(years)
+        counts.pop(0, None)
+        return dict(sorted(counts.items()))
+
+    def sort(self,
+             rows: array,
+             field: str,
+             reverse: bool = False) -> array:
+        """ Get the rows sorted by the field, stable.
+        Unknown years are the least ones.
+
+        :exception ValueError: if there is no such field.
+        """
+        self.check_field(field)
+        keys = self._ids(field, rows)
+        if field != 'year':
+            ranks = self._ranks(field)
+            if np is not None:
+                keys = np.array(ranks, dtype=np.intc)[keys]
+            else:
+                keys = [ranks[key] for key in keys]
+
+        if np is not None:
+            rows_np = np.frombuffer(rows, dtype=np.longlong)
+            indexes = np.argsort(-keys if reverse else keys, kind='stable')
+            return array('q', rows_np[indexes].tobytes())
+
+        indexes = sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+        return array('q', (rows[index] for index in indexes))
+
+
+class DocumentStats(NamedTuple):
+    doc_url: str
+    source: str
+    examples: int
+    found_wordforms: int
+
+
+class DocumentIndex(StoreIndex):
+    """ Rows of the examples grouped by their documents, the
+    document is got by doc_url. The examples are grouped the same
+    way the parser gets them from the documents of the pages.
+
+    Documents are kept in the order they appeared in the store,
+    their rows in the order they were added.
+    """
+
+    def __init__(self,
+                 columns: Columns) -> None:
+        super().__init__(columns)
+        # id of doc_url in the key table by row
+        self._row_doc = array('i')
+        # id of doc_url to its rows, dicts keep the order
+        self._docs: Dict[int, Dict[int, None]] = {}
+
+    def _doc_id(self,
+                row: int) -> int:
+        columns = self._columns
+        if row in columns.overflow:
+            return columns.key_table.intern(str(columns.overflow[row].doc_url))
+
+        ex_type = columns.types[columns.row_type[row]]
+        return columns.keys[columns.key_start[row] + ex_type._DOC_URL_KEY]
+
+    def add(self,
+            row: int) -> None:
+        self.add_rows((row, ))
+
+    def add_rows(self,
+                 rows: Iterable[int]) -> None:
+        row_doc, docs = self._row_doc, self._docs
+        _grow(row_doc, len(self._columns))
+
+        for row in rows:
+            doc = row_doc[row] = self._doc_id(row)
+            try:
+                docs[doc][row] = None
+            except KeyError:
+                docs[doc] = {row: None}
+
+    def discard(self,
+                row: int) -> None:
+        doc = self._row_doc[row]
+        rows = self._docs[doc]
+        del rows[row]
+        if not rows:
+            del self._docs[doc]
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def documents(self) -> Iterator[Tuple[str, List[int]]]:
+        """ Get doc_url and the rows of every document. """
+        key_table = self._columns.key_table
+        for doc, rows in self._docs.items():
+            yield key_table[doc], list(rows)
+
+    def rows(self,
+             doc_url: str) -> List[int]:
+        """ Get rows of the document, empty if there is no such one. """
+        doc = self._columns.key_table.get_id(doc_url)
+        return list(self._docs.get(doc, ()))
+
+    def stats(self) -> List[DocumentStats]:
+        """ Get doc_url, source of the first example, count
+        of the examples and of the found wordforms of every
+        document. The examples are not created.
+        """
+        columns = self._columns
+        key_table, keys, key_start = columns.key_table, columns.keys, columns.key_start
+        wf_count, overflow = columns.wf_count, columns.overflow
+
+        result = []
+        for doc, rows in self._docs.items():
+            first = next(iter(rows))
+            if first in overflow:
+                source = str(overflow[first].src)
+            else:
+                source = key_table[keys[key_start[first]]]
+
+            wordforms = sum(
+                len(overflow[row].found_wordforms) if row in overflow else wf_count[row]
+                for row in rows
+            )
+            result.append(DocumentStats(key_table[doc], source, len(rows), wordforms))
+        return result
+
+
+class ExampleStore(MutableSequence):
+    """ List-like container of examples, keeping them in compact
+    columns. Getting an item creates the example from its row,
+    changes of the example (setting text, source etc.) are written
+    back to the row.
+
+    Slices and copies share the columns and the order of rows
+    with the store, they are views of its positions. The order is
+    copied when the view or the store is changed first time.
+
+    Indexes (see StoreIndex) are created on demand and
+    updated by all the methods changing the store.
+    """
+
+    def __init__(self,
+                 examples: Iterable[Any] = ()) -> None:
+        """
+        :param examples: iterable of Example objects.
+        """
+        self._columns = Columns()
+        # ids of the rows in the columns
+        self._order = array('q')
+        # positions of the order this store consists of,
+        # None if it is the whole order
+        self._view: Optional[range] = None
+        # whether the order is viewed by other stores
+        self._shared = False
+        self._indexes: Dict[type, StoreIndex] = {}
+        # whether the row is in the store, kept if there are indexes
+        self._members = bytearray()
+        self.extend(examples)
+
+    @classmethod
+    def _from_columns(cls,
+                      columns: Columns,
+                      order: array,
+                      view: Optional[range] = None) -> 'ExampleStore':
+        """ Create the store on the given columns and
+        the positions of the order if view given.
+        """
+        store = cls.__new__(cls)
+        store._columns = columns
+        store._order = order
+        store._view = view
+        store._shared = False
+        store._indexes = {}
+        store._members = bytearray()
+        return store
+
+    def _rows(self) -> Iterable[int]:
+        """ Get ids of the rows in the store order. """
+        if self._view is None:
+            return self._order
+        return map(self._order.__getitem__, self._view)
+
+    def _writable_order(self) -> array:
+        """ Get the order, which might be changed in place,
+        copy it if it is shared with other stores.
+        """
+        if self._view is not None:
+            self._set_order(array('q', self._rows()))
+        elif self._shared:
+            self._set_order(self._order[:])
+        return self._order
+
+    def _set_order(self,
+                   order: array) -> None:
+        self._order = order
+        self._view = None
+        self._shared = False
+
+    def get_index(self,
+                  index_type: Type[StoreIndex]) -> Any:
+        """ Get the index, create it if it does not exist. """
+        try:
+            return self._indexes[index_type]
+        except KeyError:
+            pass
+
+        if not self._indexes:
+            self._members = bytearray(len(self._columns))
+            for row in self._rows():
+                self._members[row] = 1
+            self._columns.stores[id(self)] = self
+
+        index = index_type(self._columns)
+        index.add_rows(self._rows())
+        self._indexes[index_type] = index
+        return index
+
+    def row_ids(self) -> array:
+        """ Get ids of the rows in the store order,
+        the indexes (see get_index) work with them.
+        """
+        return array('q', self._rows())
+
+    def reorder(self,
+                rows: array) -> None:
+        """ Order the examples like their rows, the rows
+        should be the ones of the store (see row_ids).
+        """
+        self._set_order(rows)
+
+    def _drop_indexes(self) -> None:
+        self._columns.stores.pop(id(self), None)
+        self._indexes = {}
+        self._members = bytearray()
+
+    def _has_row(self,
+                 row: int) -> bool:
+        members = self._members
+        return row < len(members) and members[row] == 1
+
+    def _add_rows(self,
+                  rows: Iterable[int]) -> None:
+        if not self._indexes:
+            return
+
+        rows = list(rows)
+        members = self._members
+        members.extend(bytes(len(self._columns) - len(members)))
+        for row in rows:
+            members[row] = 1
+        for index in self._indexes.values():
+            index.add_rows(rows)
+
+    def _discard_rows(self,
+                      rows: Iterable[int]) -> None:
+        if not self._indexes:
+            return
+
+        rows = list(rows)
+        members = self._members
+        for row in rows:
+            members[row] = 0
+        for index in self._indexes.values():
+            index.discard_rows(rows)
+
+    def _append_row(self,
+                    example: Any) -> int:
+        row = self._columns.append(example)
+        self._add_rows((row, ))
+        return row
+
+    @property
+    def nbytes(self) -> int:
+        """ Approximate size of the data in bytes, the shared
+        order is counted if the store is a view.
+        """
+        order = self._order
+        return self._columns.nbytes + order.itemsize * len(order)
+
+    def __len__(self) -> int:
+        if self._view is None:
+            return len(self._order)
+        return len(self._view)
+
+    def __iter__(self) -> Iterator[Any]:
+        get = self._columns.get
+        for row in self._rows():
+            yield get(row)
+
+    def __getitem__(self,
+                    item: Union[int, slice]) -> Any:
+        """ Get example at the index or the view of the store
+        with sliced data, the data is not copied.
+        """
+        view = self._view
+        if view is None:
+            view = range(len(self._order))
+
+        if isinstance(item, slice):
+            self._shared = True
+            return self._from_columns(self._columns, self._order, view[item])
+        return self._columns.get(self._order[view[item]])
+
+    def __setitem__(self,
+                    item: Union[int, slice],
+                    value: Any) -> None:
+        order = self._writable_order()
+        if isinstance(item, slice):
+            value = list(value)
+            old_rows = order[item]
+            # nothing is added to the columns if the values do not fit
+            if item.step not in (None, 1) and len(value) != len(old_rows):
+                msg = f"Attempt to assign sequence of size {len(value)} " \
+                      f"to extended slice of size {len(old_rows)}"
+                logger.error(msg)
+                raise ValueError(msg)
+            for example in value:
+                _check_example(example)
+            rows = array('q', map(self._columns.append, value))
+            order[item] = rows
+        else:
+            if not -len(self) <= item < len(self):
+                raise IndexError("ExampleStore assignment index out of range")
+            old_rows = array('q', [order[item]])
+            rows = array('q', [self._columns.append(value)])
+            order[item] = rows[0]
+
+        self._discard_rows(old_rows)
+        self._add_rows(rows)
+
+    def __delitem__(self,
+                    item: Union[int, slice]) -> None:
+        order = self._writable_order()
+        if isinstance(item, slice):
+            rows = order[item]
+        else:
+            rows = array('q', [order[item]])
+        del order[item]
+        self._discard_rows(rows)
+
+    def _select(self,
+                rows: Set[int]) -> Iterator[Any]:
+        """ Get examples of the rows in the store order. """
+        get = self._columns.get
+        for row in filter(rows.__contains__, self._rows()):
+            yield get(row)
+
+    def regex_candidates(self,
+                         pattern: Pattern) -> Iterator[Any]:
+        """ Get examples, which texts might match the pattern.
+
+        If the pattern requires some literals, the text index
+        is used to skip the examples not containing them.
+        Otherwise all examples are returned.
+        """
+        literals = required_literals(pattern)
+        if not literals:
+            return iter(self)
+
+        index = self.get_index(TextIndex)
+        return self._select(index.literal_rows(literals))
+
+    def find_word(self,
+                  word: str) -> Iterator[Any]:
+        """ Get examples containing the word, case is ignored. """
+        return self._select(self.get_index(TextIndex).word_rows(word))
+
+    def find_phrase(self,
+                    phrase: str) -> Iterator[Any]:
+        """ Get examples containing the words of the phrase
+        one by one, case and punctuation are ignored.
+        """
+        return self._select(self.get_index(TextIndex).phrase_rows(phrase))
+
+    def __contains__(self,
+                     value: Any) -> bool:
+        """ Whether there is the example equal to the value,
+        the hash index is used.
+        """
+        index = self.get_index(HashIndex)
+        return index.find(value) is not None
+
+    def insert(self,
+               index: int,
+               value: Any) -> None:
+        self._writable_order().insert(index, self._append_row(value))
+
+    def extend(self,
+               values: Iterable[Any]) -> None:
+        if values is self:
+            values = list(values)
+
+        append_row, order = self._append_row, self._writable_order()
+        for value in values:
+            order.append(append_row(value))
+
+    def clear(self) -> None:
+        """ Remove all examples, the columns are not
+        shared with this store anymore.
+        """
+        self._drop_indexes()
+        self._columns = Columns()
+        self._set_order(array('q'))
+
+    def copy(self) -> 'ExampleStore':
+        """ Get the store with the same examples, sharing
+        the columns and the order (see __getitem__).
+        """
+        return self[:]
+
+    def compact(self) -> None:
+        """ Move the examples to the new columns without garbage
+        (the rows of changed and removed examples).
+
+        Examples got from the store before are not
+        bound with it after that.
+        """
+        examples = [
+            self._columns.get(row).copy()
+            for row in self._rows()
+        ]
+        self.clear()
+        self.extend(examples)
+
+    def filter(self,
+               key: Callable) -> None:
+        """ Remove the examples not satisfying the key. """
+        get = self._columns.get
+        order, removed = array('q'), []
+        for row in self._rows():
+            if key(get(row)):
+                order.append(row)
+            else:
+                removed.append(row)
+
+        self._set_order(order)
+        self._discard_rows(removed)
+
+    def deduplicate(self) -> int:
+        """ Remove duplicate examples, keep the first ones.
+
+        :return: int, count of removed examples.
+        """
+        index = self.get_index(HashIndex)
+        row_key = self._columns.row_key
+        # hash to the kept rows with it
+        kept: Dict[int, Any] = {}
+        order, removed = array('q'), []
+
+        for row in self._rows():
+            value = index.row_hash(row)
+            same_hash = kept.get(value)
+            if same_hash is None:
+                # examples are compared only if hashes are equal
+                kept[value] = [row]
+                order.append(row)
+                continue
+
+            key = row_key(row)
+            if any(key == row_key(other) for other in same_hash):
+                removed.append(row)
+            else:
+                same_hash.append(row)
+                order.append(row)
+
+        self._set_order(order)
+        self._discard_rows(removed)
+        return len(removed)
+
+    def union(self,
+              other: Iterable[Any]) -> 'ExampleStore':
+        """ Get the new store with distinct examples from both
+        of them. Examples of this store go first.
+        """
+        result = self.copy()
+        result.deduplicate()
+        for example in other:
+            if example not in result:
+                result.append(example)
+        return result
+
+    def intersection(self,
+                     other: 'ExampleStore') -> 'ExampleStore':
+        """ Get the new store with distinct examples
+        of this store, which are in the other one too.
+        """
+        result = self.copy()
+        result.deduplicate()
+        result.filter(lambda example: example in other)
+        return result
+
+    def difference(self,
+                   other: 'ExampleStore') -> 'ExampleStore':
+        """ Get the new store with distinct examples
+        of this store, which are not in the other one.
+        """
+        result = self.copy()
+        result.deduplicate()
+        result.filter(lambda example: example not in other)
+        return result
+
+    def sort(self,
+             key: Callable,
+             reverse: bool = False) -> None:
+        """ Sort the examples, the key is
+        called once for every example.
+        """
+        get, rows = self._columns.get, array('q', self._rows())
+        keys = [key(get(row)) for row in rows]
+        indexes = sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+
+        self._set_order(array('q', (rows[index] for index in indexes)))
+
+    def source_column(self,
+                      field: str) -> Any:
+        """ Get values of the source field (author, title, year
+        or genre) of the examples, see SourceIndex.column.
+        """
+        return self.get_index(SourceIndex).column(field, array('q', self._rows()))
+
+    def filter_by(self,
+                  **conditions: Any) -> None:
+        """ Remove the examples which sources do not satisfy
+        the conditions, see SourceIndex.select.
+        """
+        index = self.get_index(SourceIndex)
+        kept, removed = index.select(array('q', self._rows()), **conditions)
+        self._set_order(kept)
+        self._discard_rows(removed)
+
+    def year_counts(self) -> Dict[int, int]:
+        """ Get count of the examples by year of their sources. """
+        return self.get_index(SourceIndex).year_counts(array('q', self._rows()))
+
+    def sort_by(self,
+                field: str,
+                reverse: bool = False) -> None:
+        """ Sort the examples by the source field, see SourceIndex.sort. """
+        index = self.get_index(SourceIndex)
+        self._set_order(index.sort(array('q', self._rows()), field, reverse))
+
+    def count_documents(self) -> int:
+        """ Get count of the distinct documents, see DocumentIndex. """
+        return len(self.get_index(DocumentIndex))
+
+    def document_stats(self) -> List[DocumentStats]:
+        """ Get stats of the documents, see DocumentIndex.stats. """
+        return self.get_index(DocumentIndex).stats()
+
+    def iter_documents(self) -> Iterator[Tuple[str, 'ExampleStore']]:
+        """ Get doc_url and the store with the examples of every
+        document, the stores share the columns with this one.
+        """
+        columns = self._columns
+        for doc_url, rows in self.get_index(DocumentIndex).documents():
+            yield doc_url, self._from_columns(columns, array('q', rows))
+
+    def sample_documents(self,
+                         count: int = 1) -> 'ExampleStore':
+        """ Get the store with at most count random examples
+        of every document, documents go one by one.
+
+        :exception ValueError: if the count is not a positive number.
+        """
+        if not isinstance(count, int) or count <= 0:
+            msg = f"Count must be int > 0, but '{count}' found"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        order = array('q')
+        for _, rows in self.get_index(DocumentIndex).documents():
+            if len(rows) > count:
+                indexes = sorted(random.sample(range(len(rows)), count))
+                rows = [rows[index] for index in indexes]
+            order.extend(rows)
+        return self._from_columns(self._columns, order)
+
+    def reverse(self) -> None:
+        """ Reverse the order of the examples, the rows are not changed. """
+        self._writable_order().reverse()
+
+    def shuffle(self) -> None:
+        """ Shuffle the examples. """
+        rows = list(self._rows())
+        random.shuffle(rows)
+        self._set_order(array('q', rows))
+
+    def __eq__(self,
+               other: Any) -> bool:
+        if not isinstance(other, (ExampleStore, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            lhs == rhs
+            for lhs, rhs in zip(self, other)
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(len={len(self)}, " \
+               f"nbytes={self.nbytes})"
@@ -17,14 +17,15 @@ __all__ = (
     'KwicExample'
 )
 
+import concurrent.futures
+import functools
 import logging
-import os
 import re
 import webbrowser
 from pathlib import Path
-from typing import List, Callable, Dict, Any, Optional, Union
+from typing import List, Callable, Dict, Any, Iterable, Optional, Tuple, Union
 
-import rnc.corpora_requests as creq
+from rnc.scheduler import download_scheduler
 
 logger = logging.getLogger("rnc")
 
@@ -47,6 +48,67 @@ def mark_found_words(txt: str,
     return txt
 
 
+def _changing(method: Callable) -> Callable:
+    """ Call the method of the field and tell the example it is changed. """
+    @functools.wraps(method)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        result = method(self, *args, **kwargs)
+        self._example._changed()
+        return result
+    return wrapper
+
+
+class _FieldList(list):
+    """ List field of the example, changing it changes the example. """
+    __slots__ = '_example',
+
+    def __init__(self,
+                 values: Iterable[Any],
+                 example: Any) -> None:
+        super().__init__(values)
+        self._example = example
+
+    def __reduce__(self) -> Any:
+        return list, (list(self), )
+
+    append = _changing(list.append)
+    extend = _changing(list.extend)
+    insert = _changing(list.insert)
+    remove = _changing(list.remove)
+    pop = _changing(list.pop)
+    clear = _changing(list.clear)
+    sort = _changing(list.sort)
+    reverse = _changing(list.reverse)
+    __setitem__ = _changing(list.__setitem__)
+    __delitem__ = _changing(list.__delitem__)
+    __iadd__ = _changing(list.__iadd__)
+    __imul__ = _changing(list.__imul__)
+
+
+class _FieldDict(dict):
+    """ Dict field of the example, changing it changes the example. """
+    __slots__ = '_example',
+
+    def __init__(self,
+                 values: Dict[Any, Any],
+                 example: Any) -> None:
+        super().__init__(values)
+        self._example = example
+
+    def __reduce__(self) -> Any:
+        return dict, (dict(self), )
+
+    pop = _changing(dict.pop)
+    popitem = _changing(dict.popitem)
+    clear = _changing(dict.clear)
+    update = _changing(dict.update)
+    setdefault = _changing(dict.setdefault)
+    __setitem__ = _changing(dict.__setitem__)
+    __delitem__ = _changing(dict.__delitem__)
+    if hasattr(dict, '__ior__'):
+        __ior__ = _changing(dict.__ior__)
+
+
 # TODO
 class TextInfo:
     pass
@@ -56,7 +118,10 @@ class Example:
     """ Base examples class """
     __slots__ = (
         '_txt', '_src', '_doc_url',
-        '_ambiguation', '_found_wordforms')
+        '_ambiguation', '_found_wordforms',
+        '_bindings', '_row_cache', '_hash')
+    # position of doc_url among the keys, see _to_row
+    _DOC_URL_KEY = 2
 
     def __init__(self,
                  txt: str,
@@ -83,6 +148,13 @@ class Example:
             wf = found_wordforms.split(', ') # type: ignore
         self._found_wordforms = wf
 
+        # columns of the stores the example is kept in and its
+        # rows there, None if it is not kept, see rnc.example_store
+        self._bindings: Optional[List[Tuple[Any, int]]] = None
+        # see 'row' and '__hash__', reset when the example changes
+        self._row_cache: Optional[tuple] = None
+        self._hash: Optional[int] = None
+
     @property
     def txt(self) -> Any:
         """
@@ -113,10 +185,15 @@ class Example:
 
     @property
     def found_wordforms(self) -> List[str]:
-        """
+        """ Changing the list changes the example,
+        the one in a store too.
+
         :return: list of str, example's found wordforms.
         """
-        return self._found_wordforms
+        wordforms = self._found_wordforms
+        if not (isinstance(wordforms, _FieldList) and wordforms._example is self):
+            wordforms = self._found_wordforms = _FieldList(wordforms, self)
+        return wordforms
 
     @property
     def columns(self) -> List[str]:
@@ -124,7 +201,7 @@ class Example:
 
         :return: list of str, names of columns.
         """
-        return list(self.data.keys()) + ['URL']
+        return list(self._get_row()[1])
 
     @property
     def items(self) -> List[Any]:
@@ -132,9 +209,17 @@ class Example:
 
         :return: list of any types, values of columns.
         """
-        # ATTENTION:
-        # these order must be the same as in the constructor
-        return list(self.data.values()) + [self.doc_url]
+        return list(self.row)
+
+    @property
+    def row(self) -> Tuple[Any, ...]:
+        """ Values of columns. It is computed once and
+        kept until the example is changed with its setters,
+        the getters return copies of the mutable fields.
+
+        :return: tuple of any types, values of columns.
+        """
+        return self._get_row()[2]
 
     @property
     def data(self) -> Dict[str, Any]:
@@ -143,14 +228,33 @@ class Example:
 
         :return: dict with fields names and their values.
         """
+        return dict(self._get_row()[0])
+
+    def _build_data(self) -> Dict[str, Any]:
+        """ Create the dict returned by 'data'. """
         data = {
             'text': self.txt,
             'source': self.src,
             'ambiguation': self.ambiguation,
-            'found wordforms': ', '.join(self.found_wordforms)
+            'found wordforms': ', '.join(self._found_wordforms)
         }
         return data
 
+    def _build_row(self) -> Tuple[tuple, tuple, tuple]:
+        """ Create pairs of 'data', names and values of columns. """
+        data = self._build_data()
+        # ATTENTION:
+        # these order must be the same as in the constructor
+        return (tuple(data.items()),
+                (*data.keys(), 'URL'),
+                (*data.values(), self.doc_url))
+
+    def _get_row(self) -> Tuple[tuple, tuple, tuple]:
+        row = self._row_cache
+        if row is None:
+            row = self._row_cache = self._build_row()
+        return row
+
     @txt.setter # type: ignore
     def txt(self,
             other: Any) -> None:
@@ -165,6 +269,7 @@ class Example:
                            f"set {type(other)}, str expected")
 
         self._txt = other
+        self._changed()
 
     @src.setter # type: ignore
     def src(self,
@@ -180,6 +285,7 @@ class Example:
                            f"set {type(other)}, str expected")
 
         self._src = other
+        self._changed()
 
     @ambiguation.setter # type: ignore
     def ambiguation(self,
@@ -194,6 +300,20 @@ class Example:
             logger.warning(f"As a ambiguation to {class_name} "
                            f"set {type(other)}, str expected")
         self._ambiguation = other
+        self._changed()
+
+    @found_wordforms.setter # type: ignore
+    def found_wordforms(self,
+                        other: Union[List[str], str]) -> None:
+        """ Set found wordforms.
+
+        :param other: list of str or str joined with ', ', new found wordforms.
+        :return: None.
+        """
+        if isinstance(other, str):
+            other = other.split(', ') if other else []
+        self._found_wordforms = list(other)
+        self._changed()
 
     def open_doc(self) -> None:
         """ Open the doc in the new tab of the default browser.
@@ -216,7 +336,8 @@ class Example:
         :return: None.
         """
         self._txt = mark_found_words(
-            self.txt, self.found_wordforms, marker)
+            self.txt, self._found_wordforms, marker)
+        self._changed()
 
     def copy(self) -> Any:
         """
@@ -224,6 +345,52 @@ class Example:
         """
         return self.__class__(*self.data.values(), self.doc_url) # type: ignore
 
+    def _to_row(self) -> Tuple[tuple, tuple, List[str]]:
+        """ Split the example to the parts the store keeps.
+
+        :return: texts, keys (short repeated strings) and found wordforms.
+        """
+        return ((self._txt, ),
+                (self._src, self._ambiguation, self._doc_url),
+                self._found_wordforms)
+
+    @classmethod
+    def _from_row(cls,
+                  texts: tuple,
+                  keys: tuple,
+                  found_wordforms: List[str]) -> Any:
+        """ Create the example from the parts given by '_to_row()'.
+
+        :return: new obj.
+        """
+        txt, = texts
+        src, ambiguation, doc_url = keys
+        return cls(txt, src, ambiguation, found_wordforms, doc_url) # type: ignore
+
+    def _bind(self,
+              columns: Any,
+              row: int) -> None:
+        """ Bind the example to the row of the columns, so its
+        changes are written there. The example might be bound to
+        several rows, e.g. if it is added to several stores.
+
+        :return: None.
+        """
+        if self._bindings is None:
+            self._bindings = []
+        self._bindings.append((columns, row))
+
+    def _changed(self) -> None:
+        """ Reset the cached row and hash, write
+        the changed example back to all its rows.
+
+        :return: None.
+        """
+        self._row_cache = None
+        self._hash = None
+        for columns, row in self._bindings or ():
+            columns.update(row, self)
+
     def __eq__(self,
                other: Any) -> bool:
         """ ==
@@ -231,7 +398,18 @@ class Example:
         :param other: other Example object.
         :return: bool, whether data equal.
         """
-        return self.items == other.items
+        if self is other:
+            return True
+        try:
+            other_row = other.row
+        except AttributeError:
+            return NotImplemented
+
+        # hashes are compared only if they have been computed
+        if self._hash is not None and other._hash is not None \
+                and self._hash != other._hash:
+            return False
+        return self.row == other_row
 
     def __contains__(self,
                      item: Any) -> bool:
@@ -279,11 +457,20 @@ class Example:
         return f"{fields}\n{url}"
 
     def __hash__(self) -> int:
-        """ Hash str with all example fields.
+        """ Hash values of columns. It is computed once and
+        kept until the example is changed with its setters,
+        the getters return copies of the mutable fields.
+
+        Hash str with all example fields if some of them is unhashable.
 
         :return: int, hash.
         """
-        return hash(repr(self))
+        if self._hash is None:
+            try:
+                self._hash = hash(self.row)
+            except TypeError:
+                self._hash = hash(repr(self))
+        return self._hash
 
     def __bool__(self) -> bool:
         """ .
@@ -294,6 +481,7 @@ class Example:
 
 class KwicExample(Example):
     __slots__ = '_left', '_center', '_right'
+    _DOC_URL_KEY = 1
 
     def __init__(self,
                  left: str,
@@ -351,8 +539,7 @@ class KwicExample(Example):
         logger.error(msg)
         raise NotImplementedError(msg)
 
-    @property
-    def data(self) -> Dict[str, Any]:
+    def _build_data(self) -> Dict[str, Any]:
         """ All fields except for URL.
 
         :return: dict with fields' names and their values.
@@ -362,7 +549,7 @@ class KwicExample(Example):
             'center': self.center,
             'right': self.right,
             'source': self.src,
-            'found wordforms': ', '.join(self.found_wordforms)
+            'found wordforms': ', '.join(self._found_wordforms)
         }
         return data
 
@@ -379,6 +566,7 @@ class KwicExample(Example):
             logger.warning(f"As a left context to {class_name} "
                            f"set {type(other)}, str expected")
         self._left = other
+        self._changed()
 
     @center.setter # type: ignore
     def center(self,
@@ -393,6 +581,7 @@ class KwicExample(Example):
             logger.warning(f"As a center context to {class_name} "
                            f"set {type(other)}, str expected")
         self._center = other
+        self._changed()
 
     @right.setter # type: ignore
     def right(self,
@@ -407,6 +596,7 @@ class KwicExample(Example):
             logger.warning(f"As a right context to {class_name} "
                            f"set {type(other)}, str expected")
         self._right = other
+        self._changed()
 
     @txt.setter # type: ignore
     def txt(self,
@@ -423,29 +613,46 @@ class KwicExample(Example):
         :param marker: function to mark found wordforms.
         :return: None.
         """
-        words = self.found_wordforms
+        words = self._found_wordforms
         self._left = mark_found_words(self.left, words, marker)
         self._center = mark_found_words(self.center, words, marker)
         self._right = mark_found_words(self.right, words, marker)
+        self._changed()
+
+    def _to_row(self) -> Tuple[tuple, tuple, List[str]]:
+        return ((self._left, self._center, self._right),
+                (self._src, self._doc_url),
+                self._found_wordforms)
+
+    @classmethod
+    def _from_row(cls,
+                  texts: tuple,
+                  keys: tuple,
+                  found_wordforms: List[str]) -> Any:
+        left, center, right = texts
+        src, doc_url = keys
+        return cls(left, center, right, src, found_wordforms, doc_url)
 
 
 class MainExample(Example):
-    pass
+    __slots__ = ()
 
 
 class SyntaxExample(Example):
-    pass
+    __slots__ = ()
 
 
 class Paper2000Example(Example):
-    pass
+    __slots__ = ()
 
 
 class PaperRegionalExample(Example):
-    pass
+    __slots__ = ()
 
 
 class ParallelExample(Example):
+    __slots__ = ()
+
     def __init__(self,
                  txt: Dict[str, str] = None, # type: ignore
                  src: str = '',
@@ -466,11 +673,15 @@ class ParallelExample(Example):
 
     @property
     def txt(self) -> Dict[str, Any]:
-        """ Get dict with texts.
+        """ Get dict with texts. Changing the dict
+        changes the example, the one in a store too.
 
-        :return: dict of any types.
+        :return: dict of any types, {language tag: text}.
         """
-        return self._txt # type: ignore
+        txt = self._txt
+        if not (isinstance(txt, _FieldDict) and txt._example is self):
+            txt = self._txt = _FieldDict(txt, self) # type: ignore
+        return txt # type: ignore
 
     @txt.setter
     def txt(self,
@@ -481,17 +692,16 @@ class ParallelExample(Example):
         logger.error(msg)
         raise NotImplementedError(msg)
 
-    @property
-    def data(self) -> Dict[str, Any]:
+    def _build_data(self) -> Dict[str, Any]:
         """ There are all fields except for doc_url.
         Found wordforms joined with ', '.
 
         :return: dict with fields' names and their values.
         """
-        data = self.txt.copy()
+        data = dict(self._txt) # type: ignore
         data['source'] = self.src
         data['ambiguation'] = self.ambiguation
-        data['found wordforms'] = ', '.join(self.found_wordforms)
+        data['found wordforms'] = ', '.join(self._found_wordforms)
 
         return data
 
@@ -504,7 +714,7 @@ class ParallelExample(Example):
         """
         for lang, txt in self.txt.items():
             self[lang] = mark_found_words(
-                txt, self.found_wordforms, marker)
+                txt, self._found_wordforms, marker)
 
     @staticmethod
     def _best_src(f_src: str,
@@ -533,17 +743,32 @@ class ParallelExample(Example):
         key = key or (lambda items: items[0])
         data = sorted(self.txt.items(), key=key, reverse=reverse)
         self._txt = dict(data) # type: ignore
+        self._changed()
 
     def copy(self) -> Any:
         """
         :return: copied obj.
         """
-        txt_copy = self.txt.copy()
         return self.__class__(
-            txt_copy, self.src, self.ambiguation,
+            self.txt, self.src, self.ambiguation,
             self.found_wordforms, self.doc_url
         )
 
+    def _to_row(self) -> Tuple[tuple, tuple, List[str]]:
+        """ Language tags are kept among the keys. """
+        return (tuple(self._txt.values()), # type: ignore
+                (self._src, self._ambiguation, self._doc_url, *self._txt),
+                self._found_wordforms)
+
+    @classmethod
+    def _from_row(cls,
+                  texts: tuple,
+                  keys: tuple,
+                  found_wordforms: List[str]) -> Any:
+        src, ambiguation, doc_url, *langs = keys
+        txt = dict(zip(langs, texts))
+        return cls(txt, src, ambiguation, found_wordforms, doc_url)
+
     def __contains__(self,
                      item: Any) -> bool:
         """ Whether the item is in the text.
@@ -597,7 +822,8 @@ class ParallelExample(Example):
             self._ambiguation = o_amb
         if not self.doc_url:
             self._doc_url = other.doc_url
-        self._found_wordforms += other.found_wordforms
+        self._found_wordforms = [*self._found_wordforms, *other.found_wordforms]
+        self._changed()
 
         return self
 
@@ -605,13 +831,17 @@ class ParallelExample(Example):
                     item: str) -> Any:
         """ Get the text in language.
 
+        It is called only when the usual lookup failed,
+        private names are not language tags.
+
         :param item: str, language tag.
         :return: str or None, text in the language if exists.
+        :exception AttributeError: if the name is private.
         """
-        try:
-            return getattr(super(), item)
-        except AttributeError:
-            return self.txt.get(item, None)
+        if item.startswith('_'):
+            raise AttributeError(
+                f"'{self.__class__.__name__}' object has no attribute '{item}'")
+        return self._txt.get(item, None) # type: ignore
 
     def __getitem__(self,
                     lang: str) -> Any:
@@ -620,7 +850,7 @@ class ParallelExample(Example):
         :param lang: str, language tag.
         :return: str or None, text in the language if exists.
         """
-        return self.txt.get(lang, None)
+        return self._txt.get(lang, None) # type: ignore
 
     def __setitem__(self,
                     lang: str,
@@ -636,34 +866,37 @@ class ParallelExample(Example):
             class_name = self.__class__.__name__
             logger.warning(f"As a '{lang}' to {class_name} "
                            f"set {type(txt)}, str expected")
-        self._txt[lang] = txt # type: ignore
+        self._txt = {**self._txt, lang: txt} # type: ignore
+        self._changed()
 
 
 class MultilingualParaExample(ParallelExample):
-    pass
+    __slots__ = ()
 
 
 class TutoringExample(Example):
-    pass
+    __slots__ = ()
 
 
 class DialectalExample(Example):
-    pass
+    __slots__ = ()
 
 
 class PoeticExample(Example):
-    pass
+    __slots__ = ()
 
 
 class SpokenExample(Example):
-    pass
+    __slots__ = ()
 
 
 class AccentologicalExample(Example):
-    pass
+    __slots__ = ()
 
 
 class MultimodalExample(Example):
+    __slots__ = '_media_url', '_filepath'
+
     def __init__(self,
                  txt: str,
                  src: str,
@@ -707,43 +940,61 @@ class MultimodalExample(Example):
         :return: None.
         """
         self._filepath = Path(other)
+        self._changed()
 
-    @property
-    def columns(self) -> List[str]:
-        """ For csv writing.
-
-        :return: list of str, names of columns.
-        """
-        return super().columns + ['media_url', 'filename']
+    def _build_row(self) -> Tuple[tuple, tuple, tuple]:
+        """ Media URL and filename are added to the columns. """
+        data, columns, values = super()._build_row()
+        return (data,
+                (*columns, 'media_url', 'filename'),
+                (*values, self._media_url, self.filepath))
 
-    @property
-    def items(self) -> List[Any]:
-        """ For csv writing.
-
-        :return: list of any types, values of columns.
-        """
-        return super().items + [self._media_url, self.filepath]
-
-    def download_file(self) -> None:
+    def download_file(self,
+                      wait: bool = True) -> Union[bool, concurrent.futures.Future]:
         """ Download the media file.
 
-        :return: None.
+        The download joins the scheduler shared by the process
+        (see rnc.scheduler.download_scheduler), so the files
+        of the examples are downloaded with one session in
+        one background event loop, not in a new one every time.
+
+        Examples:
+        =========
+        .. code-block:: python
+            >>> futures = [example.download_file(wait=False) for example in corp]
+            >>> concurrent.futures.wait(futures)
+
+        :param wait: bool, whether to wait for the file to be downloaded.
+        :return: bool, whether the file is downloaded, if wait;
+         concurrent.futures.Future of this bool otherwise.
+        :exception RuntimeError: if it waits in the thread of the scheduler's
+         loop, the loop would wait for itself, use download_file_async.
         """
-        os.makedirs(self.filepath.parent, exist_ok=True)
+        scheduler = download_scheduler()
+        if wait and scheduler.loop.in_loop():
+            msg = "Cannot wait for the download in the thread of the " \
+                  "scheduler's loop, await download_file_async instead"
+            logger.error(msg)
+            raise RuntimeError(msg)
+
+        future = scheduler.submit(self._media_url, self.filepath)
+        if not wait:
+            return future
 
-        data = [(self._media_url, str(self.filepath))]
         try:
-            creq.download_docs(data)
+            return future.result()
         except Exception as e:
             logger.error(str(e))
             raise
 
-    async def download_file_async(self) -> None:
-        os.makedirs(self.filepath.parent, exist_ok=True)
+    async def download_file_async(self) -> bool:
+        """ Download the media file by the scheduler shared by the
+        process and wait for it in the running event loop.
 
-        data = [(self._media_url, str(self.filepath))]
+        :return: bool, whether the file is downloaded.
+        """
         try:
-            await creq.download_docs_async(data)
+            return await download_scheduler().download(self._media_url, self.filepath)
         except Exception as e:
             logger.error(str(e))
             raise
@@ -754,10 +1005,24 @@ class MultimodalExample(Example):
             self._media_url, str(self.filepath)
         )
 
+    def _to_row(self) -> Tuple[tuple, tuple, List[str]]:
+        texts, keys, found_wordforms = super()._to_row()
+        return texts, (*keys, self._media_url, str(self._filepath)), found_wordforms
+
+    @classmethod
+    def _from_row(cls,
+                  texts: tuple,
+                  keys: tuple,
+                  found_wordforms: List[str]) -> Any:
+        txt, = texts
+        src, ambiguation, doc_url, media_url, filename = keys
+        return cls(txt, src, ambiguation, found_wordforms,
+                   doc_url, media_url, filename)
+
 
 class MultiPARCExample(Example):
-    pass
+    __slots__ = ()
 
 
 class HistoricalExample(Example):
-    pass
+    __slots__ = ()
@@ -0,0 +1,186 @@
+"""
+Module with the lazy query over the examples of a Corpus:
+operations are recorded and run in one pass when the
+result is iterated.
+"""
+
+__all__ = (
+    'LazyQuery',
+)
+
+import heapq
+import logging
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("rnc")
+
+# kinds of the steps
+FILTER, MAP, SORT, TAKE = range(4)
+
+
+class LazyQuery:
+    """ Chain of filters, projections, sorts and limits
+    over the examples. Nothing is done until the query is
+    iterated, every step returns the new query.
+
+    Consecutive filters and maps are applied to every example
+    at once, so no intermediate lists are created. Sort is
+    the only step keeping all the examples; if it is followed
+    by take, only the first examples are kept in a heap.
+    Iteration stops after the last taken one.
+
+    Examples:
+    =========
+    .. code-block:: python
+        >>> corp = MainCorpus(file='corpus.csv', load=False)
+        >>> query = corp.lazy().filter(lambda ex: 'кот' in ex.txt)
+        >>> longest = query.sort(key=lambda ex: len(ex.txt), reverse=True).take(10)
+        >>> texts = longest.map(lambda ex: ex.txt).collect()
+    """
+
+    def __init__(self,
+                 corpus: Any,
+                 steps: Tuple[Tuple[int, Any], ...] = ()) -> None:
+        """
+        :param corpus: Corpus, its examples are the source of the query.
+        :param steps: tuple of recorded steps.
+        """
+        self._corpus = corpus
+        self._steps = steps
+
+    def _add(self,
+             kind: int,
+             value: Any) -> 'LazyQuery':
+        return self.__class__(self._corpus, self._steps + ((kind, value), ))
+
+    @staticmethod
+    def _check_callable(func: Any) -> None:
+        if not callable(func):
+            msg = f"Callable expected, but '{func}' found"
+            logger.error(msg)
+            raise TypeError(msg)
+
+    def filter(self,
+               key: Callable) -> 'LazyQuery':
+        """ Keep the items satisfying the key.
+
+        :exception TypeError: if the key is uncallable.
+        """
+        self._check_callable(key)
+        return self._add(FILTER, key)
+
+    def map(self,
+            func: Callable) -> 'LazyQuery':
+        """ Replace the items with the results of the func.
+
+        :exception TypeError: if the func is uncallable.
+        """
+        self._check_callable(func)
+        return self._add(MAP, func)
+
+    def sort(self,
+             key: Optional[Callable] = None,
+             reverse: bool = False) -> 'LazyQuery':
+        """ Sort the items, the key is called once for every item.
+
+        :exception TypeError: if the key is given and uncallable.
+        """
+        if key is not None:
+            self._check_callable(key)
+        return self._add(SORT, (key, reverse))
+
+    def take(self,
+             count: int) -> 'LazyQuery':
+        """ Keep the first count items.
+
+        :exception ValueError: if the count is a negative number.
+        """
+        if not isinstance(count, int) or count < 0:
+            msg = f"Count must be int >= 0, but '{count}' found"
+            logger.error(msg)
+            raise ValueError(msg)
+        return self._add(TAKE, count)
+
+    @staticmethod
+    def _apply(items: Iterable[Any],
+               funcs: List[Tuple[int, Callable]]) -> Iterator[Any]:
+        """ Apply consecutive filters and maps to every item. """
+        for item in items:
+            for kind, func in funcs:
+                if kind == MAP:
+                    item = func(item)
+                elif not func(item):
+                    break
+            else:
+                yield item
+
+    @staticmethod
+    def _take_after(steps: Tuple[Tuple[int, Any], ...]) -> Optional[int]:
+        """ Get count of the items taken after the sort. Maps
+        do not change count and order of the items, so they
+        might be between. None if the items are not taken.
+        """
+        for kind, value in steps:
+            if kind == TAKE:
+                return value
+            if kind != MAP:
+                return None
+        return None
+
+    def __iter__(self) -> Iterator[Any]:
+        items: Iterable[Any] = self._corpus._iter_examples()
+        steps = self._steps
+        funcs: List[Tuple[int, Callable]] = []
+
+        for num, (kind, value) in enumerate(steps):
+            if kind in (FILTER, MAP):
+                funcs.append((kind, value))
+                continue
+
+            if funcs:
+                items = self._apply(items, funcs)
+                funcs = []
+
+            if kind == TAKE:
+                items = islice(items, value)
+                continue
+
+            key, reverse = value
+            count = self._take_after(steps[num + 1:])
+            if count is None:
+                items = iter(sorted(items, key=key, reverse=reverse))
+            else:
+                select = heapq.nlargest if reverse else heapq.nsmallest
+                items = iter(select(count, items, key=key))
+
+        if funcs:
+            items = self._apply(items, funcs)
+        return iter(items)
+
+    def collect(self) -> List[Any]:
+        """ Run the query.
+
+        :return: list of the result items.
+        """
+        return list(self)
+
+    def count(self) -> int:
+        """ Run the query.
+
+        :return: int, count of the result items.
+        """
+        return sum(1 for _ in self)
+
+    def to_corpus(self) -> Any:
+        """ Run the query and get the corpus with the same
+        params and the result examples (see Corpus.copy).
+
+        :exception TypeError: if some item is not an Example.
+        """
+        return self._corpus._with_examples(self)
+
+    def __repr__(self) -> str:
+        names = ('filter', 'map', 'sort', 'take')
+        steps = ', '.join(names[kind] for kind, _ in self._steps)
+        return f"{self.__class__.__name__}({steps})"
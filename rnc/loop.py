@@ -0,0 +1,199 @@
+"""
+Module with the event loop running in the background thread,
+so the sync calls share one loop, its sessions and connections
+instead of running a new loop every time. The sync calls work
+in a thread with a running event loop too, e.g. in Jupyter.
+"""
+
+__all__ = (
+    'BackgroundLoop',
+    'background_loop',
+)
+
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import os
+import threading
+from typing import Any, Awaitable, Callable, Coroutine, Dict, List, Optional
+
+logger = logging.getLogger("rnc")
+
+
+class BackgroundLoop:
+    """ Event loop running forever in the daemon thread.
+    The loop is started by the first call.
+
+    Examples:
+    =========
+    .. code-block:: python
+        >>> loop = BackgroundLoop()
+        >>> loop.run(asyncio.sleep(1, 'done'))
+        'done'
+        >>> future = loop.submit(asyncio.sleep(1, 'done'))
+        >>> future.result()
+        'done'
+        >>> loop.close()
+    """
+    def __init__(self,
+                 name: str = 'rnc-loop') -> None:
+        """
+        :param name: str, name of the thread.
+        """
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # coros to await in the loop before it is closed
+        self._on_close: List[Callable[[], Awaitable]] = []
+        # objects shared by the calls in the loop, e.g. sessions
+        self._shared: Dict[str, Any] = {}
+
+    @staticmethod
+    def _run(loop: asyncio.AbstractEventLoop,
+             started: threading.Event) -> None:
+        asyncio.set_event_loop(loop)
+        loop.call_soon(started.set)
+        try:
+            loop.run_forever()
+        finally:
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """ Get the loop, start it if it is not running. """
+        with self._lock:
+            if self._loop is None or self._thread is None or not self._thread.is_alive():
+                loop = asyncio.new_event_loop()
+                started = threading.Event()
+                thread = threading.Thread(
+                    target=self._run, args=(loop, started), name=self.name, daemon=True)
+                thread.start()
+                started.wait()
+
+                self._loop, self._thread = loop, thread
+                logger.debug(f"Background loop '{self.name}' started")
+            return self._loop
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def in_loop(self) -> bool:
+        """ Whether it is called from the thread of the loop. """
+        return threading.current_thread() is self._thread
+
+    def submit(self,
+               coro: Coroutine) -> concurrent.futures.Future:
+        """ Run the coro in the loop, it might be called from any thread.
+
+        :return: concurrent.futures.Future of the coro's result,
+         use asyncio.wrap_future to await it in another loop.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self,
+            coro: Coroutine,
+            timeout: Optional[float] = None) -> Any:
+        """ Run the coro in the loop and wait for its result.
+
+        :param timeout: float, seconds to wait for, unlimited by default.
+        :return: result of the coro.
+        :exception RuntimeError: if it is called from the thread of
+         the loop, the loop would wait for itself.
+        """
+        if self.in_loop():
+            coro.close()
+            msg = "Cannot wait for the background loop in its thread"
+            logger.error(msg)
+            raise RuntimeError(msg)
+        return self.submit(coro).result(timeout)
+
+    def shared(self,
+               key: str,
+               factory: Callable[[], Any]) -> Any:
+        """ Get the object shared by the calls in the loop, e.g.
+        a session, it is created by the factory once. It should be
+        called in the loop. The objects are closed with the loop.
+
+        :param key: str, key of the object.
+        :param factory: func to create the object.
+        :return: the object.
+        """
+        if key not in self._shared:
+            self._shared[key] = factory()
+            logger.debug(f"'{key}' is shared by the background loop")
+        return self._shared[key]
+
+    async def _close_shared(self) -> None:
+        shared, self._shared = self._shared, {}
+        for key, obj in shared.items():
+            close = getattr(obj, 'close', None)
+            if close is None:
+                continue
+            try:
+                result = close()
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Error while closing '{key}':\n{e}")
+
+    def on_close(self,
+                 func: Callable[[], Awaitable]) -> None:
+        """ Await the coro func in the loop before it is closed,
+        e.g. to close the sessions.
+        """
+        self._on_close += [func]
+
+    def close(self) -> None:
+        """ Await the on close coros, stop the loop and wait for the
+        thread. The loop is started again by the next call.
+        """
+        if not self.is_running:
+            return
+
+        for func in [*self._on_close, self._close_shared]:
+            try:
+                self.run(func()) # type: ignore
+            except Exception as e:
+                logger.error(f"Error while closing the background loop:\n{e}")
+
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is not None and thread is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+        logger.debug(f"Background loop '{self.name}' closed")
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(name='{self.name}', running={self.is_running})"
+
+
+_LOOP: Optional[BackgroundLoop] = None
+_LOOP_PID: Optional[int] = None
+_LOOP_LOCK = threading.Lock()
+
+
+def background_loop() -> BackgroundLoop:
+    """ Get the loop shared by the process, the forked
+    process gets its own one.
+    """
+    global _LOOP, _LOOP_PID
+
+    with _LOOP_LOCK:
+        if _LOOP is None or _LOOP_PID != os.getpid():
+            _LOOP, _LOOP_PID = BackgroundLoop(), os.getpid()
+        return _LOOP
+
+
+@atexit.register
+def _close_background_loop() -> None:
+    if _LOOP is not None and _LOOP_PID == os.getpid():
+        _LOOP.close()
@@ -0,0 +1,277 @@
+"""
+Module with the content-addressed store of media files: every
+distinct file is downloaded and kept once, the examples get
+hardlinks to it.
+"""
+
+__all__ = (
+    'MediaStore',
+)
+
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+import aiohttp
+import ujson
+
+import rnc.corpora_requests as creq
+from rnc.disk_writer import DiskWriter
+
+logger = logging.getLogger("rnc")
+
+
+class MediaStore:
+    """ Media files by their sha256 in the folder, URLs refer to
+    them in the index. So a file is downloaded once for all the
+    examples and corpora using the store, even if it has several URLs.
+
+    Concurrent requests of the same URL in the event loop share
+    one download. If the size of the files exceeds the budget,
+    the least recently used ones are removed.
+
+    Examples:
+    =========
+    .. code-block:: python
+        >>> store = MediaStore('data/media_store', budget=10 * 2**30)
+        >>> corp = MultimodalCorpus('кот', 5)
+        >>> corp.request_examples()
+        >>> corp.download_all(store=store)
+    """
+    INDEX_NAME = 'index.json'
+
+    def __init__(self,
+                 root: Union[str, Path],
+                 budget: Optional[int] = None) -> None:
+        """
+        :param root: str or Path, folder of the store.
+        :param budget: int, max size of the files in bytes, unlimited by default.
+        :exception ValueError: if the budget is not a positive int.
+        """
+        if budget is not None and (not isinstance(budget, int) or budget <= 0):
+            msg = f"Budget must be int > 0, but '{budget}' found"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self.root = Path(root)
+        self.budget = budget
+        # sha256, size and time of the last use by URL
+        self._index: Dict[str, Dict[str, Any]] = {}
+        # downloads in progress by URL
+        self._flights: Dict[str, asyncio.Future] = {}
+
+        index_path = self.root / self.INDEX_NAME
+        if index_path.exists():
+            with index_path.open(encoding='utf-8') as f:
+                self._index = ujson.load(f)
+
+    def _object_path(self,
+                     sha256: str) -> Path:
+        return self.root / 'objects' / sha256[:2] / sha256
+
+    def path(self,
+             url: str) -> Optional[Path]:
+        """ Get path to the file of the URL, None if it is not stored. """
+        entry = self._index.get(url)
+        if entry is None:
+            return None
+
+        path = self._object_path(entry['sha256'])
+        if not path.exists():
+            self._index.pop(url)
+            return None
+        entry['used'] = time.time()
+        return path
+
+    @property
+    def size(self) -> int:
+        """ Size of the stored files in bytes. """
+        objects = {entry['sha256']: entry['size'] for entry in self._index.values()}
+        return sum(objects.values())
+
+    def __contains__(self,
+                     url: Any) -> bool:
+        return self.path(url) is not None
+
+    def __len__(self) -> int:
+        """ Count of the stored files. """
+        return len({entry['sha256'] for entry in self._index.values()})
+
+    def save(self) -> None:
+        """ Write the index to the folder. """
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / self.INDEX_NAME
+        temp_path = path.with_name(f"{path.name}{creq.PART_SUFFIX}")
+        with temp_path.open('w', encoding='utf-8') as f:
+            ujson.dump(self._index, f, ensure_ascii=False, escape_forward_slashes=False)
+        os.replace(temp_path, path)
+
+    def evict(self,
+              pinned: Optional[Set[str]] = None) -> int:
+        """ Remove the least recently used files until their
+        size fits the budget.
+
+        :param pinned: set of str, URLs of the files not to remove.
+        :return: int, count of the removed files.
+        """
+        if self.budget is None:
+            return 0
+
+        pinned_objects = {
+            self._index[url]['sha256']
+            for url in pinned or ()
+            if url in self._index
+        }
+        # the last use of the file is the last use of its URLs
+        used: Dict[str, float] = {}
+        sizes: Dict[str, int] = {}
+        for entry in self._index.values():
+            used[entry['sha256']] = max(used.get(entry['sha256'], 0), entry['used'])
+            sizes[entry['sha256']] = entry['size']
+
+        size, removed = sum(sizes.values()), set()
+        for sha256 in sorted(used, key=used.__getitem__):
+            if size <= self.budget:
+                break
+            if sha256 in pinned_objects:
+                continue
+            size -= sizes[sha256]
+            removed.add(sha256)
+            try:
+                os.remove(self._object_path(sha256))
+            except FileNotFoundError:
+                pass
+
+        self._index = {
+            url: entry
+            for url, entry in self._index.items()
+            if entry['sha256'] not in removed
+        }
+        if removed:
+            logger.debug(f"{len(removed)} media files evicted")
+        return len(removed)
+
+    async def _download(self,
+                        url: str,
+                        ses: aiohttp.ClientSession,
+                        writer: Optional[DiskWriter]) -> Optional[Path]:
+        """ Download the file to the temporary one,
+        named by the URL to resume it, and move to the store.
+        """
+        temp_folder = self.root / 'tmp'
+        temp_folder.mkdir(parents=True, exist_ok=True)
+        temp_file = temp_folder / hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+        res = await creq.fetch_media_file(url, str(temp_file), ses, writer)
+        while res == -1:
+            logger.debug(f"429 'Too many requests', url: {url}; wait {creq.WAIT}s")
+            await asyncio.sleep(creq.WAIT)
+            res = await creq.fetch_media_file(url, str(temp_file), ses, writer)
+        if res is None:
+            return None
+
+        size, sha256 = res # type: ignore
+        path = self._object_path(sha256)
+        if path.exists():
+            # the same file from another URL
+            os.remove(temp_file)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(temp_file, path)
+
+        self._index[url] = {'sha256': sha256, 'size': size, 'used': time.time()}
+        return path
+
+    async def fetch(self,
+                    url: str,
+                    ses: aiohttp.ClientSession,
+                    writer: Optional[DiskWriter] = None) -> Optional[Path]:
+        """ Get path to the file of the URL, download it if it is
+        not stored. If the URL is being downloaded, wait for it.
+
+        :param writer: DiskWriter, started writer of the content.
+        :return: Path or None if the file is not downloaded.
+        """
+        path = self.path(url)
+        if path is not None:
+            return path
+
+        flight = self._flights.get(url)
+        if flight is None:
+            flight = self._flights[url] = asyncio.ensure_future(self._download(url, ses, writer))
+            flight.add_done_callback(lambda _: self._flights.pop(url, None))
+        return await asyncio.shield(flight)
+
+    def link(self,
+             url: str,
+             filename: Union[str, Path]) -> bool:
+        """ Make the file a hardlink to the stored file of the URL,
+        the file is copied if the link cannot be made.
+
+        :return: bool, whether the file of the URL is stored.
+        """
+        path = self.path(url)
+        if path is None:
+            return False
+
+        target = Path(filename)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.exists() and os.path.samefile(target, path):
+            return True
+
+        temp_target = target.with_name(f"{target.name}{creq.PART_SUFFIX}")
+        if temp_target.exists():
+            os.remove(temp_target)
+        try:
+            os.link(path, temp_target)
+        except OSError:
+            shutil.copyfile(path, temp_target)
+        os.replace(temp_target, target)
+        return True
+
+    async def download_async(self,
+                             url_to_name: List[Tuple[str, Union[str, Path]]],
+                             workers: int = 5,
+                             writer: Optional[DiskWriter] = None) -> int:
+        """ Download the files, which are not stored, and link
+        the files to them. Every URL is downloaded once.
+
+        :param url_to_name: list of tuples, pairs: url – filename.
+        :param workers: int, count of the concurrent downloads.
+        :param writer: DiskWriter, writer of the content, it
+         is started and closed here.
+        :return: int, count of the linked files.
+        """
+        urls = list(dict.fromkeys(url for url, _ in url_to_name))
+        semaphore = asyncio.Semaphore(workers)
+
+        async def fetch(url: str) -> None:
+            async with semaphore:
+                await self.fetch(url, ses, writer)
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        writer = writer or DiskWriter()
+        async with creq.client_session(creq.media_timeout()) as ses, writer:
+            await asyncio.gather(*map(fetch, urls))
+
+        linked = sum(self.link(url, filename) for url, filename in url_to_name)
+        self.evict(pinned=set(urls))
+        self.save()
+        logger.info(f"{len(urls)} media files are in the store, {linked} files linked")
+        return linked
+
+    def download(self,
+                 url_to_name: List[Tuple[str, Union[str, Path]]],
+                 workers: int = 5,
+                 writer: Optional[DiskWriter] = None) -> int:
+        """ Run coro, download the files, see download_async. """
+        return creq.run_sync(self.download_async(url_to_name, workers, writer))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(root='{self.root}', " \
+               f"files={len(self)}, size={self.size}, budget={self.budget})"
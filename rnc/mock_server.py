@@ -0,0 +1,511 @@
+"""
+Module with the local stand-in of RNC: search.xml pages of the
+main, para, murco modes and of kwic output and the media files.
+Latency, 429 bursts, 5xx errors and bandwidth are configured, so
+the requests might be measured under load without requesting RNC.
+
+The pages are generated by the query, they have the structure
+of RNC pages, which the parsers of the corpora expect.
+"""
+
+__all__ = (
+    'MockConfig',
+    'MockRNC',
+    'uniform_latency',
+    'lognormal_latency',
+    'ERROR_STATUSES',
+)
+
+import asyncio
+import html
+import logging
+import math
+import random
+import re
+from collections import Counter, deque
+from typing import Any, Callable, Deque, List, NamedTuple, Optional, Tuple, Union
+
+from aiohttp import web
+
+logger = logging.getLogger("rnc")
+
+# statuses of the injected errors
+ERROR_STATUSES = (500, 502, 503)
+# the responses are sent by chunks of the size
+SEND_CHUNK_SIZE = 16 * 1024
+NOT_FOUND_MSG = 'По этому запросу ничего не найдено.'
+# count of the pages before and after the current one in the pager
+PAGER_WINDOW = 5
+RANGE_PATTERN = re.compile(r'bytes=(\d+)-(\d*)$')
+
+Latency = Union[float, Callable[[random.Random], float]]
+
+
+def uniform_latency(low: float,
+                    high: float) -> Callable[[random.Random], float]:
+    """ Latency distributed uniformly in [low; high] seconds. """
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal_latency(median: float,
+                      sigma: float = 0.5) -> Callable[[random.Random], float]:
+    """ Latency with the lognormal distribution, like the one of the
+    real server: most of the responses are near the median, some
+    of them are much slower.
+
+    :param median: float, median latency in seconds.
+    :param sigma: float, the larger, the longer the tail is.
+    """
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+class MockConfig(NamedTuple):
+    """ Data of the mock and its faults.
+
+    :param docs: int, count of the found documents.
+    :param contexts_per_doc: int, count of the examples of every document.
+    :param media_size: int, size of the media files in bytes, the
+     sizes of the files are 1-4 times of it, so they are different.
+    :param latency: float, seconds before every response,
+     or func to get them from the random generator.
+    :param burst_every: int, after the count of the requests next
+     burst_length ones get 429 'Too many requests', 0 – no bursts.
+    :param burst_length: int, count of the requests in the burst.
+    :param rate_limit: float, requests per second, the requests
+     above it get 429, unlimited by default.
+    :param error_rate: float, part of the requests getting
+     one of ERROR_STATUSES.
+    :param bandwidth: int, bytes per second of all the responses,
+     unlimited by default.
+    :param connection_bandwidth: int, bytes per second of
+     every response, unlimited by default.
+    :param not_found: str, the query word nothing is found for.
+    :param seed: int, seed of the random generator.
+    """
+    docs: int = 100
+    contexts_per_doc: int = 3
+    media_size: int = 64 * 1024
+    latency: Latency = 0.0
+    burst_every: int = 0
+    burst_length: int = 0
+    rate_limit: Optional[float] = None
+    error_rate: float = 0.0
+    bandwidth: Optional[int] = None
+    connection_bandwidth: Optional[int] = None
+    not_found: str = 'notfound'
+    seed: int = 0
+
+
+def _number(value: int) -> str:
+    """ Format the number like RNC does: '12 345'. """
+    return f"{value:,}".replace(',', ' ')
+
+
+def _words(query: Any) -> List[str]:
+    """ Get the searched words from the query of the request. """
+    words = query.get('req') or ' '.join(
+        value for key, value in sorted(query.items())
+        if re.fullmatch(r'lex\d+', key)
+    )
+    return words.replace('+', ' ').split() or ['слово']
+
+
+def _source(doc: int) -> str:
+    return f"Автор {doc + 1}. Документ {doc + 1} ({1950 + doc % 70})"
+
+
+def _doc_href(doc: int,
+              example: int) -> str:
+    return f"search.xml?docid={doc + 1}&amp;sid={example}"
+
+
+def _marked(words: List[str]) -> str:
+    return ' '.join(
+        f'<span class="b-wrd-expl g-em">{html.escape(word)}</span>'
+        for word in words
+    )
+
+
+def _snippet(doc: int,
+             example: int,
+             words: List[str],
+             lang: str = 'ru') -> str:
+    """ Text of the example with the found words, the
+    source of the document and its ambiguation.
+    """
+    if lang == 'ru':
+        before, after = f"Пример {doc + 1}.{example + 1}: здесь", "стоит в середине предложения."
+    else:
+        before, after = f"Example {doc + 1}.{example + 1}: here", "is in the middle of the sentence."
+    ambiguation = ('on', 'омонимия снята') if doc % 2 else ('off', 'омонимия не снята')
+
+    return f'{before} {_marked(words)} {after} ' \
+           f'<span class="doc">[<a href="{_doc_href(doc, example)}">{html.escape(_source(doc))}</a>]</span> ' \
+           f'<span class="{ambiguation[0]}">[{ambiguation[1]}]</span>'
+
+
+class MockRNC:
+    """ Server with the pages and media files like the ones of RNC.
+
+    The pages are requested like from RNC: search.xml with 'mode',
+    'out', 'p', 'dpp', 'spd' and the query. If the page does not exist,
+    the request is redirected to the first page as RNC does. The media
+    files are at the links of murco pages, they support the Range header.
+
+    The requests, their statuses and the sent bytes are counted.
+
+    Examples:
+    =========
+    .. code-block:: python
+        >>> config = MockConfig(latency=lognormal_latency(0.05), rate_limit=20)
+        >>> async with MockRNC(config) as server:
+        ...     rnc.set_base_url(server.url)
+        ...     corp = rnc.MainCorpus('кот', 5)
+        ...     await corp.request_examples_async()
+        ...     print(server.statuses)
+    """
+    def __init__(self,
+                 config: MockConfig = MockConfig()) -> None:
+        """
+        :param config: MockConfig, data of the mock and its faults.
+        :exception ValueError: if a param of the config is wrong.
+        """
+        if config.docs < 0 or config.contexts_per_doc <= 0 or config.media_size <= 0:
+            msg = f"Docs must be >= 0, contexts per doc and media size must be > 0, but '{config}' found"
+            logger.error(msg)
+            raise ValueError(msg)
+        if not 0 <= config.error_rate <= 1:
+            msg = f"Error rate must be in [0; 1], but '{config.error_rate}' found"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self.config = config
+        self.url: Optional[str] = None
+        self._runner: Optional[web.AppRunner] = None
+        self.reset()
+
+    def reset(self) -> None:
+        """ Reset the counters and the random generator. """
+        self.requests = 0
+        self.bytes_sent = 0
+        self.statuses: Counter = Counter()
+        self._rng = random.Random(self.config.seed)
+        # loop times of the requests in the last second
+        self._recent: Deque[float] = deque()
+        # loop time when the bandwidth is free
+        self._next_send = 0.0
+
+    def app(self) -> web.Application:
+        """ Get the application with the routes of RNC. """
+        app = web.Application()
+        app.router.add_get('/search.xml', self._search)
+        app.router.add_get('/media/{doc}', self._media)
+        return app
+
+    async def start(self,
+                    host: str = '127.0.0.1',
+                    port: int = 0) -> str:
+        """ Start the server in the running event loop.
+
+        :param port: int, port to listen, a free one by default.
+        :return: str, URL of the server, give it to rnc.set_base_url.
+        """
+        if self._runner is not None:
+            return self.url # type: ignore
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        logger.debug(f"Mock RNC started at '{self.url}'")
+        return self.url
+
+    async def close(self) -> None:
+        """ Stop the server. """
+        if self._runner is None:
+            return
+        await self._runner.cleanup()
+        self._runner, self.url = None, None
+
+    async def __aenter__(self) -> 'MockRNC':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    def _latency(self) -> float:
+        latency = self.config.latency
+        if callable(latency):
+            return max(latency(self._rng), 0.0)
+        return latency
+
+    def _is_limited(self) -> bool:
+        """ Whether the request gets 429: it is in the burst
+        or it exceeds the rate limit.
+        """
+        config = self.config
+        if config.burst_every and config.burst_length:
+            position = (self.requests - 1) % (config.burst_every + config.burst_length)
+            if position >= config.burst_every:
+                return True
+
+        if config.rate_limit is None:
+            return False
+        now = asyncio.get_running_loop().time()
+        while self._recent and self._recent[0] <= now - 1:
+            self._recent.popleft()
+        if len(self._recent) >= config.rate_limit:
+            return True
+        self._recent.append(now)
+        return False
+
+    async def _faults(self) -> Optional[web.Response]:
+        """ Wait for the latency and get the response of the
+        injected error, None if the request should be served.
+        """
+        self.requests += 1
+        latency = self._latency()
+        if latency:
+            await asyncio.sleep(latency)
+
+        if self._is_limited():
+            return web.Response(status=429)
+        if self.config.error_rate and self._rng.random() < self.config.error_rate:
+            return web.Response(status=self._rng.choice(ERROR_STATUSES))
+        return None
+
+    async def _throttle(self,
+                        size: int) -> None:
+        """ Wait for the chunk of the size to keep the bandwidths. """
+        loop = asyncio.get_running_loop()
+        delay = 0.0
+        if self.config.bandwidth:
+            start = max(self._next_send, loop.time())
+            self._next_send = start + size / self.config.bandwidth
+            delay = self._next_send - loop.time()
+        if self.config.connection_bandwidth:
+            delay = max(delay, size / self.config.connection_bandwidth)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _send(self,
+                    request: web.Request,
+                    body: bytes,
+                    status: int = 200,
+                    headers: Optional[dict] = None) -> web.StreamResponse:
+        response = web.StreamResponse(status=status, headers=headers)
+        response.content_length = len(body)
+        await response.prepare(request)
+        for start in range(0, len(body), SEND_CHUNK_SIZE):
+            chunk = body[start:start + SEND_CHUNK_SIZE]
+            await self._throttle(len(chunk))
+            await response.write(chunk)
+            self.bytes_sent += len(chunk)
+        await response.write_eof()
+        return response
+
+    def _count(self,
+               response: web.StreamResponse) -> web.StreamResponse:
+        self.statuses[response.status] += 1
+        return response
+
+    async def _search(self,
+                      request: web.Request) -> web.StreamResponse:
+        error = await self._faults()
+        if error is not None:
+            return self._count(error)
+
+        query = request.query
+        try:
+            p_index = int(query.get('p', 0))
+            dpp = int(query.get('dpp', 10))
+            spd = int(query.get('spd', 10))
+        except ValueError:
+            return self._count(web.Response(status=400))
+        words = _words(query)
+        found = self.config.not_found not in words
+        p_count = math.ceil(self.config.docs / max(dpp, 1)) if found else 1
+
+        # RNC redirects to the first page if the page does not exist
+        if p_index >= p_count and p_index:
+            location = request.rel_url.update_query(p=0)
+            return self._count(web.Response(status=302, headers={'Location': str(location)}))
+
+        if not found:
+            page = self._not_found_page()
+        else:
+            page = self._page(request, words, p_index, p_count, max(dpp, 1), max(spd, 1))
+        headers = {'Content-Type': 'text/html; charset=utf-8'}
+        return self._count(await self._send(request, page.encode('utf-8'), headers=headers))
+
+    def _media_size(self,
+                    doc: int) -> int:
+        return self.config.media_size * (1 + doc % 4)
+
+    @staticmethod
+    def _media_content(doc: int,
+                       size: int) -> bytes:
+        pattern = bytes((byte + doc) % 256 for byte in range(256))
+        return (pattern * (size // 256 + 1))[:size]
+
+    async def _media(self,
+                     request: web.Request) -> web.StreamResponse:
+        error = await self._faults()
+        if error is not None:
+            return self._count(error)
+
+        try:
+            doc = int(request.match_info['doc'])
+        except ValueError:
+            return self._count(web.Response(status=404))
+        if not 0 <= doc < self.config.docs:
+            return self._count(web.Response(status=404))
+
+        size = self._media_size(doc)
+        headers = {'Content-Type': 'video/mp4', 'Accept-Ranges': 'bytes'}
+        if request.method == 'HEAD':
+            return self._count(web.Response(headers={**headers, 'Content-Length': str(size)}))
+
+        start, stop, status = 0, size, 200
+        match = RANGE_PATTERN.match(request.headers.get('Range', ''))
+        if match:
+            start = int(match.group(1))
+            stop = min(int(match.group(2)) + 1, size) if match.group(2) else size
+            if start >= size or start >= stop:
+                return self._count(web.Response(status=416, headers={'Content-Range': f"bytes */{size}"}))
+            status = 206
+            headers['Content-Range'] = f"bytes {start}-{stop - 1}/{size}"
+
+        content = self._media_content(doc, size)[start:stop]
+        return self._count(await self._send(request, content, status, headers))
+
+    @staticmethod
+    def _not_found_page() -> str:
+        return f'<html><body><div class="content"><p>{NOT_FOUND_MSG}</p></div></body></html>'
+
+    def _stats(self,
+               query: Any,
+               words: List[str]) -> str:
+        docs = self.config.docs
+        contexts = docs * self.config.contexts_per_doc
+        graphic = f"graphic.xml?req={html.escape('+'.join(words))}&amp;mode={html.escape(query.get('mode', 'main'))}"
+        return f'<p class="res">Найдено <span class="stat-number">{_number(docs)}</span> документов, ' \
+               f'<span class="stat-number">{_number(contexts)}</span> вхождений</p>' \
+               f'<p><a target="_blank" href="{graphic}">Распределение по годам</a></p>'
+
+    @staticmethod
+    def _pager(request: web.Request,
+               p_index: int,
+               p_count: int) -> str:
+        if p_count <= 1:
+            return ''
+        first = max(p_index - PAGER_WINDOW, 0)
+        last = min(p_index + PAGER_WINDOW + 1, p_count)
+        links = ' '.join(
+            f'<a href="{html.escape(str(request.rel_url.update_query(p=index)))}">{index + 1}</a>'
+            for index in range(first, last)
+        )
+        return f'<p class="pager">Страницы: {links}</p>'
+
+    def _docs(self,
+              p_index: int,
+              dpp: int,
+              spd: int) -> List[Tuple[int, int]]:
+        """ Get the documents of the page with their count of examples. """
+        first = p_index * dpp
+        last = min(first + dpp, self.config.docs)
+        return [
+            (doc, min(spd, self.config.contexts_per_doc))
+            for doc in range(first, last)
+        ]
+
+    def _page(self,
+              request: web.Request,
+              words: List[str],
+              p_index: int,
+              p_count: int,
+              dpp: int,
+              spd: int) -> str:
+        query = request.query
+        mode = query.get('mode', 'main')
+        docs = self._docs(p_index, dpp, spd)
+
+        if query.get('out') == 'kwic':
+            results = self._kwic(docs, words)
+        elif mode.startswith('para'):
+            lang = mode.split('-', 1)[-1] if '-' in mode else 'en'
+            results = self._para(docs, words, lang)
+        elif mode == 'murco':
+            results = self._murco(docs, words, request)
+        else:
+            results = self._main(docs, words)
+
+        return '<html><head><meta charset="utf-8"><title>НКРЯ</title></head><body>' \
+               f'<div class="content">{self._stats(query, words)}' \
+               f'{results}{self._pager(request, p_index, p_count)}</div></body></html>'
+
+    @staticmethod
+    def _main(docs: List[Tuple[int, int]],
+              words: List[str]) -> str:
+        items = []
+        for doc, examples in docs:
+            snippets = ''.join(
+                f'<li>{_snippet(doc, example, words)}</li>'
+                for example in range(examples)
+            )
+            items += [f'<li><p class="title">{html.escape(_source(doc))}</p><ul>{snippets}</ul></li>']
+        return f'<ol>{"".join(items)}</ol>'
+
+    @staticmethod
+    def _para(docs: List[Tuple[int, int]],
+              words: List[str],
+              lang: str) -> str:
+        items = []
+        for doc, examples in docs:
+            tables = ''.join(
+                '<table class="para">'
+                f'<tr><td class="para-lang">ru</td><td><ul><li>{_snippet(doc, example, words)}</li></ul></td></tr>'
+                f'<tr><td class="para-lang">{html.escape(lang)}</td>'
+                f'<td><ul><li>{_snippet(doc, example, words, lang)}</li></ul></td></tr>'
+                '</table>'
+                for example in range(examples)
+            )
+            items += [f'<li><p class="title">{html.escape(_source(doc))}</p>{tables}</li>']
+        return f'<ol>{"".join(items)}</ol>'
+
+    @staticmethod
+    def _murco(docs: List[Tuple[int, int]],
+               words: List[str],
+               request: web.Request) -> str:
+        # murco documents are clips with one example
+        base = f"{request.scheme}://{request.host}"
+        items = [
+            '<li><table><tr>'
+            f'<td valign="top"><a href="{base}/media/{doc}?name=clip{doc + 1}.mp4">Смотреть</a></td>'
+            f'<td class="murco-snippet">{_snippet(doc, 0, words)}</td>'
+            '</tr></table></li>'
+            for doc, _ in docs
+        ]
+        return f'<ol>{"".join(items)}</ol>'
+
+    @staticmethod
+    def _kwic(docs: List[Tuple[int, int]],
+              words: List[str]) -> str:
+        rows = [
+            '<tr>'
+            f'<td><nobr>Пример {doc + 1}.{example + 1}: здесь</nobr></td>'
+            f'<td><nobr>{_marked(words)}</nobr></td>'
+            f'<td><nobr>стоит в середине предложения. '
+            f'<a msg="{html.escape(_source(doc))}" href="{_doc_href(doc, example)}">←…→</a></nobr></td>'
+            '</tr>'
+            for doc, examples in docs
+            for example in range(examples)
+        ]
+        return f'<table align="left">{"".join(rows)}</table>'
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(url={self.url!r}, requests={self.requests}, " \
+               f"statuses={dict(self.statuses)}, bytes_sent={self.bytes_sent})"
@@ -0,0 +1,98 @@
+"""
+Module with planning the request: documents per page, sentences
+per document and count of pages to get the examples or documents
+with the fewest requests.
+"""
+
+__all__ = (
+    'RequestPlan',
+    'MAX_DPP',
+    'MAX_SPD',
+    'plan_request',
+)
+
+import logging
+import math
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger("rnc")
+
+# the largest values RNC allows
+MAX_DPP = 50
+MAX_SPD = 50
+
+
+class RequestPlan(NamedTuple):
+    dpp: int
+    spd: int
+    p_count: int
+    # count of the pages there are, None if it is unknown
+    max_p_count: Optional[int]
+    # expected count of examples and documents
+    examples: int
+    docs: int
+
+
+def _check_count(name: str,
+                 value: Optional[int]) -> None:
+    if value is not None and (not isinstance(value, int) or value <= 0):
+        msg = f"{name} must be int > 0, but '{value}' found"
+        logger.error(msg)
+        raise ValueError(msg)
+
+
+def plan_request(amount_of_docs: Optional[int],
+                 amount_of_contexts: Optional[int],
+                 examples: Optional[int] = None,
+                 docs: Optional[int] = None,
+                 dpp: int = MAX_DPP,
+                 spd: int = MAX_SPD) -> RequestPlan:
+    """ Get the smallest count of pages with the dpp and spd
+    to get the examples and the documents.
+
+    Every document gives spd examples at most, so it is expected
+    to give the average amount of contexts per document, if it is
+    less than spd.
+
+    Examples:
+    =========
+    .. code-block:: python
+        >>> plan_request(1000, 4000, examples=500)
+        RequestPlan(dpp=50, spd=50, p_count=3, max_p_count=20, examples=600, docs=150)
+
+    :param amount_of_docs: int, amount of docs where the query was found,
+     None if it is unknown.
+    :param amount_of_contexts: int, amount of contexts where the query
+     was found, None if it is unknown.
+    :param examples: int, count of examples to get.
+    :param docs: int, count of documents to get.
+    :param dpp: int, documents per page.
+    :param spd: int, sentences per document.
+    :return: RequestPlan.
+    :exception ValueError: if there is neither examples nor docs
+     or a count is not a positive int.
+    """
+    if examples is None and docs is None:
+        msg = "Count of examples or docs expected"
+        logger.error(msg)
+        raise ValueError(msg)
+    for name, value in (('Examples', examples), ('Docs', docs), ('DPP', dpp), ('SPD', spd)):
+        _check_count(name, value)
+
+    per_doc = float(spd)
+    if amount_of_docs and amount_of_contexts:
+        per_doc = min(per_doc, amount_of_contexts / amount_of_docs)
+    max_docs = math.inf if amount_of_docs is None else amount_of_docs
+    max_examples = math.inf if amount_of_contexts is None else amount_of_contexts
+
+    docs_needed = min(docs or 0, max_docs)
+    if examples is not None:
+        docs_needed = max(docs_needed, math.ceil(min(examples, max_examples) / per_doc))
+    docs_needed = min(docs_needed, max_docs)
+
+    p_count = max(math.ceil(docs_needed / dpp), 1)
+    max_p_count = None if amount_of_docs is None else max(math.ceil(amount_of_docs / dpp), 1)
+    expected_docs = min(p_count * dpp, max_docs)
+    return RequestPlan(
+        dpp, spd, p_count, max_p_count,
+        int(min(expected_docs * per_doc, max_examples)), int(expected_docs))
@@ -0,0 +1,167 @@
+"""
+Module with the download scheduler shared by the process: media
+files requested one by one are downloaded in the background loop
+with one session, so its connections are reused.
+"""
+
+__all__ = (
+    'DownloadScheduler',
+    'download_scheduler',
+)
+
+import asyncio
+import concurrent.futures
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import aiohttp
+
+import rnc.corpora_requests as creq
+from rnc.disk_writer import DiskWriter
+from rnc.loop import BackgroundLoop, background_loop
+from rnc.transport import get_transport
+
+logger = logging.getLogger("rnc")
+
+
+class DownloadScheduler:
+    """ Downloads of the media files in the background loop.
+
+    Files are downloaded by workers at once, they share the
+    session, the rate limiter and the disk writer. The complete
+    files are skipped, the partial ones are resumed (see
+    creq.download_docs), the file requested while it is being
+    downloaded is downloaded once.
+
+    Examples:
+    =========
+    .. code-block:: python
+        >>> scheduler = download_scheduler()
+        >>> futures = [
+        ...     scheduler.submit(example._media_url, example.filepath)
+        ...     for example in corp
+        ... ]
+        >>> concurrent.futures.wait(futures)
+    """
+    def __init__(self,
+                 workers: int = 5,
+                 loop: Optional[BackgroundLoop] = None) -> None:
+        """
+        :param workers: int, count of the concurrent downloads.
+        :param loop: BackgroundLoop, loop to download in, the
+         process-wide one by default.
+        :exception ValueError: if count of workers is not a positive int.
+        """
+        if not isinstance(workers, int) or workers <= 0:
+            msg = f"Workers must be int > 0, but '{workers}' found"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self.workers = workers
+        self.loop = loop or background_loop()
+        self.loop.on_close(self.close_session)
+
+        # they are created in the loop
+        self._ses: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._limiter: Optional[creq.RateLimiter] = None
+        self._writer = DiskWriter()
+        self._manifests: Dict[Path, creq.MediaManifest] = {}
+        # downloads in progress by filename
+        self._flights: Dict[str, asyncio.Future] = {}
+
+    async def close_session(self) -> None:
+        """ Close the session, it is done when the loop is closed. """
+        if self._ses is not None:
+            await self._ses.close()
+        await self._writer.close()
+        self._ses = self._semaphore = self._limiter = None
+        self._flights = {}
+
+    def _session(self) -> aiohttp.ClientSession:
+        if self._ses is None or self._ses.closed:
+            self._ses = get_transport().session(creq.media_timeout())
+            self._semaphore = asyncio.Semaphore(self.workers)
+            self._limiter = creq.RateLimiter()
+            self._writer.start()
+        return self._ses
+
+    async def _fetch(self,
+                     url: str,
+                     filename: str) -> bool:
+        ses = self._session()
+        missing = await creq._missing_media([(url, filename)], self._manifests)
+        if not missing:
+            logger.debug(f"'{filename}' is complete, skipped")
+            return True
+        _, _, manifest = missing[0]
+        os.makedirs(Path(filename).parent, exist_ok=True)
+
+        async with self._semaphore, self._limiter: # type: ignore
+            res = await creq.fetch_media_file(url, filename, ses, self._writer)
+        while res == -1:
+            logger.debug(f"429 'Too many requests', url: {url}; wait {creq.WAIT}s")
+            self._limiter.pause(creq.WAIT) # type: ignore
+            async with self._semaphore, self._limiter: # type: ignore
+                res = await creq.fetch_media_file(url, filename, ses, self._writer)
+
+        if res is None:
+            return False
+        size, sha256 = res # type: ignore
+        manifest.add(url, filename, size, sha256)
+        logger.debug(f"'{url}' dumped to '{filename}', {size} bytes")
+        return True
+
+    async def _download(self,
+                        url: str,
+                        filename: str) -> bool:
+        flight = self._flights.get(filename)
+        if flight is None:
+            flight = self._flights[filename] = asyncio.ensure_future(self._fetch(url, filename))
+            flight.add_done_callback(lambda _: self._flights.pop(filename, None))
+        return await asyncio.shield(flight)
+
+    def submit(self,
+               url: str,
+               filename: Union[str, Path]) -> concurrent.futures.Future:
+        """ Schedule the download, it might be called from any thread.
+
+        :param url: str, URL of the media file.
+        :param filename: str or Path, file to download to.
+        :return: concurrent.futures.Future, its result is
+         bool, whether the file is downloaded.
+        """
+        return self.loop.submit(self._download(url, str(filename)))
+
+    async def download(self,
+                       url: str,
+                       filename: Union[str, Path]) -> bool:
+        """ Download the file in the background loop and
+        wait for it in the running event loop.
+
+        :return: bool, whether the file is downloaded.
+        """
+        if self.loop.in_loop():
+            return await self._download(url, str(filename))
+        return await asyncio.wrap_future(self.submit(url, filename))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(workers={self.workers}, " \
+               f"in_progress={len(self._flights)})"
+
+
+_SCHEDULER: Optional[DownloadScheduler] = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def download_scheduler() -> DownloadScheduler:
+    """ Get the scheduler shared by the process. """
+    global _SCHEDULER
+
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None or _SCHEDULER.loop is not background_loop():
+            _SCHEDULER = DownloadScheduler()
+        return _SCHEDULER
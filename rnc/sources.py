@@ -0,0 +1,85 @@
+"""
+Module with parsing the examples' sources like
+'Author. Title (year) [genre]' to their fields.
+"""
+
+__all__ = (
+    'SourceInfo',
+    'SOURCE_FIELDS',
+    'parse_source',
+)
+
+import re
+from typing import NamedTuple, Optional
+
+SOURCE_FIELDS = ('author', 'title', 'year', 'genre')
+
+# genre in square brackets at the end of the source
+GENRE_PATTERN = re.compile(r'\s*\[([^\[\]]*)\]\s*$')
+# the last parentheses with a year, the first year
+# of them is taken if there is a range of years
+YEAR_IN_PARENTHESES = re.compile(r'\(([^()]*?\b(\d{4})\b[^()]*)\)[^()]*$')
+# year of the publication after '//' like '«Известия», 2002.03.12'
+YEAR_OF_PUBLICATION = re.compile(r'\b(\d{4})(?:\.\d{2}){0,2}\s*$')
+
+
+class SourceInfo(NamedTuple):
+    author: str
+    title: str
+    year: Optional[int]
+    genre: str
+
+
+def _split_author(source: str) -> SourceInfo:
+    """ Split 'Author. Title' to the parts. Authors' initials
+    are skipped, the first dot after a word, which is not
+    a single letter, ends the author.
+    """
+    for match in re.finditer(r'(\w+)\.\s+', source):
+        word = match.group(1)
+        if len(word) > 1 or not word.isalpha():
+            author = source[:match.end(1)]
+            return SourceInfo(author, source[match.end():].strip(), None, '')
+    return SourceInfo('', source.strip(), None, '')
+
+
+def _publication_year(publication: str) -> Optional[int]:
+    match = YEAR_IN_PARENTHESES.search(publication)
+    if match:
+        return int(match.group(2))
+    match = YEAR_OF_PUBLICATION.search(publication)
+    if match:
+        return int(match.group(1))
+    return None
+
+
+def parse_source(source: str) -> SourceInfo:
+    """ Parse the source of the example.
+
+    Examples:
+    =========
+    .. code-block:: python
+        >>> parse_source('Л. Н. Толстой. Война и мир (1865-1869)')
+        SourceInfo(author='Л. Н. Толстой', title='Война и мир', year=1865, genre='')
+
+    :param source: str, source of the example.
+    :return: SourceInfo, the author and the genre are empty,
+     the year is None if they are not found.
+    """
+    genre = ''
+    match = GENRE_PATTERN.search(source)
+    if match:
+        genre = match.group(1).strip()
+        source = source[:match.start()]
+
+    source, _, publication = source.partition('//')
+    year = None
+    match = YEAR_IN_PARENTHESES.search(source)
+    if match:
+        year = int(match.group(2))
+        source = source[:match.start()]
+    else:
+        year = _publication_year(publication)
+
+    author, title, _, _ = _split_author(source)
+    return SourceInfo(author, title.rstrip(' .'), year, genre)
@@ -0,0 +1,107 @@
+"""
+Module with splitting the examples' texts to tokens and
+getting the literals every match of a regular expression contains.
+"""
+
+__all__ = (
+    'tokenize',
+    'normalize_token',
+    'required_literals',
+)
+
+import logging
+import re
+from typing import Any, List, Pattern, Union
+
+try:
+    import re._parser as sre_parse  # type: ignore
+except ImportError:
+    import sre_parse  # type: ignore
+
+
+logger = logging.getLogger("rnc")
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+_REPEATS = tuple(
+    getattr(sre_parse, name)
+    for name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')
+    if hasattr(sre_parse, name)
+)
+_ATOMIC_GROUP = getattr(sre_parse, 'ATOMIC_GROUP', None)
+
+
+def normalize_token(token: str) -> str:
+    """ Casefold the token. Dotless i is replaced, because
+    re.IGNORECASE treats it as equal to 'i'.
+    """
+    return token.casefold().replace('ı', 'i')
+
+
+def tokenize(text: str) -> List[str]:
+    """ Split the text to normalized words. Casefolding does not
+    depend on the neighbour characters, so the text is normalized
+    at once.
+    """
+    return TOKEN_PATTERN.findall(normalize_token(text))
+
+
+def _flush(run: List[str],
+           literals: List[str]) -> None:
+    if run:
+        literals.extend(tokenize(''.join(run)))
+        run.clear()
+
+
+def _collect(parsed: Any,
+             literals: List[str]) -> None:
+    """ Collect literals of the parsed pattern, they are
+    got from the parts which must be in every match:
+    sequences of characters, groups and repeats at least once.
+    """
+    run: List[str] = []
+    for op, av in parsed:
+        if op == sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+
+        _flush(run, literals)
+        if op == sre_parse.SUBPATTERN:
+            _collect(av[-1], literals)
+        elif op in _REPEATS:
+            min_count, _, item = av
+            if min_count >= 1:
+                _collect(item, literals)
+        elif op == _ATOMIC_GROUP:
+            _collect(av, literals)
+    _flush(run, literals)
+
+
+def required_literals(pattern: Union[Pattern, str],
+                      flags: int = 0) -> List[str]:
+    """ Get normalized words (or their parts), which are
+    in all strings the pattern matches.
+
+    Every literal is a substring of a token of the string,
+    so the texts without them might be skipped.
+
+    :param pattern: str or compiled pattern.
+    :param flags: int, flags of the pattern.
+    :return: list of str, empty if nothing is required
+     or the pattern is not a str one.
+    """
+    if isinstance(pattern, re.Pattern):
+        flags = pattern.flags
+        pattern = pattern.pattern
+    if not isinstance(pattern, str):
+        return []
+
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except Exception as e:
+        logger.debug(f"Literals of '{pattern}' not got: {e}")
+        return []
+
+    literals: List[str] = []
+    _collect(parsed, literals)
+    return list(dict.fromkeys(literals))
@@ -0,0 +1,434 @@
+"""
+Module with the HTTP transports of the requests: aiohttp one by
+default, the one recording the responses to the archive and the one
+replaying them offline with the given latency and statuses.
+"""
+
+__all__ = (
+    'Transport',
+    'AiohttpTransport',
+    'RecordingTransport',
+    'ReplayTransport',
+    'ReplayResponse',
+    'ResponseArchive',
+    'get_transport',
+    'set_transport',
+    'request_key',
+)
+
+import asyncio
+import hashlib
+import http
+import logging
+import os
+import re
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Union
+
+import aiohttp
+import ujson
+import yarl
+from multidict import CIMultiDict
+
+logger = logging.getLogger("rnc")
+
+# the body is decoded and its size might change
+SKIPPED_HEADERS = ('Content-Encoding', 'Transfer-Encoding', 'Content-Length')
+RANGE_PATTERN = re.compile(r'bytes=(\d+)-$')
+
+
+def request_key(method: str,
+                url: Union[str, yarl.URL],
+                params: Optional[Dict[str, Any]] = None) -> str:
+    """ Get the key of the request: method and URL
+    with the sorted params of the query.
+    """
+    url = yarl.URL(url)
+    query = [*url.query.items(), *((str(key), str(value)) for key, value in (params or {}).items())]
+    return f"{method.upper()} {url.with_query(sorted(query))}"
+
+
+class ResponseArchive:
+    """ Responses in the folder: the index of their statuses
+    and headers by the request key, the bodies in the files.
+    """
+    INDEX_NAME = 'index.json'
+
+    def __init__(self,
+                 folder: Union[str, Path]) -> None:
+        self.folder = Path(folder)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+        index_path = self.folder / self.INDEX_NAME
+        if index_path.exists():
+            with index_path.open(encoding='utf-8') as f:
+                self.entries = ujson.load(f)
+
+    def get(self,
+            key: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(key)
+
+    def body(self,
+             entry: Dict[str, Any]) -> bytes:
+        return (self.folder / entry['body']).read_bytes()
+
+    def add(self,
+            key: str,
+            status: int,
+            url: str,
+            headers: Dict[str, str],
+            body: bytes) -> None:
+        """ Write the body and the index. """
+        self.folder.mkdir(parents=True, exist_ok=True)
+        name = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        (self.folder / name).write_bytes(body)
+
+        self.entries[key] = {'status': status, 'url': url, 'headers': headers, 'body': name}
+        path = self.folder / self.INDEX_NAME
+        temp_path = path.with_name(f"{path.name}.part")
+        with temp_path.open('w', encoding='utf-8') as f:
+            ujson.dump(self.entries, f, indent=2, ensure_ascii=False, escape_forward_slashes=False)
+        os.replace(temp_path, path)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class _Content:
+    def __init__(self,
+                 body: bytes) -> None:
+        self._body = body
+
+    async def iter_chunked(self,
+                           n: int) -> AsyncIterator[bytes]:
+        for start in range(0, len(self._body), n):
+            yield self._body[start:start + n]
+
+
+class ReplayResponse:
+    """ Response with the interface of aiohttp.ClientResponse
+    used by the requests.
+    """
+    def __init__(self,
+                 status: int,
+                 url: Union[str, yarl.URL],
+                 headers: Optional[Dict[str, str]] = None,
+                 body: bytes = b'',
+                 method: str = 'GET') -> None:
+        self.status = status
+        try:
+            self.reason = http.HTTPStatus(status).phrase
+        except ValueError:
+            self.reason = ''
+        self.url = yarl.URL(url)
+        self.method = method
+        self.headers: CIMultiDict = CIMultiDict(headers or {})
+        if method != 'HEAD':
+            self.headers['Content-Length'] = str(len(body))
+        self.content = _Content(body)
+        self._body = body
+
+    @property
+    def content_length(self) -> Optional[int]:
+        length = self.headers.get('Content-Length')
+        return None if length is None else int(length)
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self,
+                   encoding: str = 'utf-8',
+                   errors: str = 'strict') -> str:
+        return self._body.decode(encoding, errors)
+
+    def close(self) -> None:
+        pass
+
+    def release(self) -> None:
+        pass
+
+    async def __aenter__(self) -> 'ReplayResponse':
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}({self.status} {self.reason}) [{self.method} {self.url}]>"
+
+
+class _RequestContext:
+    """ The request might be awaited or used as async context manager,
+    as aiohttp.ClientSession.get.
+    """
+    def __init__(self,
+                 coro: Awaitable[Any]) -> None:
+        self._coro = coro
+        self._resp: Any = None
+
+    def __await__(self) -> Any:
+        return self._coro.__await__()
+
+    async def __aenter__(self) -> Any:
+        self._resp = await self._coro
+        return self._resp
+
+    async def __aexit__(self, *args: Any) -> None:
+        self._resp.close()
+
+
+class _Session(ABC):
+    """ Session with the interface of aiohttp.ClientSession
+    used by the requests: get, head and close.
+    """
+    def __init__(self) -> None:
+        self.closed = False
+
+    @abstractmethod
+    async def _request(self,
+                       method: str,
+                       url: str,
+                       params: Optional[Dict[str, Any]],
+                       headers: Optional[Dict[str, str]],
+                       allow_redirects: bool) -> Any:
+        pass
+
+    def get(self,
+            url: str,
+            params: Optional[Dict[str, Any]] = None,
+            headers: Optional[Dict[str, str]] = None,
+            allow_redirects: bool = True) -> _RequestContext:
+        return _RequestContext(self._request('GET', url, params, headers, allow_redirects))
+
+    def head(self,
+             url: str,
+             params: Optional[Dict[str, Any]] = None,
+             headers: Optional[Dict[str, str]] = None,
+             allow_redirects: bool = False) -> _RequestContext:
+        return _RequestContext(self._request('HEAD', url, params, headers, allow_redirects))
+
+    async def close(self) -> None:
+        self.closed = True
+
+    async def __aenter__(self) -> Any:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+
+class Transport(ABC):
+    """ HTTP client of the requests, it gives sessions with the
+    interface of aiohttp.ClientSession used by them.
+    """
+    @abstractmethod
+    def session(self,
+                timeout: aiohttp.ClientTimeout) -> Any:
+        """ Get new session, it should be called in the running event loop. """
+        pass
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}()"
+
+
+class AiohttpTransport(Transport):
+    """ Transport of aiohttp sessions, the default one. """
+    def __init__(self, **kwargs) -> None:
+        """
+        :param kwargs: params of aiohttp.ClientSession, e.g. connector.
+        """
+        self.kwargs = kwargs
+
+    def session(self,
+                timeout: aiohttp.ClientTimeout) -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(timeout=timeout, **self.kwargs)
+
+
+class _RecordingSession(_Session):
+    def __init__(self,
+                 transport: 'RecordingTransport',
+                 ses: Any) -> None:
+        super().__init__()
+        self._transport = transport
+        self._ses = ses
+
+    async def _request(self,
+                       method: str,
+                       url: str,
+                       params: Optional[Dict[str, Any]],
+                       headers: Optional[Dict[str, str]],
+                       allow_redirects: bool) -> ReplayResponse:
+        request = self._ses.get if method == 'GET' else self._ses.head
+        async with request(url, params=params, headers=headers, allow_redirects=allow_redirects) as resp:
+            body = await resp.read()
+            status, final_url = resp.status, str(resp.url)
+            resp_headers = {
+                key: value
+                for key, value in resp.headers.items()
+                if key not in SKIPPED_HEADERS
+            }
+        if method == 'HEAD' and resp.content_length is not None:
+            resp_headers['Content-Length'] = str(resp.content_length)
+
+        # the part of the content and the temporary errors are not recorded
+        if status != 206 and status != 429 and status < 500:
+            key = request_key(method, url, params)
+            self._transport.archive.add(key, status, final_url, resp_headers, body)
+            logger.debug(f"'{key}' recorded: {status}, {len(body)} bytes")
+        return ReplayResponse(status, final_url, resp_headers, body, method)
+
+    async def close(self) -> None:
+        await self._ses.close()
+        await super().close()
+
+
+class RecordingTransport(Transport):
+    """ Transport recording the responses of the other
+    one to the archive, the bodies are read at once.
+
+    Examples:
+    =========
+    .. code-block:: python
+        >>> set_transport(RecordingTransport('data/archive'))
+        >>> corp = MainCorpus('кот', 2)
+        >>> corp.request_examples()
+        >>> set_transport(ReplayTransport('data/archive'))
+        >>> corp = MainCorpus('кот', 2)
+        >>> corp.request_examples()  # offline
+    """
+    def __init__(self,
+                 folder: Union[str, Path],
+                 transport: Optional[Transport] = None) -> None:
+        """
+        :param folder: str or Path, folder of the archive.
+        :param transport: Transport, the one requesting, aiohttp by default.
+        """
+        self.archive = ResponseArchive(folder)
+        self.transport = transport or AiohttpTransport()
+
+    def session(self,
+                timeout: aiohttp.ClientTimeout) -> _RecordingSession:
+        return _RecordingSession(self, self.transport.session(timeout))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(folder='{self.archive.folder}', " \
+               f"recorded={len(self.archive)})"
+
+
+class _ReplaySession(_Session):
+    def __init__(self,
+                 transport: 'ReplayTransport') -> None:
+        super().__init__()
+        self._transport = transport
+
+    async def _request(self,
+                       method: str,
+                       url: str,
+                       params: Optional[Dict[str, Any]],
+                       headers: Optional[Dict[str, str]],
+                       allow_redirects: bool) -> ReplayResponse:
+        transport = self._transport
+        key = request_key(method, url, params)
+        index = transport.requests
+        transport.requests += 1
+
+        latency = transport.latency(key) if callable(transport.latency) else transport.latency
+        if latency:
+            await asyncio.sleep(latency)
+
+        status = None if transport.inject is None else transport.inject(index, key)
+        if status is not None:
+            logger.debug(f"'{key}' replayed with the injected status {status}")
+            return ReplayResponse(status, url, method=method)
+
+        entry = transport.archive.get(key)
+        if entry is None and method == 'HEAD':
+            # the headers of the recorded content
+            entry = transport.archive.get(request_key('GET', url, params))
+        if entry is None:
+            logger.warning(f"'{key}' is not recorded")
+            return ReplayResponse(transport.missing_status, url, method=method)
+
+        body = transport.archive.body(entry)
+        resp_headers = dict(entry['headers'])
+        if method == 'HEAD':
+            resp_headers.setdefault('Content-Length', str(len(body)))
+            return ReplayResponse(entry['status'], entry['url'], resp_headers, method=method)
+
+        match = RANGE_PATTERN.match((headers or {}).get('Range', ''))
+        if match and entry['status'] == 200:
+            start = int(match.group(1))
+            if start >= len(body):
+                return ReplayResponse(416, entry['url'], method=method)
+            resp_headers['Content-Range'] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+            return ReplayResponse(206, entry['url'], resp_headers, body[start:], method)
+        return ReplayResponse(entry['status'], entry['url'], resp_headers, body, method)
+
+
+class ReplayTransport(Transport):
+    """ Transport replaying the recorded responses offline,
+    the requests which are not recorded get 404.
+
+    Examples:
+    =========
+    .. code-block:: python
+        >>> # every 5th request gets 429, every response takes 50ms
+        >>> transport = ReplayTransport(
+        ...     'data/archive', latency=0.05,
+        ...     inject=lambda index, key: 429 if index % 5 == 4 else None)
+        >>> set_transport(transport)
+    """
+    def __init__(self,
+                 folder: Union[str, Path],
+                 latency: Union[float, Callable[[str], float]] = 0,
+                 inject: Optional[Callable[[int, str], Optional[int]]] = None,
+                 missing_status: int = 404) -> None:
+        """
+        :param folder: str or Path, folder of the archive.
+        :param latency: float, seconds to wait before every response,
+         or func getting them by the request key.
+        :param inject: func getting the status to answer instead of the
+         recorded response by index and key of the request, None not to inject.
+        :param missing_status: int, status of the requests, which are not recorded.
+        """
+        self.archive = ResponseArchive(folder)
+        self.latency = latency
+        self.inject = inject
+        self.missing_status = missing_status
+        # count of the requests
+        self.requests = 0
+
+    def session(self,
+                timeout: aiohttp.ClientTimeout) -> _ReplaySession:
+        return _ReplaySession(self)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(folder='{self.archive.folder}', " \
+               f"recorded={len(self.archive)}, requests={self.requests})"
+
+
+_TRANSPORT: Transport = AiohttpTransport()
+
+
+def get_transport() -> Transport:
+    """ Get the transport of the requests. """
+    return _TRANSPORT
+
+
+def set_transport(transport: Transport) -> Transport:
+    """ Set the transport of the requests.
+
+    :return: the previous transport.
+    :exception TypeError: if it is not a Transport.
+    """
+    global _TRANSPORT
+
+    if not isinstance(transport, Transport):
+        msg = f"Transport expected, but '{type(transport)}' found"
+        logger.error(msg)
+        raise TypeError(msg)
+
+    previous, _TRANSPORT = _TRANSPORT, transport
+    logger.debug(f"Transport is set to {transport}")
+    return previous
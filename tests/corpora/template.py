@@ -5,6 +5,7 @@ from time import sleep
 import pytest
 
 import rnc.corpora as rnc
+from rnc.example_store import ExampleStore
 
 
 class TemplateCorpusTest:
@@ -159,6 +160,13 @@ class TemplateCorpusTest:
             for from_file, from_corp in zip(corp, self.corp_kwic_obj)
         )
 
+    def test_lazy_from_file(self):
+        corp = self.corp_type(file=self.corp_normal_obj.file, load=False)
+
+        assert len(corp) == 0
+        assert corp.lazy().collect() == list(self.corp_normal_obj)
+        assert corp.lazy().take(2).to_corpus().data == self.corp_normal_obj.data[:2]
+
     def test_load_to_wrong_corpus(self):
         with pytest.raises(NotImplementedError):
             self.corp_type(file=f'data{os.sep}wrong_mode.csv')
@@ -186,7 +194,7 @@ class TemplateCorpusTest:
     #########################
 
     def test_data_type(self):
-        assert isinstance(self.corp_normal_obj.data, list)
+        assert isinstance(self.corp_normal_obj.data, ExampleStore)
 
     def test_data_elements_type(self):
         assert all(
@@ -256,6 +264,24 @@ class TemplateCorpusTest:
 
         assert copy.data == self.corp_normal_obj.data
 
+    def test_copy_params_not_shared(self):
+        corp = self.corp_normal_obj
+        copy = corp.copy()
+        copy._params['dpp'] = corp.params['dpp'] + 1
+        assert copy.params != corp.params
+
+        if isinstance(copy.query, dict):
+            copy.query['changed'] = {}
+            assert copy.query != corp.query
+
+    def test_slice(self):
+        corp = self.corp_normal_obj
+        sliced = corp[1:4]
+        sliced.pop(0)
+
+        assert sliced.params == corp.params and sliced.file == corp.file
+        assert sliced.data == [corp[2], corp[3]]
+
     def test_sort_data(self):
         copy = self.corp_normal_obj.copy()
         copy.sort_data(key=lambda x: len(x.txt))
@@ -281,6 +307,25 @@ class TemplateCorpusTest:
         assert (example in self.corp_normal_obj and
                 example not in copy)
 
+    def test_deduplicate(self):
+        copy = self.corp_normal_obj.copy()
+        copy.data.extend(list(self.corp_normal_obj))
+        removed = copy.deduplicate()
+
+        assert removed >= len(self.corp_normal_obj)
+        assert all(example in copy for example in self.corp_normal_obj)
+
+    def test_set_operations(self):
+        lhs, rhs = self.corp_normal_obj[:3], self.corp_normal_obj[2:]
+
+        assert len(lhs | rhs) <= len(self.corp_normal_obj)
+        assert all(example in lhs & rhs for example in self.corp_normal_obj[2:3])
+        assert all(example not in lhs - rhs for example in rhs)
+
+    def test_set_operations_wrong_type(self):
+        with pytest.raises(TypeError):
+            self.corp_normal_obj | self.corp_kwic_obj
+
     def test_shuffle(self):
         copy = self.corp_normal_obj.copy()
         copy.shuffle()
@@ -0,0 +1,67 @@
+import pytest
+
+import rnc.collocations as collocations_module
+import rnc.concordance as concordance
+import rnc.examples as expl
+from rnc.collocations import batch_collocations, collocations
+from rnc.concordance import cooccurrences
+from rnc.example_store import ExampleStore
+
+
+@pytest.fixture(params=[True, False], ids=['numpy', 'python'])
+def with_numpy(request, monkeypatch):
+    if request.param:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(concordance, 'np', None)
+        monkeypatch.setattr(collocations_module, 'np', None)
+
+
+def create_examples():
+    kwic = [
+        expl.KwicExample(left, 'чай', right, 'src', ['чай'], 'url')
+        for left, right in (
+            ('Крепкий', 'и сладкий'), ('очень крепкий', 'с лимоном'),
+            ('горячий', 'и кофе'), ('', 'крепкий, чёрный'))
+    ]
+    main = [
+        expl.MainExample('Пили крепкий чай весь вечер', 'src', 'amb', ['чай'], 'url'),
+        expl.MainExample('Вечер был тихий', 'src', 'amb', [], 'url'),
+    ]
+    return kwic + main
+
+
+def test_cooccurrences(with_numpy):
+    store = ExampleStore(create_examples())
+    counts = cooccurrences(store, left=1, right=1)
+    frequency = dict(zip(counts.vocabulary.lookup(range(len(counts.vocabulary))), counts.window_counts))
+
+    assert frequency['крепкий'] == 4 and frequency['и'] == 2
+    assert frequency['весь'] == 1 and frequency['тихий'] == 0
+    assert counts.window_size == 9 and counts.size == 24
+
+    with pytest.raises(ValueError):
+        cooccurrences(store, left=-1)
+
+
+def test_collocations(with_numpy):
+    store = ExampleStore(create_examples())
+    result = collocations(store, left=2, right=2, measure='frequency', min_frequency=2)
+
+    assert [item.collocate for item in result] == ['крепкий', 'и']
+    strong = result[0]
+    assert strong.frequency == 4 and strong.corpus_frequency == 4
+    assert strong.mi == pytest.approx(0.585, abs=1e-3)
+    assert strong.t_score > 0 and strong.log_likelihood > 0
+
+    with pytest.raises(ValueError):
+        collocations(store, measure='dice')
+
+
+def test_collocations_with_nodes(with_numpy):
+    store = ExampleStore(create_examples())
+    result = collocations(store, left=1, right=0, nodes=['Вечер'], measure='frequency')
+
+    assert [(item.collocate, item.frequency) for item in result] == [('весь', 1)]
+    assert batch_collocations([store, store[:0]], nodes=['вечер']) == [
+        collocations(store, nodes=['вечер']), []]
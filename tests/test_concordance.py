@@ -0,0 +1,52 @@
+import pytest
+
+import rnc.concordance as concordance
+import rnc.examples as expl
+from rnc.concordance import collocates, level_counts, sort_concordance
+from rnc.example_store import ExampleStore
+
+
+@pytest.fixture(params=[True, False], ids=['numpy', 'python'])
+def with_numpy(request, monkeypatch):
+    if request.param:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(concordance, 'np', None)
+
+
+def create_kwic_examples():
+    contexts = (
+        ('Старый кот', 'спит', 'на печи.'),
+        ('Рыжий, пёс', 'спит', 'во дворе'),
+        ('', 'спит', 'на крыше'),
+        ('Старый пёс', 'спит', 'на печи'),
+    )
+    return [
+        expl.KwicExample(left, center, right, 'src', ['спит'], 'url')
+        for left, center, right in contexts
+    ]
+
+
+def test_sort_concordance(with_numpy):
+    examples = create_kwic_examples()
+    store = ExampleStore(examples)
+
+    sort_concordance(store, 'R1', 'R2', 'L1')
+    assert store == [examples[index] for index in (1, 2, 0, 3)]
+    sort_concordance(store, 'L1', reverse=True)
+    assert store == [examples[index] for index in (1, 3, 0, 2)]
+
+    with pytest.raises(ValueError):
+        sort_concordance(store, 'R0')
+
+
+def test_concordance_counts(with_numpy):
+    store = ExampleStore(create_kwic_examples())
+
+    assert level_counts(store, 'R1') == {'на': 3, 'во': 1}
+    assert level_counts(store, 'L2') == {'старый': 2, 'рыжий': 1}
+    assert collocates(store, left=1, right=1) == {
+        'кот': 1, 'пёс': 2, 'на': 3, 'во': 1}
+
+    store[0] = expl.KwicExample('кот', 'спит', 'в доме', 'src', [], 'url')
+    assert level_counts(store, 'R1') == {'на': 2, 'во': 1, 'в': 1}
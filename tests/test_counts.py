@@ -0,0 +1,40 @@
+import pytest
+
+from rnc.corpora import MainCorpus, Paper2000Corpus
+from rnc.counts import _count_requests, parse_counts
+
+
+def create_page(*amounts):
+    numbers = ''.join(
+        f'<span class="stat-number">{amount}</span>'
+        for amount in amounts
+    )
+    return '<html><body><div class="content">' \
+           '<p class="res">Всего: <span class="stat-number">1 000</span></p>' \
+           f'<p class="res">Найдено: {numbers}</p>' \
+           '<ol><li>example</li></ol></div></body></html>'
+
+
+def test_parse_counts():
+    assert parse_counts(create_page('1 234', '56 789')) == {'docs': 1234, 'contexts': 56789}
+    assert parse_counts(create_page('42')) == {'contexts': 42}
+
+    page = '<div class="content"><p>По этому запросу ничего не найдено.</p></div>'
+    assert parse_counts(page) == {'contexts': 0, 'docs': 0}
+
+    with pytest.raises(ValueError):
+        parse_counts('<html></html>')
+
+
+def test_count_requests():
+    query = {'кот': {'gramm': {'case': 'gen'}}}
+    keys, requests = _count_requests(
+        [query, 'пёс'], [MainCorpus, Paper2000Corpus], dpp=10)
+
+    assert keys == [
+        (query, 'MainCorpus'), (query, 'Paper2000Corpus'),
+        ('пёс', 'MainCorpus'), ('пёс', 'Paper2000Corpus')]
+    assert [params['mode'] for params in requests] == ['main', 'paper'] * 2
+    assert all(params['dpp'] == params['spd'] == 1 and params['p'] == 0 for params in requests)
+    assert requests[0]['gramm1'] == requests[1]['gramm1'] == '(gen)'
+    assert query == {'кот': {'gramm': {'case': 'gen'}}}
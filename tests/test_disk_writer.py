@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+import rnc.corpora_requests as creq
+from rnc.disk_writer import DiskWriter, default_writer
+from rnc.loop import background_loop
+from tests.test_media import CONTENT, media_server, serve_media
+
+
+def test_write_files(tmp_path):
+    paths = [str(tmp_path / f"{index}.bin") for index in range(5)]
+
+    async def write(writer):
+        async with writer:
+            for index, path in enumerate(paths):
+                await writer.open(path, append=index == 0)
+            for block in range(100):
+                for path in paths:
+                    await writer.write(path, bytearray(f"{block},", 'utf-8'))
+            await asyncio.gather(*map(writer.close_file, paths))
+        assert not writer.is_started
+
+    expected = ''.join(f"{block}," for block in range(100)).encode('utf-8')
+    for writer in (DiskWriter(threads=3, buffer_size=64), DiskWriter(fsync=True, fsync_batch=2)):
+        (tmp_path / '0.bin').write_bytes(b'start-')
+        asyncio.run(write(writer))
+
+        assert (tmp_path / '0.bin').read_bytes() == b'start-' + expected
+        assert all((tmp_path / f"{index}.bin").read_bytes() == expected for index in range(1, 5))
+
+
+def test_write_error(tmp_path):
+    path = str(tmp_path / 'missing' / 'file.bin')
+
+    async def write():
+        async with DiskWriter() as writer:
+            await writer.open(path)
+            await writer.write(path, b'content')
+            with pytest.raises(OSError):
+                await writer.close_file(path)
+
+    asyncio.run(write())
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(DiskWriter().write(path, b'content'))
+    with pytest.raises(ValueError):
+        DiskWriter(buffer_size=0)
+
+
+def test_download_docs(tmp_path):
+    async def download():
+        async with media_server(serve_media) as url:
+            await creq.download_docs_async(
+                [(f"{url}/clip", str(tmp_path / f"{index}.mp4")) for index in range(3)],
+                DiskWriter(threads=2, buffer_size=10_000, queue_size=2, fsync=True))
+
+    asyncio.run(download())
+
+    assert all((tmp_path / f"{index}.mp4").read_bytes() == CONTENT for index in range(3))
+
+
+def test_default_writer():
+    async def writers():
+        return default_writer(), default_writer()
+
+    first, second = asyncio.run(writers())
+    assert first is second and first.is_started
+    assert asyncio.run(writers())[0] is not first
+
+    # the one of the background loop is shared by its downloads
+    shared, _ = background_loop().run(writers())
+    assert background_loop().run(writers())[0] is shared
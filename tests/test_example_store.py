@@ -0,0 +1,330 @@
+import re
+
+import pytest
+
+import rnc.example_store as example_store
+import rnc.examples as expl
+from rnc.example_store import ExampleStore, WordformIndex
+
+
+def create_examples(count: int = 10):
+    return [
+        expl.MainExample(
+            f"текст номер {num}", f"Автор. Название ({1900 + num})",
+            'disambiguated', ['текст'], f"https://ruscorpora.ru/{num % 3}")
+        for num in range(count)
+    ]
+
+
+def test_getitem():
+    examples = create_examples()
+    store = ExampleStore(examples)
+
+    assert len(store) == len(examples)
+    assert store[0] == examples[0] and store[-1] == examples[-1]
+
+
+def test_wrong_type():
+    with pytest.raises(TypeError):
+        ExampleStore(['text'])
+
+
+def test_changes_written_back():
+    examples = create_examples()
+    store = ExampleStore(examples)
+
+    store[1].txt = 'new text'
+    examples[2].src = 'new source'
+
+    assert store[1].txt == 'new text'
+    assert store[2].src == 'new source'
+
+
+def test_example_in_several_stores():
+    examples = create_examples(4)
+    first, second = ExampleStore(examples), ExampleStore(examples)
+    examples[0].txt = 'new text'
+    assert first[0].txt == second[0].txt == 'new text'
+
+    # the example is added to the store twice
+    example = first[1]
+    first.append(example)
+    example.src = 'new source'
+
+    assert first[1].src == first[-1].src == 'new source'
+    assert second[1].src == examples[1].src != 'new source'
+
+
+@pytest.mark.parametrize('stored', (False, True))
+def test_mutable_fields_changed(stored):
+    example = create_examples(1)[0]
+    para = expl.ParallelExample({'en': 'text', 'ru': 'текст'}, 'src', 'amb', ['text'], 'url')
+    if stored:
+        store = ExampleStore([example, para])
+        example, para = store
+    row, para_hash = example.row, hash(para)
+
+    example.found_wordforms.append('new')
+    para.txt['en'] = 'new text'
+    if stored:
+        example, para = store
+    assert example.found_wordforms == ['текст', 'new'] and 'текст, new' in example.row
+    assert example.row != row and hash(para) != para_hash
+    assert para.txt == {'en': 'new text', 'ru': 'текст'} and para.en == 'new text'
+
+    copy = para.copy()
+    copy.txt.pop('ru')
+    assert para.txt == {'en': 'new text', 'ru': 'текст'} and copy.txt == {'en': 'new text'}
+
+
+def test_wrong_slice_assignment():
+    store = ExampleStore(create_examples(4))
+    rows = len(store._columns)
+
+    with pytest.raises(ValueError):
+        store[::2] = create_examples(3)
+    with pytest.raises(TypeError):
+        store[:2] = [*create_examples(1), 'text']
+
+    assert len(store) == 4
+    assert len(store._columns) == rows
+
+
+def test_not_str_fields():
+    example = create_examples(1)[0]
+    store = ExampleStore([example])
+    example.txt = ['1', 2]
+
+    assert store[0].txt == ['1', 2]
+
+
+def test_slice_shares_rows():
+    store = ExampleStore(create_examples())
+    sliced = store[2:5]
+    del sliced[0]
+
+    assert len(store) == 10 and len(sliced) == 2
+    assert sliced[0] == store[3]
+
+
+def test_setitem_and_delitem():
+    examples = create_examples()
+    store = ExampleStore(examples)
+    store[0] = examples[5].copy()
+    del store[1:3]
+
+    assert store[0] == examples[5]
+    assert store[1] == examples[3]
+
+
+def test_filter_and_sort():
+    store = ExampleStore(create_examples())
+    store.filter(lambda example: int(example.txt.split()[-1]) % 2)
+    store.sort(key=lambda example: example.txt, reverse=True)
+
+    assert [example.txt for example in store] == [
+        f"текст номер {num}" for num in (9, 7, 5, 3, 1)]
+
+
+@pytest.mark.parametrize('example', (
+    expl.KwicExample('left', 'center', 'right', 'src', ['center'], 'url'),
+    expl.ParallelExample({'en': 'text', 'ru': 'текст'}, 'src', 'amb', ['text'], 'url'),
+    expl.MultimodalExample('text', 'src', 'amb', ['text'], 'url', 'media', 'media/file.mp4'),
+))
+def test_example_types(example):
+    store = ExampleStore([example])
+
+    assert type(store[0]) is type(example)
+    assert store[0] == example
+
+
+def test_compact():
+    store = ExampleStore(create_examples())
+    for example in store:
+        example.txt = 'changed'
+    size = store.nbytes
+    store.compact()
+
+    assert store.nbytes < size
+    assert all(example.txt == 'changed' for example in store)
+
+
+def test_garbage_collected(monkeypatch):
+    monkeypatch.setattr(example_store, 'GARBAGE_MIN_SIZE', 1024)
+    examples = create_examples(100)
+    store = ExampleStore(examples)
+    assert len(list(store.find_word('текст'))) == 100
+    store.reverse()
+    size = store.nbytes
+
+    for step in range(20):
+        for num, example in enumerate(examples):
+            example.txt = f"номер {num} шаг {step}"
+
+    assert store.nbytes <= size * 2
+    assert [example.txt for example in store] == [f"номер {num} шаг 19" for num in reversed(range(100))]
+    assert not list(store.find_word('текст')) and len(list(store.find_word('19'))) == 100
+
+
+def test_contains():
+    examples = create_examples()
+    store = ExampleStore(examples[:5])
+
+    assert examples[0] in store and examples[0].copy() in store
+    assert examples[5] not in store
+
+
+def test_contains_after_changes():
+    examples = create_examples()
+    store = ExampleStore(examples)
+    store[0].txt = 'new text'
+    del store[1]
+    store.pop(1)
+    store.filter(lambda example: example.txt != examples[3].txt)
+
+    assert store[0] in store and examples[0] not in store
+    assert examples[4] in store
+    assert all(example not in store for example in examples[1:4])
+
+    store.clear()
+    assert examples[4] not in store
+
+
+def test_deduplicate():
+    examples = create_examples()
+    store = ExampleStore(examples + [example.copy() for example in examples[:3]])
+
+    assert store.deduplicate() == 3
+    assert store == examples
+
+
+def test_set_operations():
+    examples = create_examples()
+    lhs, rhs = ExampleStore(examples[:6]), ExampleStore(examples[4:])
+
+    assert lhs.union(rhs) == examples
+    assert lhs.intersection(rhs) == examples[4:6]
+    assert lhs.difference(rhs) == examples[:4]
+
+
+def test_wordform_frequencies():
+    examples = create_examples()
+    examples[0] = expl.MainExample(
+        'текст номер 0', 'src', 'amb', [' Текст  ', 'номер'], 'url')
+    store = ExampleStore(examples)
+    index = store.get_index(WordformIndex)
+
+    assert index.counts() == {'текст': 10, 'номер': 1}
+    assert index.most_common(1) == [('текст', 10)]
+    assert index.frequency('ТЕКСТ') == 10 / 11
+
+    del store[0]
+    store[0] = expl.MainExample('текст номер 1', 'src', 'amb', ['номер'], 'url')
+    store.filter(lambda example: int(example.txt.split()[-1]) < 5)
+    assert index.counts() == {'текст': 3, 'номер': 1}
+
+    store.clear()
+    assert store.get_index(WordformIndex).counts() == {}
+    assert store.get_index(WordformIndex).frequency('текст') == 0
+
+
+def test_text_index():
+    examples = create_examples()
+    examples[0] = expl.MainExample('Кот и пёс', 'src', 'amb', ['кот'], 'url')
+    store = ExampleStore(examples)
+
+    assert list(store.find_word('КОТ')) == [examples[0]]
+    assert list(store.find_phrase('и, пёс')) == [examples[0]]
+    assert list(store.find_phrase('пёс и')) == []
+
+    pattern = re.compile(r'номер [12]\b')
+    assert list(store.regex_candidates(pattern)) == examples[1:]
+
+    store[1].txt = 'новый текст'
+    del store[0]
+    assert list(store.find_word('кот')) == []
+    assert list(store.find_word('новый')) == [store[0]]
+    assert len(list(store.find_word('номер'))) == 8
+
+
+def test_views_share_order():
+    examples = create_examples()
+    store = ExampleStore(examples)
+    view = store[8:1:-2]
+    copy = store.copy()
+
+    assert view == examples[8:1:-2] and copy == examples
+    assert view[1:] == examples[6:1:-2]
+
+    del store[0]
+    view.append(examples[0])
+    assert view == examples[8:1:-2] + [examples[0]]
+    assert copy == examples and store == examples[1:]
+
+    with pytest.raises(IndexError):
+        view[10]
+
+
+@pytest.fixture(params=[True, False], ids=['numpy', 'python'])
+def with_numpy(request, monkeypatch):
+    if request.param:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(example_store, 'np', None)
+
+
+def test_filter_by_source(with_numpy):
+    examples = create_examples()
+    store = ExampleStore(examples)
+    store.filter_by(author='Автор', min_year=1903, max_year=1906)
+
+    assert store == examples[3:7]
+    assert list(store.source_column('year')) == [1903, 1904, 1905, 1906]
+    assert list(store.source_column('title')) == ['Название'] * 4
+
+    store.filter_by(year=1905)
+    assert store == [examples[5]]
+
+    store.append(examples[6].copy())
+    assert list(store.source_column('year')) == [1905, 1906]
+
+    with pytest.raises(ValueError):
+        store.filter_by(publisher='')
+
+
+def test_sort_by_source(with_numpy):
+    examples = create_examples(3)
+    examples.append(expl.MainExample('текст', 'Без года', '', [], ''))
+    store = ExampleStore(examples)
+
+    store.sort_by('year', reverse=True)
+    assert store == examples[2::-1] + [examples[3]]
+    store.sort_by('title')
+    assert store[0] == examples[3]
+    assert store.year_counts() == {1900: 1, 1901: 1, 1902: 1}
+
+
+def test_documents():
+    examples = create_examples()
+    examples.append(expl.KwicExample('left', 'center', 'right', 'src', [], 'https://ruscorpora.ru/0'))
+    store = ExampleStore(examples)
+
+    assert store.count_documents() == 3
+    documents = dict(store.iter_documents())
+    assert documents['https://ruscorpora.ru/0'] == examples[0:10:3] + [examples[10]]
+
+    stats = store.document_stats()
+    assert [doc.examples for doc in stats] == [5, 3, 3]
+    assert stats[1].source == examples[1].src and stats[1].found_wordforms == 3
+
+    del store[1:10:3]
+    assert store.count_documents() == 2
+
+    store.append(examples[1].copy())
+    assert store.count_documents() == 3
+    del store[-1]
+
+    sample = store.sample_documents(2)
+    assert len(sample) == 4 and sample.count_documents() == 2
+    with pytest.raises(ValueError):
+        store.sample_documents(0)
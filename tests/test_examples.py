@@ -132,6 +132,33 @@ class TemplateTestExamples:
 
         assert lhs == rhs
 
+    def test_row(self):
+        row = self.ex.row
+
+        assert isinstance(row, tuple) and list(row) == self.ex.items
+        assert self.ex.row is row
+
+    def test_hash_of_copy(self):
+        copy = self.ex.copy()
+
+        assert hash(copy) == hash(self.ex) and copy == self.ex
+
+    def test_setter_resets_row_and_hash(self):
+        copy = self.ex.copy()
+        old_hash = hash(copy)
+        copy.src = 'new_source'
+
+        assert 'new_source' in copy.row
+        assert hash(copy) != old_hash and copy != self.ex
+
+    def test_found_wordforms_changed(self):
+        copy = self.ex.copy()
+        row = copy.row
+        copy.found_wordforms.append('new_wordform')
+
+        assert copy.found_wordforms[-1] == 'new_wordform' and copy.row != row
+        assert 'new_wordform' not in self.ex.found_wordforms
+
 
 class TestMainExample(TemplateTestExamples):
     corpus_res = corp.MainCorpus('тест', 1, marker=str.upper)
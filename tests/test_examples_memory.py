@@ -0,0 +1,82 @@
+import sys
+import tracemalloc
+
+import pytest
+
+import rnc.examples as expl
+
+# instances created to measure the memory
+COUNT = 1000
+
+
+def example_args(ex_type: type) -> tuple:
+    if issubclass(ex_type, expl.KwicExample):
+        return 'left', 'center', 'right', 'src', ['center'], 'url'
+    if issubclass(ex_type, expl.ParallelExample):
+        return {'en': 'text', 'ru': 'текст'}, 'src', 'amb', ['text'], 'url'
+    if issubclass(ex_type, expl.MultimodalExample):
+        return 'text', 'src', 'amb', ['text'], 'url', 'media', 'file.mp4'
+    return 'text', 'src', 'amb', ['text'], 'url'
+
+
+# bytes per instance, fields are shared between the instances,
+# so only the object itself and what the constructor creates counted
+MEMORY_LIMITS = {
+    expl.KwicExample: 256,
+    expl.ParallelExample: 384,
+    expl.MultilingualParaExample: 384,
+    expl.MultimodalExample: 384,
+}
+DEFAULT_MEMORY_LIMIT = 128
+
+# bytes of the instance itself (sys.getsizeof): the object headers
+# and 8 bytes per slot, so every new slot is visible here
+INSTANCE_SIZES = {
+    expl.KwicExample: 120,
+    expl.MultimodalExample: 112,
+}
+DEFAULT_INSTANCE_SIZE = 96
+
+EXAMPLE_TYPES = [
+    getattr(expl, name)
+    for name in expl.__all__
+]
+
+
+def measure(ex_type: type) -> float:
+    args = example_args(ex_type)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        examples = [ex_type(*args) for _ in range(COUNT)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    assert len(examples) == COUNT
+    return (after - before) / COUNT
+
+
+@pytest.mark.parametrize('ex_type', EXAMPLE_TYPES)
+def test_slots_in_hierarchy(ex_type):
+    for cls in ex_type.__mro__[:-1]:
+        assert '__slots__' in vars(cls), cls
+
+
+@pytest.mark.parametrize('ex_type', EXAMPLE_TYPES)
+def test_no_dict(ex_type):
+    example = ex_type(*example_args(ex_type))
+
+    assert not hasattr(example, '__dict__')
+    with pytest.raises(AttributeError):
+        example.new_attribute = 'value'
+
+
+@pytest.mark.parametrize('ex_type', EXAMPLE_TYPES)
+def test_memory_per_instance(ex_type):
+    limit = MEMORY_LIMITS.get(ex_type, DEFAULT_MEMORY_LIMIT)
+    instance_size = INSTANCE_SIZES.get(ex_type, DEFAULT_INSTANCE_SIZE)
+
+    assert measure(ex_type) <= limit
+    assert sys.getsizeof(ex_type(*example_args(ex_type))) <= instance_size
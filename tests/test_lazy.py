@@ -0,0 +1,67 @@
+import pytest
+
+import rnc.corpora as rnc
+import rnc.examples as expl
+from rnc.example_store import ExampleStore
+
+
+def create_corpus(count: int = 10) -> rnc.MainCorpus:
+    corp = rnc.MainCorpus('текст', 1)
+    corp._data = ExampleStore(
+        expl.MainExample(
+            f"текст номер {num}", f"Автор. Название ({1900 + num})",
+            'disambiguated', ['текст'], f"https://ruscorpora.ru/{num % 3}")
+        for num in range(count)
+    )
+    return corp
+
+
+def number(example: expl.MainExample) -> int:
+    return int(example.txt.split()[-1])
+
+
+def test_filter_map():
+    corp = create_corpus()
+    query = corp.lazy().filter(lambda ex: number(ex) % 2).map(number)
+
+    assert query.collect() == [1, 3, 5, 7, 9]
+    assert query.count() == 5
+    assert len(corp) == 10
+
+
+def test_sort_take():
+    corp = create_corpus()
+    query = corp.lazy().sort(key=number, reverse=True).map(number)
+
+    assert query.take(3).collect() == [9, 8, 7]
+    assert query.filter(lambda num: num % 3 == 0).take(2).collect() == [9, 6]
+    assert query.collect() == list(range(9, -1, -1))
+
+
+def test_take_stops_early():
+    def items():
+        yield from range(5)
+        raise AssertionError("The source iterated after the take")
+
+    corp = create_corpus()
+    corp._iter_examples = items
+
+    assert corp.lazy().take(3).collect() == [0, 1, 2]
+
+
+def test_to_corpus():
+    corp = create_corpus()
+    new_corp = corp.lazy().filter(lambda ex: number(ex) > 6).to_corpus()
+
+    assert isinstance(new_corp, rnc.MainCorpus)
+    assert new_corp.data == corp.data[7:]
+    assert new_corp.params == corp.params
+
+
+def test_wrong_steps():
+    query = create_corpus().lazy()
+
+    with pytest.raises(TypeError):
+        query.filter('key')
+    with pytest.raises(ValueError):
+        query.take(-1)
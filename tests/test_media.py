@@ -0,0 +1,173 @@
+import asyncio
+import contextlib
+
+import aiohttp
+from aiohttp import web
+
+import rnc.corpora_requests as creq
+
+CONTENT = bytes(range(256)) * 4096
+
+
+@contextlib.asynccontextmanager
+async def media_server(handler):
+    app = web.Application()
+    app.router.add_get('/{name}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        await runner.cleanup()
+
+
+async def serve_media(request):
+    if request.match_info['name'] == 'missing':
+        raise web.HTTPNotFound()
+    response = web.StreamResponse()
+    await response.prepare(request)
+    for start in range(0, len(CONTENT), 100_000):
+        await response.write(CONTENT[start:start + 100_000])
+    return response
+
+
+def test_download_docs(tmp_path):
+    async def download():
+        async with media_server(serve_media) as url:
+            failed = await creq.download_docs_async([
+                (f"{url}/clip", str(tmp_path / 'clip.mp4')),
+                (f"{url}/missing", str(tmp_path / 'missing.mp4')),
+            ])
+            return url, failed
+
+    url, failed = asyncio.run(download())
+
+    assert failed == [(f"{url}/missing", str(tmp_path / 'missing.mp4'))]
+    assert (tmp_path / 'clip.mp4').read_bytes() == CONTENT
+    assert sorted(path.name for path in tmp_path.iterdir()) == [creq.MANIFEST_NAME, 'clip.mp4']
+
+
+def test_resume_and_skip(tmp_path):
+    source = tmp_path / 'source.mp4'
+    source.write_bytes(CONTENT)
+    target = tmp_path / 'media' / 'clip.mp4'
+    target.parent.mkdir()
+    target.with_name('clip.mp4.part').write_bytes(CONTENT[:1000])
+    ranges = []
+
+    async def serve_file(request):
+        ranges.append(request.headers.get('Range'))
+        return web.FileResponse(source)
+
+    async def download():
+        async with media_server(serve_file) as url:
+            url_to_name = [(f"{url}/clip", str(target))]
+            await creq.download_docs_async(url_to_name)
+            assert target.read_bytes() == CONTENT and ranges == ['bytes=1000-']
+
+            await creq.download_docs_async(url_to_name)
+            assert len(ranges) == 1
+
+            # the file is changed, so it is downloaded again
+            target.write_bytes(CONTENT[::-1])
+            await creq.download_docs_async(url_to_name)
+            assert target.read_bytes() == CONTENT and ranges[1:] == [None]
+
+    asyncio.run(download())
+    assert len((target.parent / creq.MANIFEST_NAME).read_text().splitlines()) == 2
+
+
+def test_failed_resume(tmp_path):
+    target = tmp_path / 'clip.mp4'
+    target.with_name('clip.mp4.part').write_bytes(CONTENT[::-1][:1000])
+    ranges = []
+
+    async def serve_media_without_ranges(request):
+        ranges.append(request.headers.get('Range'))
+        if 'Range' in request.headers:
+            raise web.HTTPRequestRangeNotSatisfiable()
+        return await serve_media(request)
+
+    async def download():
+        async with media_server(serve_media_without_ranges) as url:
+            async with aiohttp.ClientSession() as ses:
+                return await creq.fetch_media_file(f"{url}/clip", str(target), ses)
+
+    size, _ = asyncio.run(download())
+
+    assert size == len(CONTENT) and target.read_bytes() == CONTENT
+    assert ranges == ['bytes=1000-', None]
+    assert not target.with_name('clip.mp4.part').exists()
+
+
+def test_disk_errors(tmp_path, monkeypatch):
+    # the file cannot replace the folder
+    (tmp_path / 'folder.mp4').mkdir()
+
+    def add(*args):
+        raise OSError('No space left on device')
+
+    async def download():
+        async with media_server(serve_media) as url:
+            url_to_name = [(f"{url}/{name}", str(tmp_path / f"{name}.mp4")) for name in ('folder', 'clip')]
+            return url_to_name, await asyncio.wait_for(creq.download_docs_async(url_to_name), 5)
+
+    monkeypatch.setattr(creq.MediaManifest, 'add', add)
+    url_to_name, failed = asyncio.run(download())
+
+    assert sorted(failed) == sorted(url_to_name)
+
+    assert (tmp_path / 'clip.mp4').read_bytes() == CONTENT
+    assert (tmp_path / 'folder.mp4').is_dir()
+
+
+def test_largest_first(tmp_path):
+    sizes = {'short': 10_000, 'long': 300_000, 'middle': 100_000, 'unknown': 1000}
+    for name, size in sizes.items():
+        (tmp_path / name).write_bytes(CONTENT[:size])
+    # the part of the long file is received
+    (tmp_path / 'media').mkdir()
+    (tmp_path / 'media' / 'long.mp4.part').write_bytes(CONTENT[:250_000])
+
+    async def serve_file(request):
+        name = request.match_info['name']
+        if name == 'unknown':
+            raise web.HTTPNotFound()
+        if request.method == 'HEAD' and name == 'middle':
+            raise web.HTTPMethodNotAllowed('HEAD', ['GET'])
+        return web.FileResponse(tmp_path / name)
+
+    events = []
+
+    async def download():
+        async with media_server(serve_file) as url:
+            missing = [
+                (f"{url}/{name}", str(tmp_path / 'media' / f"{name}.mp4"), None)
+                for name in sizes
+            ]
+            async with aiohttp.ClientSession() as ses:
+                ordered, to_receive = await creq._order_by_size(missing, ses, creq.RateLimiter())
+            assert [filename for _, filename, _ in ordered] == [
+                str(tmp_path / 'media' / f"{name}.mp4") for name in ('unknown', 'middle', 'long', 'short')]
+            assert to_receive == {
+                str(tmp_path / 'media' / f"{name}.mp4"): size
+                for name, size in (('short', 10_000), ('long', 50_000), ('middle', 100_000), ('unknown', None))
+            }
+
+            await creq.download_docs_async(
+                [(url, filename) for url, filename, _ in missing[:3]],
+                probe=True, progress=events.append)
+
+    asyncio.run(download())
+
+    last = events[-1]
+    assert last.total_received == last.total_size == 160_000
+    assert last.total_speed > 0
+    finished = {event.filename: event.received for event in events if event.received == event.size}
+    assert finished == {
+        str(tmp_path / 'media' / f"{name}.mp4"): sizes[name]
+        for name in ('short', 'long', 'middle')
+    }
@@ -0,0 +1,67 @@
+import asyncio
+import os
+
+import pytest
+from aiohttp import web
+
+from rnc.media_store import MediaStore
+from tests.test_media import media_server
+
+CLIPS = {
+    'first': b'first clip' * 1000,
+    'second': b'second clip' * 1000,
+    # the same content by another URL
+    'copy': b'first clip' * 1000,
+}
+
+
+def download(store, names, requests):
+    async def serve(request):
+        name = request.match_info['name']
+        requests.append(name)
+        # the requests are concurrent
+        await asyncio.sleep(0.01)
+        return web.Response(body=CLIPS[name])
+
+    async def run():
+        async with media_server(serve) as url:
+            return await store.download_async([
+                (f"{url}/{name}", filename)
+                for name, filename in names
+            ])
+    return asyncio.run(run())
+
+
+def test_download_once(tmp_path):
+    store = MediaStore(tmp_path / 'store')
+    requests = []
+    names = [
+        ('first', tmp_path / 'a' / '1.mp4'),
+        ('first', tmp_path / 'b' / '1.mp4'),
+        ('copy', tmp_path / 'a' / '2.mp4'),
+        ('second', tmp_path / 'a' / '3.mp4'),
+    ]
+
+    assert download(store, names, requests) == 4
+    assert sorted(requests) == ['copy', 'first', 'second']
+    assert len(store) == 2 and store.size == len(CLIPS['first']) + len(CLIPS['second'])
+
+    first, other, copy, _ = (filename for _, filename in names)
+    assert first.read_bytes() == CLIPS['first']
+    assert os.path.samefile(first, other) and os.path.samefile(first, copy)
+
+    # the index is saved
+    assert len(MediaStore(tmp_path / 'store')) == 2
+
+
+def test_evict(tmp_path):
+    store = MediaStore(tmp_path / 'store', budget=15_000)
+    requests = []
+    download(store, [('first', tmp_path / '1.mp4')], requests)
+    download(store, [('second', tmp_path / '2.mp4')], requests)
+
+    assert len(store) == 1 and store.size == len(CLIPS['second'])
+    assert (tmp_path / '1.mp4').read_bytes() == CLIPS['first']
+
+    with pytest.raises(ValueError):
+        MediaStore(tmp_path, budget=0)
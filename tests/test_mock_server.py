@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+import pytest
+
+import rnc.corpora as corpora
+import rnc.corpora_requests as creq
+from rnc import benchmark
+from rnc.mock_server import ERROR_STATUSES, MockConfig, MockRNC
+
+
+@pytest.fixture
+def base_url():
+    previous = corpora.BASE_RNC_URL
+    yield corpora.set_base_url
+    corpora.set_base_url(previous)
+
+
+@pytest.mark.parametrize(('corpus', 'kwargs', 'count'), (
+    (corpora.MainCorpus, {}, 30),
+    (corpora.ParallelCorpus, {}, 30),
+    (corpora.MultimodalCorpus, {}, 15),
+    (corpora.MainCorpus, {'out': 'kwic'}, 30),
+))
+def test_corpora(base_url, corpus, kwargs, count):
+    async def request():
+        async with MockRNC(MockConfig(docs=15)) as server:
+            base_url(server.url)
+            corp = corpus('кот', 3, dpp=5, spd=2, **kwargs)
+            await corp.request_examples_async()
+            return server, server.url, corp
+
+    server, url, corp = asyncio.run(request())
+
+    assert len(corp) == count
+    assert (corp.amount_of_docs, corp.amount_of_contexts) == (15, 45)
+    assert all(example.found_wordforms == ['кот'] * len(example.found_wordforms) for example in corp)
+    assert corp[0].doc_url.startswith(f"{url}/search.xml?docid=1")
+    assert set(server.statuses) == {200}
+
+
+def test_missing_pages(base_url):
+    async def request(query, p_count):
+        async with MockRNC(MockConfig(docs=15)) as server:
+            base_url(server.url)
+            await corpora.MainCorpus(query, p_count, dpp=5).request_examples_async()
+
+    # the fourth page is redirected to the first one
+    with pytest.raises(creq.LastPageDoesntExist):
+        asyncio.run(request('кот', 4))
+    with pytest.raises(creq.NoResultFound):
+        asyncio.run(request('notfound', 1))
+
+
+def test_faults(monkeypatch):
+    monkeypatch.setattr(creq, 'WAIT', 0.1)
+    requests = [{'lex1': 'кот', 'dpp': 10, 'p': p_index} for p_index in range(6)]
+
+    async def request(config):
+        async with MockRNC(config) as server:
+            pages = await creq.fetch_pages_async(f"{server.url}/search.xml", requests, workers=2)
+            return server, pages
+
+    server, pages = asyncio.run(request(MockConfig(burst_every=2, burst_length=2)))
+    assert all(pages)
+    assert server.statuses[429] >= 4
+    assert server.requests == 6 + server.statuses[429]
+
+    server, pages = asyncio.run(request(MockConfig(error_rate=1)))
+    assert pages == [None] * 6
+    assert set(server.statuses) <= set(ERROR_STATUSES)
+
+    start = time.perf_counter()
+    server, pages = asyncio.run(request(MockConfig(latency=0.05, rate_limit=3)))
+    assert all(pages)
+    assert server.statuses[429] > 0
+    assert time.perf_counter() - start >= 0.25
+
+
+def test_media(tmp_path):
+    files = [(doc, tmp_path / f"clip{doc}.mp4") for doc in range(4)]
+    config = MockConfig(media_size=50_000, bandwidth=1_000_000)
+    # the partial file is resumed
+    tmp_path.joinpath('clip3.mp4.part').write_bytes(MockRNC._media_content(3, 200_000)[:1000])
+
+    async def download():
+        async with MockRNC(config) as server:
+            url_to_name = [(f"{server.url}/media/{doc}", str(path)) for doc, path in files]
+            await creq.download_docs_async(url_to_name, probe=True)
+            return server
+
+    start = time.perf_counter()
+    server = asyncio.run(download())
+
+    for doc, path in files:
+        assert path.read_bytes() == MockRNC._media_content(doc, 50_000 * (doc + 1))
+    assert server.bytes_sent == 50_000 * 10 - 1000
+    assert time.perf_counter() - start >= 0.4
+
+
+def test_benchmark():
+    config = MockConfig(docs=20, latency=0.01)
+    results = asyncio.run(benchmark.run_benchmark(
+        config, workers=(1, 4), pages=4, files=4, dpp=5, spd=2))
+
+    assert [(result.scenario, result.workers) for result in results] == [
+        (scenario, workers)
+        for scenario in benchmark.SCENARIOS
+        for workers in (1, 4)
+    ]
+    assert all(result.received == result.expected == 4 for result in results)
+    assert 'per second' in benchmark.format_results(results)
+
+    with pytest.raises(ValueError):
+        asyncio.run(benchmark.run_benchmark(config, pages=5, dpp=5))
+
+
+def test_set_base_url(base_url):
+    assert base_url('http://127.0.0.1:8080/') == 'https://processing.ruscorpora.ru'
+    assert corpora.RNC_URL == 'http://127.0.0.1:8080/search.xml'
+    assert corpora.create_doc_url('doc') == 'http://127.0.0.1:8080/doc'
+
+    with pytest.raises(ValueError):
+        base_url('127.0.0.1:8080')
@@ -0,0 +1,42 @@
+import pytest
+
+from rnc.corpora_requests import last_page_probes, pager_max_page
+
+
+def find_last_page(count, estimate, limit=None):
+    """ Get the last page and count of the checks
+    if there are count pages.
+    """
+    probes = last_page_probes(estimate, limit)
+    checks = 0
+    try:
+        p_index = next(probes)
+        while True:
+            checks += 1
+            p_index = probes.send(p_index < count)
+    except StopIteration as e:
+        return e.value, checks
+
+
+@pytest.mark.parametrize('count', (1, 2, 3, 17, 64, 100))
+@pytest.mark.parametrize('estimate', (1, 10, 64, 65, 300))
+@pytest.mark.parametrize('limit', (None, 1, 20, 1000))
+def test_last_page_probes(count, estimate, limit):
+    expected = count if limit is None else min(count, limit)
+
+    assert find_last_page(count, estimate, limit)[0] == expected - 1
+
+
+def test_last_page_probes_count():
+    assert find_last_page(100, 100) == (99, 2)
+    assert find_last_page(1000, 10)[1] <= 2 * 10
+    assert find_last_page(1000, 5000)[1] <= 2 * 13
+
+
+def test_pager_max_page():
+    page = '<div><p class="pager">Pages: <b>1</b> <a href="?p=1">2</a> ' \
+           '<a href="?p=9">10</a> <a href="?p=1">next</a></p>' \
+           '<ol><li><a>25</a></li></ol></div>'
+
+    assert pager_max_page(page) == 10
+    assert pager_max_page('<div></div>') is None
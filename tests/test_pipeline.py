@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+import rnc.corpora_requests as creq
+from tests.test_media import CONTENT, media_server
+
+
+def test_pages_with_media(tmp_path):
+    requested = []
+
+    def parse(html):
+        return html.split(',')
+
+    async def run():
+        media_requested = asyncio.Event()
+
+        async def serve(request):
+            name = request.match_info['name']
+            if name != 'search':
+                requested.append(name)
+                media_requested.set()
+                return web.Response(body=CONTENT)
+
+            p_index = request.query['p']
+            if p_index == '2':
+                raise web.HTTPNotFound()
+            if p_index == '3':
+                # the last page is sent when a media file is requested
+                await asyncio.wait_for(media_requested.wait(), 5)
+            return web.Response(text=f"clip{p_index},common")
+
+        async with media_server(serve) as url:
+            def media(names):
+                return [(f"{url}/{name}", str(tmp_path / f"{name}.mp4")) for name in names]
+
+            return await creq.fetch_pages_with_media_async(
+                f"{url}/search", [{'p': p_index} for p_index in range(1, 4)],
+                parse, media, received=['clip0,common'])
+
+    results = asyncio.run(run())
+
+    assert results == [['clip0', 'common'], ['clip1', 'common'], None, ['clip3', 'common']]
+    # the common file is downloaded once
+    assert sorted(requested) == ['clip0', 'clip1', 'clip3', 'common']
+    assert (tmp_path / 'clip3.mp4').read_bytes() == CONTENT
+
+
+def test_rate_limiter():
+    async def run(limiter, count):
+        start = time.monotonic()
+        for _ in range(count):
+            async with limiter:
+                pass
+        return time.monotonic() - start
+
+    assert asyncio.run(run(creq.RateLimiter(20), 5)) >= 0.19
+    assert asyncio.run(run(creq.RateLimiter(), 100)) < 0.1
+
+    async def paused():
+        limiter = creq.RateLimiter()
+        limiter.pause(0.2)
+        return await run(limiter, 1)
+
+    assert asyncio.run(paused()) >= 0.19
+
+    with pytest.raises(ValueError):
+        creq.RateLimiter(0)
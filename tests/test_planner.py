@@ -0,0 +1,31 @@
+import pytest
+
+from rnc.planner import plan_request
+
+
+def test_plan_examples():
+    plan = plan_request(1000, 4000, examples=500)
+
+    assert (plan.dpp, plan.spd, plan.p_count, plan.max_p_count) == (50, 50, 3, 20)
+    assert plan.examples == 600 and plan.docs == 150
+
+
+def test_plan_docs_and_limits():
+    assert plan_request(1000, 100000, docs=120).p_count == 3
+    assert plan_request(1000, 100000, examples=500, docs=10).p_count == 1
+    # there are fewer results than requested
+    plan = plan_request(30, 40, examples=5000)
+    assert (plan.p_count, plan.examples, plan.docs) == (1, 40, 30)
+
+
+def test_plan_unknown_amounts():
+    plan = plan_request(None, None, examples=5000, dpp=10, spd=10)
+
+    assert plan.p_count == 50 and plan.max_p_count is None
+
+
+@pytest.mark.parametrize('kwargs', (
+    {}, {'examples': 0}, {'docs': -1}, {'examples': 10, 'dpp': 0}))
+def test_plan_wrong_counts(kwargs):
+    with pytest.raises(ValueError):
+        plan_request(10, 10, **kwargs)
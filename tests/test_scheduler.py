@@ -0,0 +1,110 @@
+import asyncio
+import concurrent.futures
+
+import pytest
+
+from rnc.examples import MultimodalExample
+from rnc.loop import BackgroundLoop, background_loop
+from rnc.scheduler import DownloadScheduler, download_scheduler
+from tests.test_media import CONTENT, media_server, serve_media
+
+
+@pytest.fixture
+def server():
+    """ Media server in its own background loop. """
+    loop = BackgroundLoop('server')
+    requested = []
+
+    async def serve(request):
+        requested.append(request.match_info['name'])
+        await asyncio.sleep(0.05)
+        return await serve_media(request)
+
+    context = media_server(serve)
+    url = loop.run(context.__aenter__())
+    yield url, requested
+    loop.run(context.__aexit__(None, None, None))
+    loop.close()
+
+
+def test_background_loop():
+    loop = BackgroundLoop()
+    closed = []
+
+    async def close():
+        closed.append(True)
+
+    async def nested():
+        return loop.run(asyncio.sleep(0))
+
+    loop.on_close(close)
+    assert loop.run(asyncio.sleep(0, 'done')) == 'done'
+    assert loop.submit(asyncio.sleep(0, 'done')).result() == 'done'
+    with pytest.raises(RuntimeError):
+        loop.run(nested())
+
+    first = loop.loop
+    loop.close()
+    assert closed == [True] and not loop.is_running
+    # it is started again
+    assert loop.run(asyncio.sleep(0, 'done')) == 'done'
+    assert loop.loop is not first
+    loop.close()
+
+    assert background_loop() is background_loop()
+
+
+def test_scheduler(server, tmp_path):
+    url, requested = server
+    loop = BackgroundLoop()
+    scheduler = DownloadScheduler(loop=loop)
+
+    futures = [
+        scheduler.submit(f"{url}/first", tmp_path / 'first.mp4'),
+        scheduler.submit(f"{url}/first", tmp_path / 'first.mp4'),
+        scheduler.submit(f"{url}/second", tmp_path / 'media' / 'second.mp4'),
+        scheduler.submit(f"{url}/missing", tmp_path / 'missing.mp4'),
+    ]
+    assert [future.result(5) for future in futures] == [True, True, True, False]
+    assert sorted(requested) == ['first', 'missing', 'second']
+    assert (tmp_path / 'media' / 'second.mp4').read_bytes() == CONTENT
+
+    # the complete file is skipped, from another event loop
+    assert asyncio.run(scheduler.download(f"{url}/first", tmp_path / 'first.mp4'))
+    assert len(requested) == 3
+    loop.close()
+
+    with pytest.raises(ValueError):
+        DownloadScheduler(0, loop=loop)
+
+
+def test_download_file(server, tmp_path):
+    url, requested = server
+    examples = [
+        MultimodalExample('txt', 'src', '', [], '', f"{url}/{name}", tmp_path / f"{name}.mp4")
+        for name in ('first', 'second', 'first')
+    ]
+
+    futures = [example.download_file(wait=False) for example in examples]
+    concurrent.futures.wait(futures, 5)
+    assert examples[1].download_file() is True
+    missing = MultimodalExample('txt', 'src', '', [], '', f"{url}/missing", tmp_path / 'missing.mp4')
+    assert missing.download_file() is False
+
+    assert all(future.result() for future in futures)
+    assert sorted(requested) == ['first', 'missing', 'second']
+    assert asyncio.run(examples[0].download_file_async())
+    assert download_scheduler() is download_scheduler()
+
+
+def test_download_file_in_loop(server, tmp_path):
+    url, _ = server
+    example = MultimodalExample('txt', 'src', '', [], '', f"{url}/clip", tmp_path / 'clip.mp4')
+
+    async def download():
+        with pytest.raises(RuntimeError, match='download_file_async'):
+            example.download_file()
+        return await example.download_file_async()
+
+    assert background_loop().run(download(), timeout=5)
+    assert (tmp_path / 'clip.mp4').read_bytes() == CONTENT
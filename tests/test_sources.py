@@ -0,0 +1,18 @@
+import pytest
+
+from rnc.sources import SourceInfo, parse_source
+
+
+@pytest.mark.parametrize(('source', 'expected'), (
+    ('Л. Н. Толстой. Война и мир. Том 1 (1865-1869)',
+     SourceInfo('Л. Н. Толстой', 'Война и мир. Том 1', 1865, '')),
+    ('Анна Иванова. Кризис // «Известия», 2002.03.12',
+     SourceInfo('Анна Иванова', 'Кризис', 2002, '')),
+    ('Статья. Часть 2 (1990) // Журнал (1995)',
+     SourceInfo('Статья', 'Часть 2', 1990, '')),
+    ('Разговор о погоде (2003) [бытовая речь]',
+     SourceInfo('', 'Разговор о погоде', 2003, 'бытовая речь')),
+    ('Заголовок без года', SourceInfo('', 'Заголовок без года', None, '')),
+))
+def test_parse_source(source, expected):
+    assert parse_source(source) == expected
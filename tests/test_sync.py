@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+import rnc.corpora_requests as creq
+from rnc.loop import BackgroundLoop, background_loop
+from tests.test_media import media_server
+
+
+@pytest.fixture
+def pages():
+    """ Server of the pages in its own background loop,
+    it gives the peers of the requests.
+    """
+    loop = BackgroundLoop('server')
+    peers = []
+
+    async def serve(request):
+        peers.append(request.transport.get_extra_info('peername'))
+        return web.Response(text=f"page {request.query['p']}")
+
+    context = media_server(serve)
+    url = loop.run(context.__aenter__())
+    yield f"{url}/search", peers
+    loop.run(context.__aexit__(None, None, None))
+    loop.close()
+
+
+def test_sessions_reused(pages):
+    url, peers = pages
+
+    assert creq.get_htmls(url, 0, 1) == ['page 0']
+    assert creq.fetch_pages(url, [{'p': 1}]) == ['page 1']
+    # the connection of the first call is reused
+    assert len(peers) == 2 and peers[0] == peers[1]
+    assert background_loop().is_running
+
+
+def test_in_running_loop(pages):
+    url, _ = pages
+
+    async def notebook_cell():
+        return creq.get_htmls(url, 0, 2)
+
+    assert asyncio.run(notebook_cell()) == ['page 0', 'page 1']
+
+    async def in_background_loop():
+        return creq.run_sync(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError):
+        background_loop().run(in_background_loop())
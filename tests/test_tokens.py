@@ -0,0 +1,23 @@
+import re
+
+import pytest
+
+from rnc.tokens import required_literals, tokenize
+
+
+def test_tokenize():
+    assert tokenize("Кот, и  ПЁС-2!") == ['кот', 'и', 'пёс', '2']
+
+
+@pytest.mark.parametrize(('pattern', 'expected'), (
+    ('привет мир', ['привет', 'мир']),
+    (r'(?i)Кот\w+ (и|или) пёс', ['кот', 'и', 'пёс']),
+    (r'ab?c', ['a', 'c']),
+    (r'(?:foo){0,2}bar', ['bar']),
+    (r'(abc)+x*', ['abc']),
+    (r'[a-z]+', []),
+    (re.compile('Hello.World', re.I), ['hello', 'world']),
+    ('wrong(', []),
+))
+def test_required_literals(pattern, expected):
+    assert required_literals(pattern) == expected
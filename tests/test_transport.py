@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+import rnc.corpora_requests as creq
+from rnc import transport as tr
+from tests.test_media import CONTENT, media_server
+
+
+@pytest.fixture
+def use_transport():
+    previous = tr.get_transport()
+    yield tr.set_transport
+    tr.set_transport(previous)
+
+
+async def serve(request):
+    name = request.match_info['name']
+    if name == 'search':
+        return web.Response(text=f"page {request.query['p']}, {request.query['lang']}")
+    return web.Response(body=CONTENT)
+
+
+def test_record_and_replay(tmp_path, use_transport):
+    archive = tmp_path / 'archive'
+    media = tmp_path / 'media'
+    requests = [{'p': p_index, 'lang': 'ru'} for p_index in range(3)]
+
+    async def request(url):
+        pages = await creq.fetch_pages_async(f"{url}/search", requests)
+        await creq.download_docs_async([(f"{url}/clip", str(media / 'clip.mp4'))])
+        return pages
+
+    async def record():
+        media.mkdir()
+        async with media_server(serve) as url:
+            return url, await request(url)
+
+    use_transport(tr.RecordingTransport(archive))
+    url, pages = asyncio.run(record())
+    assert pages == ['page 0, ru', 'page 1, ru', 'page 2, ru']
+    assert len(tr.ResponseArchive(archive)) == 4
+
+    # the server is stopped, the partial file is resumed
+    (media / 'clip.mp4').unlink()
+    (media / creq.MANIFEST_NAME).unlink()
+    (media / 'clip.mp4.part').write_bytes(CONTENT[:1000])
+    replay = tr.ReplayTransport(archive, latency=0.01)
+    use_transport(replay)
+
+    assert asyncio.run(request(url)) == pages
+    assert (media / 'clip.mp4').read_bytes() == CONTENT
+    assert replay.requests == 4
+    assert asyncio.run(creq.fetch_pages_async(f"{url}/search", [{'p': 5, 'lang': 'ru'}])) == [None]
+
+
+def test_inject_statuses(tmp_path, use_transport, monkeypatch):
+    archive = tr.ResponseArchive(tmp_path)
+    archive.add(tr.request_key('GET', 'http://rnc/search', {'p': 0}), 200, 'http://rnc/search?p=0', {}, b'page 0')
+    archive.add(tr.request_key('GET', 'http://rnc/search?p=1'), 200, 'http://rnc/search?p=1', {}, b'page 1')
+    monkeypatch.setattr(creq, 'WAIT', 0.01)
+
+    # the first request gets 429 and is repeated, the page 1 gets 500
+    use_transport(tr.ReplayTransport(
+        tmp_path, inject=lambda index, key: 429 if index == 0 else 500 if key.endswith('p=1') else None))
+    pages = asyncio.run(creq.fetch_pages_async('http://rnc/search', [{'p': 0}, {'p': 1}], workers=1))
+    assert pages == ['page 0', None]
+
+    assert tr.request_key('get', 'http://rnc/search?b=1', {'a': 2}) == 'GET http://rnc/search?a=2&b=1'
+    with pytest.raises(TypeError):
+        tr.set_transport(object())